@@ -0,0 +1,104 @@
+"""
+Batch runner for many workload files.
+
+Simulates every workload in a directory (or matching a glob) on a pool of
+worker processes and prints one table with the average turnaround and
+waiting time of each file. Workers are started once, import the scheduler
+up front and take the files in chunks, so interpreter startup is paid per
+worker rather than per file. The per-tick logs are not produced.
+
+Usage: python batch.py DIRECTORY_OR_GLOB [--workers N] [--chunksize N]
+"""
+from __future__ import annotations
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from glob import glob
+from multiprocessing import Pool
+from os import cpu_count, devnull
+from pathlib import Path
+
+from mlfq import MLFQScheduler, View, Controller, RoundRobinAlgorithm, FCFSAlgorithm, SJFAlgorithm, IDLE_CPU, Q1_QUANTUM
+from workload import is_binary_workload
+
+
+@dataclass
+class BatchResult:
+    """Metrics of one simulated workload file"""
+    file_name: str
+    num_procs: int = 0
+    avg_turnaround_time: float = 0
+    avg_waiting_time: float = 0
+    error: str = ""
+
+
+def find_workloads(pattern: str) -> list[str]:
+    """Get the workload files in a directory, or the files matching a glob, sorted"""
+    if Path(pattern).is_dir():
+        return sorted([str(file_path) for file_path in Path(pattern).iterdir()
+                       if file_path.suffix == ".txt" or (file_path.is_file() and is_binary_workload(file_path))])
+    return sorted(glob(pattern))
+
+
+def run_workload(file_name: str, use_process_table: bool = False) -> BatchResult:
+    """Simulate one workload without logging and get its metrics"""
+    try:
+        scheduler = MLFQScheduler(cpu=IDLE_CPU, priority_queues=[RoundRobinAlgorithm(Q1_QUANTUM), FCFSAlgorithm(), SJFAlgorithm()])
+        with open(devnull, "w") as sink:
+            view = View(scheduler, use_process_table=use_process_table, sink=sink, quiet=True)
+            Controller(view, scheduler, event_driven=True).run(file_name)
+    except Exception as err:
+        return BatchResult(file_name, error=f"{type(err).__name__}: {err}")
+
+    num_procs = len(scheduler.process_list)
+    return BatchResult(
+        file_name,
+        num_procs,
+        sum([proc.get_turnaround_time() for proc in scheduler.process_list]) / num_procs,
+        sum([proc.get_waiting_time() for proc in scheduler.process_list]) / num_procs,
+    )
+
+
+def _run_table_workload(file_name: str) -> BatchResult:
+    return run_workload(file_name, use_process_table=True)
+
+
+def _init_worker() -> None:
+    """Warm up a worker before it takes its first chunk"""
+    import mlfq, workload, process_table # noqa: F401 -- already imported under fork; loads them once under spawn
+
+
+def run_batch(file_names: list[str], workers: int | None = None, chunksize: int | None = None,
+              use_process_table: bool = False) -> list[BatchResult]:
+    """Simulate the workloads on a process pool; results are in the order of file_names"""
+    workers = workers or cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(file_names) // (workers * 4))
+
+    job = _run_table_workload if use_process_table else run_workload
+    with Pool(workers, initializer=_init_worker) as pool:
+        return pool.map(job, file_names, chunksize=chunksize)
+
+
+def print_results(results: list[BatchResult]) -> None:
+    """Print the aggregated metrics table"""
+    width = max([len(result.file_name) for result in results] + [len("File")])
+    print(f"{'File':<{width}}  {'Processes':>9}  {'Avg Turn-around (ms)':>20}  {'Avg Waiting (ms)':>16}")
+    for result in results:
+        if result.error:
+            print(f"{result.file_name:<{width}}  ERROR {result.error}")
+        else:
+            print(f"{result.file_name:<{width}}  {result.num_procs:>9}  {result.avg_turnaround_time:>20.2f}  {result.avg_waiting_time:>16.2f}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Simulate many workload files in parallel and print their metrics")
+    parser.add_argument("workloads", help="directory of workload files, or a glob such as 'runs/*.txt'")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=None, help="files handed to a worker at a time")
+    parser.add_argument("--process-table", action="store_true", help="store processes in a NumPy-backed columnar table")
+    args = parser.parse_args()
+
+    file_names = find_workloads(args.workloads)
+    if not file_names:
+        raise FileNotFoundError(f"Batch: no workload files found for {args.workloads}")
+    print_results(run_batch(file_names, args.workers, args.chunksize, args.process_table))
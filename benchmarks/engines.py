@@ -0,0 +1,208 @@
+"""
+Benchmark of the scheduler engines (mlfq.py, dee.py, njlr.py).
+
+Generates seeded synthetic workloads of increasing size (with the
+generator of generate.py) and runs every engine on each of them
+headlessly (full log written to /dev/null). Each run is done in a fresh
+interpreter so peak RSS is per run. Reports simulated ticks per second,
+wall time, peak RSS and the scaling exponent between consecutive sizes
+(1.0 = linear), and saves everything as JSON so results from two commits
+can be compared with --compare.
+
+Every engine runs on the core in mlfq.py with the scheduling rules of its
+variant (see VARIANTS there); njlr stops after 90 ticks, so its runs of
+longer workloads are marked truncated.
+
+Usage: python -m benchmarks.engines [--sizes 10,100,1000] [--format text|binary] [--output results.json] [--compare old.json]
+"""
+from __future__ import annotations
+from argparse import ArgumentParser
+from dataclasses import dataclass, asdict
+from importlib import import_module
+from math import log
+from os import devnull
+from pathlib import Path
+from subprocess import run, TimeoutExpired, CalledProcessError
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import json
+import platform
+import sys
+
+from generate import GeneratedWorkload, GeneratorConfig
+from workload import write_binary, write_text
+
+### CONSTANTS ###
+ENGINES: list[str] = ["mlfq", "mlfq-event", "dee", "njlr"]
+REGRESSION_RATIO: float = 1.10 # slower than this relative to the baseline is flagged
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one engine on one workload"""
+    engine: str
+    processes: int
+    burst: int
+    io_ratio: float
+    ticks: int = 0
+    wall_time: float = 0
+    ticks_per_sec: float = 0
+    peak_rss: int = 0 # bytes
+    status: str = "ok"
+
+
+def workload_config(num_procs: int, burst: int, io_ratio: float, seed: int) -> GeneratorConfig:
+    """Get the benchmark workload: 3 CPU bursts of mean `burst` per process (1 without I/O), I/O bursts `io_ratio` times
+    as long, all uniform; processes arrive two per `burst` ms on average, so the CPU is kept busy"""
+    return GeneratorConfig(num_procs, seed=seed, arrival_rate=2 / burst, cpu_dist="uniform", cpu_mean=burst,
+                           io_dist="uniform", io_mean=burst * io_ratio,
+                           min_bursts=3 if io_ratio > 0 else 1, max_bursts=3 if io_ratio > 0 else 1)
+
+
+def _peak_rss() -> int:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024 # kilobytes on Linux
+
+
+def run_engine(engine: str, file_name: str) -> tuple[int, float]:
+    """Run one engine on a workload with its output discarded; get the ticks simulated and the wall time"""
+    mlfq = import_module("mlfq")
+    name = "mlfq" if engine == "mlfq-event" else engine
+    if name not in mlfq.VARIANTS:
+        raise ValueError(f"Benchmark: unknown engine {engine}")
+
+    variant = mlfq.VARIANTS[name]
+    queues, level_allotments = mlfq.build_levels(variant.levels)
+    with open(devnull, "w") as sink:
+        scheduler = mlfq.MLFQScheduler(cpu=mlfq.IDLE_CPU, priority_queues=queues)
+        controller = mlfq.Controller(mlfq.View(scheduler, sink=sink), scheduler, event_driven=engine == "mlfq-event",
+                                     level_allotments=level_allotments, policy=variant.policy)
+        start = perf_counter()
+        controller.run(file_name)
+        return scheduler.time, perf_counter() - start
+
+
+def _max_time(engine: str) -> int | None:
+    variant = import_module("mlfq").VARIANTS.get(engine)
+    return variant.policy.max_time if variant is not None else None
+
+
+def measure(engine: str, file_name: str, timeout: float) -> tuple[int, float, int]:
+    """Run an engine in a fresh interpreter; get its ticks, wall time and peak RSS"""
+    completed = run([sys.executable, "-m", "benchmarks.engines", "--child", engine, file_name],
+                    capture_output=True, text=True, timeout=timeout, check=True,
+                    cwd=Path(__file__).resolve().parent.parent)
+    child = json.loads(completed.stdout.splitlines()[-1])
+    return child["ticks"], child["wall_time"], child["peak_rss"]
+
+
+def benchmark(engines: list[str], sizes: list[int], burst: int, io_ratio: float,
+              repeat: int, timeout: float, seed: int, file_format: str = "text") -> list[BenchmarkResult]:
+    """Run every engine on a workload of each size; wall times are the best of `repeat` runs"""
+    results: list[BenchmarkResult] = list()
+    with TemporaryDirectory() as tmp_dir:
+        for num_procs in sizes:
+            file_path = Path(tmp_dir) / f"workload_{num_procs}.{'bin' if file_format == 'binary' else 'txt'}"
+            write = write_binary if file_format == "binary" else write_text
+            write(GeneratedWorkload(workload_config(num_procs, burst, io_ratio, seed)), file_path)
+
+            for engine in engines:
+                result = BenchmarkResult(engine, num_procs, burst, io_ratio)
+                results.append(result)
+                try:
+                    runs = [measure(engine, str(file_path), timeout) for _ in range(repeat)]
+                except TimeoutExpired:
+                    result.status = "timeout"
+                    continue
+                except CalledProcessError as err:
+                    result.status = f"error: {err.stderr.strip().splitlines()[-1] if err.stderr.strip() else err}"
+                    continue
+
+                result.ticks = runs[0][0]
+                result.wall_time = min([wall_time for _, wall_time, _ in runs])
+                result.ticks_per_sec = result.ticks / result.wall_time if result.wall_time else 0
+                result.peak_rss = max([peak_rss for _, _, peak_rss in runs])
+                max_time = _max_time(engine)
+                if max_time is not None and result.ticks >= max_time:
+                    result.status = "truncated"
+    return results
+
+
+def scaling_exponents(results: list[BenchmarkResult], engine: str) -> list[tuple[int, float]]:
+    """Get log(wall time ratio) / log(size ratio) between consecutive sizes an engine finished"""
+    points = [(r.processes, r.wall_time) for r in results if r.engine == engine and r.status == "ok" and r.wall_time > 0]
+    return [(size, log(wall_time / prev_time) / log(size / prev_size))
+            for (prev_size, prev_time), (size, wall_time) in zip(points, points[1:])]
+
+
+def print_results(results: list[BenchmarkResult]) -> None:
+    """Print the measurements and the scaling exponents of each engine"""
+    print(f"{'Engine':<11} {'Procs':>8} {'Ticks':>10} {'Wall (s)':>10} {'Ticks/s':>12} {'Peak RSS (MB)':>14}  Status")
+    for r in results:
+        print(f"{r.engine:<11} {r.processes:>8} {r.ticks:>10} {r.wall_time:>10.3f} {r.ticks_per_sec:>12.0f} "
+              f"{r.peak_rss / 2**20:>14.1f}  {r.status}")
+
+    print("\nScaling exponent of wall time vs. processes (1.0 = linear)")
+    for engine in dict.fromkeys([r.engine for r in results]):
+        curve = ", ".join([f"{size}: {exponent:.2f}" for size, exponent in scaling_exponents(results, engine)])
+        print(f"{engine:<11} {curve or '-'}")
+
+
+def compare(results: list[BenchmarkResult], baseline_path: str) -> None:
+    """Print the wall time of each run relative to the same run in a saved baseline"""
+    baseline = {(r["engine"], r["processes"], r["burst"], r["io_ratio"]): r
+                for r in json.loads(Path(baseline_path).read_text())["results"]}
+
+    print(f"\nCompared to {baseline_path} (new / old wall time)")
+    for r in results:
+        old = baseline.get((r.engine, r.processes, r.burst, r.io_ratio))
+        if old is None or old["status"] != "ok" or r.status != "ok":
+            continue
+        ratio = r.wall_time / old["wall_time"]
+        flag = "  REGRESSION" if ratio > REGRESSION_RATIO else ""
+        print(f"{r.engine:<11} {r.processes:>8} {ratio:>8.2f}x{flag}")
+
+
+def _current_commit() -> str:
+    try:
+        return run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                   cwd=Path(__file__).resolve().parent.parent).stdout.strip()
+    except (OSError, CalledProcessError):
+        return ""
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark the scheduler engines on synthetic workloads")
+    parser.add_argument("--engines", default=",".join(ENGINES), help=f"comma-separated engines (default: {','.join(ENGINES)})")
+    parser.add_argument("--sizes", default="10,100,1000", help="comma-separated numbers of processes")
+    parser.add_argument("--burst", type=int, default=10, help="mean CPU burst length")
+    parser.add_argument("--io-ratio", type=float, default=1.0, help="mean I/O burst length relative to CPU bursts (0: no I/O)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest is kept")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds before a run is abandoned")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic workloads")
+    parser.add_argument("--format", choices=["text", "binary"], default="text", help="format the workloads are written in (default: text)")
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--child", nargs=2, metavar=("ENGINE", "WORKLOAD"), help="(internal) run one engine and print its measurements")
+    args = parser.parse_args()
+
+    if args.child:
+        ticks, wall_time = run_engine(*args.child)
+        print(json.dumps({"ticks": ticks, "wall_time": wall_time, "peak_rss": _peak_rss()}))
+        sys.exit()
+
+    results = benchmark(args.engines.split(","), [int(size) for size in args.sizes.split(",")],
+                        args.burst, args.io_ratio, args.repeat, args.timeout, args.seed, args.format)
+    print_results(results)
+
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "commit": _current_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {"burst": args.burst, "io_ratio": args.io_ratio, "repeat": args.repeat, "seed": args.seed, "format": args.format},
+            "results": [asdict(r) for r in results],
+        }, indent=2))
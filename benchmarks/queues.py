@@ -0,0 +1,39 @@
+"""
+Micro-benchmark for the queue backends.
+
+Measures the per-operation cost of requeueing (dequeue + add) on queues
+already holding 10 to 10^6 processes. The cost should stay flat as the
+queue grows.
+
+Usage: python -m benchmarks.queues
+"""
+from __future__ import annotations
+from time import perf_counter
+from mlfq import Process, SchedulerAlgorithm, RoundRobinAlgorithm, FCFSAlgorithm, SJFAlgorithm, Q1_QUANTUM
+
+SIZES: list[int] = [10**i for i in range(1, 7)]
+OPS: int = 100_000
+
+def fill_queue(queue: SchedulerAlgorithm, size: int) -> None:
+    """Fill a queue with `size` processes with distinct bursts"""
+    for i in range(size):
+        proc = Process(f"P{i}", 0, [i], [])
+        proc.burst_remaining = i
+        queue.add_process(proc)
+
+def time_requeue(queue: SchedulerAlgorithm, ops: int) -> float:
+    """Get the average time (ns) of a dequeue + add and of a dequeue + add to the front"""
+    start = perf_counter()
+    for _ in range(ops):
+        queue.add_process(queue.dequeue_process())
+        queue.add_process_start(queue.dequeue_process())
+    return (perf_counter() - start) / (2 * ops) * 1e9
+
+if __name__ == "__main__":
+    print(f"{'size':>10} {'RR (ns/op)':>12} {'FCFS (ns/op)':>14} {'SJF (ns/op)':>13}")
+    for size in SIZES:
+        row = []
+        for queue in [RoundRobinAlgorithm(Q1_QUANTUM), FCFSAlgorithm(), SJFAlgorithm()]:
+            fill_queue(queue, size)
+            row.append(time_requeue(queue, OPS))
+        print(f"{size:>10} {row[0]:>12.0f} {row[1]:>14.0f} {row[2]:>13.0f}")
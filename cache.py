@@ -0,0 +1,248 @@
+"""
+On-disk cache of finished simulations.
+
+Entries are keyed by a SHA-256 hash of the parsed processes (names,
+arrival times and bursts, in input order), the scheduler configuration
+(queue levels, allotments, context switch, policy, log format) and the
+engine version (a hash of the scheduler's source), so a cached result is
+never served for a workload, setting or engine it was not computed with.
+
+An entry holds what the metrics are computed from (the completion time,
+first run time and final queue of every process, and the final time) and,
+if the cache stores logs, the per-tick log as a zlib stream written while
+the simulation runs. Controller.run_cached() restores a hit into the
+scheduler and prints it as a fresh run would; a run that needs the log is
+only served by an entry that has one.
+
+Files are written to a temporary file of their own and renamed into
+place, so processes running the same workload at once do not interfere.
+The cache is kept under max_bytes (and max_entries, if given) by evicting
+the least recently used entries; a hit refreshes the entry's modification
+time, which is what "recently used" goes by. Logs whose entry was never
+put count as entries too, and temporary files left behind by a process
+that died are removed once they are STALE_TEMP_SECONDS old. An entry that
+cannot be read counts as a miss and is removed.
+
+Usage: python cache.py DIRECTORY [--clear]   (prints the number and size of the entries)
+"""
+from __future__ import annotations
+from argparse import ArgumentParser
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from functools import lru_cache
+from hashlib import sha256
+from os import replace, utime
+from tempfile import mkstemp
+from time import time_ns
+from pathlib import Path
+from typing import IO, Any
+import json
+import zlib
+
+### CONSTANTS ###
+CACHE_MAGIC: bytes = b"MLFQRC\x00\x01" # format name and version
+ENGINE_SOURCES: tuple[str, ...] = ("mlfq.py", "process_table.py") # modules whose code decides a run's result and log
+DEFAULT_MAX_BYTES: int = 256 << 20
+ENTRY_SUFFIX: str = ".entry"
+LOG_SUFFIX: str = ".log"
+TEMP_SUFFIX: str = ".tmp"
+STALE_TEMP_SECONDS: int = 3600 # age (since the last write) at which a temporary file is taken as left behind
+READ_SIZE: int = 1 << 20 # compressed bytes of log decompressed at a time
+
+
+@lru_cache(maxsize=None)
+def engine_version() -> str:
+    """Get a hash of the scheduler's source code"""
+    digest = sha256()
+    for name in ENGINE_SOURCES:
+        digest.update((Path(__file__).resolve().parent / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class CacheEntry:
+    """Result of a finished run"""
+    time: int # clock at the end of the run
+    processes: list[list[int]] = field(default_factory=list) # completion time, first run time, queue number per process
+    log_path: Path | None = None # compressed per-tick log, if stored
+
+    def log_chunks(self) -> Iterator[str]:
+        """Yield the cached log, decompressed a block at a time"""
+        if self.log_path is None:
+            return
+        decompressor = zlib.decompressobj()
+        with open(self.log_path, "rb") as file:
+            while block := file.read(READ_SIZE):
+                yield decompressor.decompress(block).decode()
+        yield decompressor.flush().decode()
+
+
+class LogRecorder:
+    """Compresses a run's log into the cache as it is written"""
+    def __init__(self, final_path: Path) -> None:
+        self._final_path = final_path
+        fd, temp_path = mkstemp(dir=final_path.parent, prefix=final_path.name + ".", suffix=TEMP_SUFFIX)
+        self._temp_path = Path(temp_path)
+        self._out: IO[bytes] = open(fd, "wb")
+        self._compressor = zlib.compressobj()
+
+    def write(self, text: str) -> None:
+        self._out.write(self._compressor.compress(text.encode()))
+
+    def commit(self) -> None:
+        self._out.write(self._compressor.flush())
+        self._out.close()
+        replace(self._temp_path, self._final_path)
+
+    def discard(self) -> None:
+        self._out.close()
+        self._temp_path.unlink(missing_ok=True)
+
+
+class ResultCache:
+    """Content-addressed store of finished runs, evicting the least recently used beyond its limits"""
+    def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int | None = None,
+                 store_log: bool = False) -> None:
+        if max_bytes <= 0 or (max_entries is not None and max_entries <= 0):
+            raise ValueError("Cache: the size and entry limits must be positive")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.store_log = store_log # keep the per-tick log of the runs put in the cache
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def key(self, process_list: Iterable[Any], config: dict[str, Any]) -> str:
+        """Get the key of a run of the given processes under the given configuration"""
+        digest = sha256(json.dumps({"engine": engine_version(), "config": config}, sort_keys=True).encode())
+        for proc in process_list:
+            digest.update(f"{proc.name};{proc.arrival_time};{','.join(map(str, proc.cpu_burst))};"
+                          f"{','.join(map(str, proc.io_burst))}\n".encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / (key + ENTRY_SUFFIX)
+
+    def _log_path(self, key: str) -> Path:
+        return self.directory / (key + LOG_SUFFIX)
+
+    def get(self, key: str, with_log: bool = False) -> CacheEntry | None:
+        """Get a cached run (None if there is none, it is unreadable, or with_log is set and it has no log)"""
+        entry_path, log_path = self._entry_path(key), self._log_path(key)
+        try:
+            data = entry_path.read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        try:
+            if not data.startswith(CACHE_MAGIC):
+                raise ValueError(f"Cache: {entry_path} is not a cache entry")
+            record = json.loads(zlib.decompress(data[len(CACHE_MAGIC):]))
+            entry = CacheEntry(int(record["time"]), list(record["processes"]))
+        except (zlib.error, ValueError, KeyError, TypeError):
+            self.misses += 1
+            self._remove(entry_path)
+            return None
+
+        if with_log and not log_path.exists():
+            self.misses += 1
+            return None
+        try:
+            utime(entry_path)
+        except FileNotFoundError:
+            pass # evicted by another process meanwhile; the entry read is still good
+        self.hits += 1
+        entry.log_path = log_path if with_log else None
+        return entry
+
+    def record_log(self, key: str) -> LogRecorder:
+        """Start storing the log of a run that will be put under the given key"""
+        return LogRecorder(self._log_path(key))
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Store a finished run (its log must already have been committed, if any) and evict down to the limits"""
+        entry_path = self._entry_path(key)
+        fd, temp_path = mkstemp(dir=self.directory, prefix=entry_path.name + ".", suffix=TEMP_SUFFIX)
+        with open(fd, "wb") as file:
+            file.write(CACHE_MAGIC + zlib.compress(json.dumps({"time": entry.time, "processes": entry.processes}).encode()))
+        replace(temp_path, entry_path)
+        self.evict()
+
+    def _files(self) -> list[tuple[int, Path, int]]:
+        """Get the files in the cache directory, with their modification time (ns) and size"""
+        files: list[tuple[int, Path, int]] = list()
+        for file_path in self.directory.iterdir():
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                continue # removed by another process meanwhile
+            files.append((stat.st_mtime_ns, file_path, stat.st_size))
+        return files
+
+    def _entries(self, files: list[tuple[int, Path, int]]) -> list[tuple[Path, int]]:
+        """Get the entries among the files, least recently used first, with their size (log included)"""
+        sizes = {file_path: size for _, file_path, size in files}
+        entries: list[tuple[int, Path, int]] = list()
+        for mtime, file_path, size in files:
+            if file_path.suffix == ENTRY_SUFFIX:
+                entries.append((mtime, file_path, size + sizes.get(file_path.with_suffix(LOG_SUFFIX), 0)))
+            elif file_path.suffix == LOG_SUFFIX and file_path.with_suffix(ENTRY_SUFFIX) not in sizes:
+                entries.append((mtime, file_path, size)) # log of a run whose entry was never put
+        return [(file_path, size) for _, file_path, size in sorted(entries)]
+
+    def _remove(self, file_path: Path) -> None:
+        """Remove an entry and its log"""
+        file_path.with_suffix(ENTRY_SUFFIX).unlink(missing_ok=True)
+        file_path.with_suffix(LOG_SUFFIX).unlink(missing_ok=True)
+
+    def _remove_temps(self, files: list[tuple[int, Path, int]], max_age: int) -> int:
+        """Remove the temporary files older than max_age seconds; get the size of the others"""
+        now = time_ns()
+        kept = 0
+        for mtime, file_path, size in files:
+            if file_path.suffix != TEMP_SUFFIX:
+                continue
+            if now - mtime >= max_age * 10**9:
+                file_path.unlink(missing_ok=True)
+            else:
+                kept += size
+        return kept
+
+    def entries(self) -> list[tuple[Path, int]]:
+        """Get the entries, least recently used first, with their size (log included); a log without its entry is one too"""
+        return self._entries(self._files())
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache is within its limits"""
+        files = self._files()
+        entries = self._entries(files)
+        total = sum([size for _, size in entries]) + self._remove_temps(files, STALE_TEMP_SECONDS)
+        count = len(entries)
+        for file_path, size in entries:
+            if total <= self.max_bytes and (self.max_entries is None or count <= self.max_entries):
+                break
+            self._remove(file_path)
+            total -= size
+            count -= 1
+
+    def clear(self) -> None:
+        """Remove every entry, and the temporary files of runs still in progress"""
+        files = self._files()
+        for file_path, _ in self._entries(files):
+            self._remove(file_path)
+        self._remove_temps(files, 0)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Show or clear a result cache")
+    parser.add_argument("directory", help="cache directory")
+    parser.add_argument("--clear", action="store_true", help="remove every entry")
+    args = parser.parse_args()
+
+    cache = ResultCache(args.directory)
+    if args.clear:
+        cache.clear()
+    entries = cache.entries()
+    print(f"{len(entries)} entries, {sum([size for _, size in entries]) / 2**20:.1f} MB (engine {engine_version()})")
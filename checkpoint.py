@@ -0,0 +1,66 @@
+"""
+Checkpoints of a running simulation.
+
+A checkpoint is the whole simulation state at the end of a tick (the
+scheduler with its processes, queues and timers, the Controller's
+bookkeeping and the loop variables carried between ticks), pickled and
+zlib-compressed behind a magic header. It is written to a temporary file
+and renamed over the previous checkpoint, so a crash while saving leaves
+the last good checkpoint in place.
+
+Checkpointer decides when to save: every N simulated ticks, every S
+seconds of wall time, or both. Controller.from_checkpoint() rebuilds a
+controller from a loaded state, and resume() continues the run.
+
+A checkpoint refers to the classes of the program that wrote it, so it is
+resumed by the same entry point (mlfq.py, or a program importing mlfq).
+"""
+from __future__ import annotations
+from os import replace
+from pathlib import Path
+from pickle import dumps, loads, HIGHEST_PROTOCOL
+from time import monotonic
+from typing import Any
+import zlib
+
+### CONSTANTS ###
+CHECKPOINT_MAGIC: bytes = b"MLFQCP\x00\x01" # format name and version
+COMPRESSION_LEVEL: int = 1 # fast; simulation state compresses well even so
+
+
+class Checkpointer:
+    """Saves the simulation state every `every_ticks` ticks and/or every `every_seconds` seconds"""
+    def __init__(self, out_path: str | Path, every_ticks: int | None = None, every_seconds: float | None = None) -> None:
+        if not every_ticks and not every_seconds:
+            raise ValueError("Checkpoint: give an interval in ticks, in seconds, or both")
+        self.path = Path(out_path)
+        self.every_ticks = every_ticks
+        self.every_seconds = every_seconds
+        self.saved: int = 0 # checkpoints written so far
+        self._next_tick: int = every_ticks or 0
+        self._next_wall: float = monotonic() + (every_seconds or 0)
+
+    def due(self, time: int) -> bool:
+        """Check whether a checkpoint should be saved at the given simulated time"""
+        if self.every_ticks and time >= self._next_tick:
+            return True
+        return bool(self.every_seconds) and monotonic() >= self._next_wall
+
+    def save(self, state: dict[str, Any], time: int) -> None:
+        """Write a checkpoint, replacing the previous one, and schedule the next"""
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        temp_path.write_bytes(CHECKPOINT_MAGIC + zlib.compress(dumps(state, HIGHEST_PROTOCOL), COMPRESSION_LEVEL))
+        replace(temp_path, self.path)
+        self.saved += 1
+
+        if self.every_ticks:
+            self._next_tick = time - time % self.every_ticks + self.every_ticks
+        self._next_wall = monotonic() + (self.every_seconds or 0)
+
+
+def load_checkpoint(file_path: str | Path) -> dict[str, Any]:
+    """Read the simulation state saved by a Checkpointer"""
+    data = Path(file_path).read_bytes()
+    if not data.startswith(CHECKPOINT_MAGIC):
+        raise ValueError(f"Checkpoint: {file_path} is not a checkpoint file")
+    return loads(zlib.decompress(data[len(CHECKPOINT_MAGIC):]))
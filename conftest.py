@@ -1,8 +1,8 @@
 import pytest
+from typing import Callable
 from mlfq import MLFQScheduler, View, Controller, RoundRobinAlgorithm, FCFSAlgorithm, SJFAlgorithm, Process, Q1_QUANTUM
 
-@pytest.fixture(autouse=True)
-def get_controller() -> Controller:
+def new_controller(**kwargs) -> Controller: #type:ignore
     scheduler: MLFQScheduler = \
         MLFQScheduler(
             priority_queues = [
@@ -13,5 +13,13 @@ def get_controller() -> Controller:
             cpu = Process.default()
     )
     view: View = View(scheduler)
-    controller: Controller = Controller(view, scheduler)
-    return controller
\ No newline at end of file
+    controller: Controller = Controller(view, scheduler, **kwargs)
+    return controller
+
+@pytest.fixture(autouse=True)
+def get_controller() -> Controller:
+    return new_controller()
+
+@pytest.fixture
+def make_controller() -> Callable[..., Controller]:
+    return new_controller
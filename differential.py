@@ -0,0 +1,132 @@
+"""
+Differential runner across the scheduler variants.
+
+Runs the variants in VARIANTS (the rules of mlfq.py, dee.py and njlr.py,
+all on the core in mlfq.py) on the same seeded synthetic workloads and
+compares each with a reference variant: workloads and processes whose
+completion times differ, processes the variant left unfinished, the
+change in average turnaround time (over the processes it finished) and
+the earliest tick at which the state (CPU, queue lengths, processes in
+I/O, processes done) differed. Each variant's throughput is measured on
+separate timed runs, in simulated ticks per second.
+
+Usage: python differential.py [--variants mlfq,dee,njlr] [--reference mlfq] [--workloads 20] [--procs 50] [--seed 0]
+"""
+from __future__ import annotations
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from itertools import zip_longest
+from time import perf_counter
+
+from mlfq import VARIANTS
+from generate import GeneratedWorkload, GeneratorConfig
+from simulation import Simulation
+
+
+@dataclass
+class VariantReport:
+    """Differences of one variant from the reference, summed over the workloads"""
+    variant: str
+    workloads: int = 0
+    differing_workloads: int = 0
+    processes: int = 0
+    differing_processes: int = 0 # completion time differs, or only one of the two finished
+    unfinished: int = 0
+    turnaround_delta: float = 0 # sum over the workloads of the change in average turnaround time
+    first_divergence: int | None = None # earliest tick at which the state differed, on any workload
+    ticks: int = 0
+    wall_time: float = 0
+
+    @property
+    def avg_turnaround_delta(self) -> float:
+        return self.turnaround_delta / self.workloads if self.workloads else 0
+
+    @property
+    def ticks_per_sec(self) -> float:
+        return self.ticks / self.wall_time if self.wall_time else 0
+
+
+def simulate(variant: str, config: GeneratorConfig, event_driven: bool = False) -> Simulation:
+    """Build a simulation of a generated workload under the rules of a variant"""
+    rules = VARIANTS[variant]
+    return Simulation(GeneratedWorkload(config), levels=rules.levels, policy=rules.policy, event_driven=event_driven)
+
+
+def completion_times(sim: Simulation) -> dict[str, int]:
+    """Get the completion time of each finished process"""
+    return {proc.name: proc.completion_time for proc in sim.scheduler.finished_processes}
+
+
+def avg_turnaround_time(sim: Simulation) -> float:
+    finished = sim.scheduler.finished_processes
+    return sum([proc.get_turnaround_time() for proc in finished]) / len(finished) if finished else 0
+
+
+def first_divergence(variant: str, reference: str, config: GeneratorConfig) -> int | None:
+    """Run both variants in lockstep; get the first tick at which their states differ (None if never)"""
+    for ours, theirs in zip_longest(simulate(variant, config).snapshots(), simulate(reference, config).snapshots()):
+        if ours != theirs:
+            return ours.time if ours is not None else theirs.time
+    return None
+
+
+def compare_variants(variants: list[str], reference: str, configs: list[GeneratorConfig],
+                     event_driven: bool = False) -> list[VariantReport]:
+    """Run every variant and the reference on each workload and report how the variants differ"""
+    reports = [VariantReport(variant) for variant in variants]
+    for config in configs:
+        expected = simulate(reference, config)
+        expected.run()
+        expected_times = completion_times(expected)
+
+        for report in reports:
+            sim = simulate(report.variant, config, event_driven)
+            start = perf_counter()
+            report.ticks += sim.run()
+            report.wall_time += perf_counter() - start
+
+            times = completion_times(sim)
+            names = [proc.name for proc in sim.scheduler.process_list]
+            differing = sum([times.get(name) != expected_times.get(name) for name in names])
+            report.workloads += 1
+            report.processes += len(names)
+            report.differing_processes += differing
+            report.unfinished += len(names) - len(times)
+            report.turnaround_delta += avg_turnaround_time(sim) - avg_turnaround_time(expected)
+            if differing == 0:
+                continue
+
+            report.differing_workloads += 1
+            tick = first_divergence(report.variant, reference, config)
+            if tick is not None and (report.first_divergence is None or tick < report.first_divergence):
+                report.first_divergence = tick
+    return reports
+
+
+def print_reports(reports: list[VariantReport], reference: str) -> None:
+    print(f"Compared to {reference}")
+    print(f"{'Variant':<8} {'Workloads':>10} {'Differing':>10} {'Processes':>10} {'Differing':>10} {'Unfinished':>11} "
+          f"{'Avg TAT +/-':>12} {'Diverges at':>12} {'Ticks/s':>10}")
+    for r in reports:
+        divergence = "-" if r.first_divergence is None else str(r.first_divergence)
+        print(f"{r.variant:<8} {r.workloads:>10} {r.differing_workloads:>10} {r.processes:>10} {r.differing_processes:>10} "
+              f"{r.unfinished:>11} {r.avg_turnaround_delta:>+12.2f} {divergence:>12} {r.ticks_per_sec:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Run the scheduler variants on generated workloads and report how they differ")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help=f"comma-separated variants (default: {','.join(VARIANTS)})")
+    parser.add_argument("--reference", choices=list(VARIANTS), default="mlfq", help="variant the others are compared with")
+    parser.add_argument("--workloads", type=int, default=20, help="number of generated workloads")
+    parser.add_argument("--procs", type=int, default=50, help="processes per workload")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first workload (the others follow)")
+    parser.add_argument("--event-driven", action="store_true", help="time the runs with quiet ticks skipped")
+    args = parser.parse_args()
+
+    variants = args.variants.split(",")
+    for variant in variants:
+        if variant not in VARIANTS:
+            parser.error(f"unknown variant {variant} (expected one of {', '.join(VARIANTS)})")
+
+    configs = [GeneratorConfig(args.procs, seed=args.seed + idx) for idx in range(args.workloads)]
+    print_reports(compare_variants(variants, args.reference, configs, args.event_driven), args.reference)
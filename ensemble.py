@@ -0,0 +1,190 @@
+"""
+Monte Carlo ensemble of one workload.
+
+Simulates many randomized variants of a workload under one scheduler
+configuration and reports the mean of each metric over the runs, with a
+confidence interval. Every variant jitters the arrival times (by up to
+±ARRIVAL ms) and scales every CPU and I/O burst by a factor drawn from
+[1 - BURST, 1 + BURST]; variants are numbered and seeded from --seed, so
+an ensemble can be reproduced.
+
+The base workload is handed to each worker once when the pool starts;
+workers generate their variants themselves and write each run's metrics
+straight into a shared-memory array preallocated by the parent (one row
+per run), so nothing is pickled back. The metrics are those printed by
+View.print_scheduler_metrics: average turnaround and waiting time, plus
+the makespan (time the last process finishes).
+
+Confidence intervals use the normal approximation (mean ± z·s/√n), which
+needs a few dozen runs to be accurate.
+
+Usage: python ensemble.py WORKLOAD [--runs 200] [--burst-jitter 0.2] [--arrival-jitter 5] [--levels SPEC] [--workers N]
+"""
+from __future__ import annotations
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from math import nan, isnan, sqrt
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count, devnull
+from random import Random
+from statistics import NormalDist, fmean, stdev
+
+from mlfq import MLFQScheduler, View, Controller, Process, IDLE_CPU, DEFAULT_LEVELS, build_levels
+from workload import ProcessRecord, open_workload
+
+### CONSTANTS ###
+METRICS: tuple[str, ...] = ("Avg Turn-around time", "Avg Waiting time", "Makespan")
+ITEM_SIZE: int = 8 # bytes per float64 in the results array
+
+
+@dataclass(frozen=True)
+class EnsembleConfig:
+    """Scheduler configuration shared by the runs, and how the workload is randomized"""
+    levels: str = DEFAULT_LEVELS
+    allotments: tuple[int, ...] = ()
+    context_switch: int = 0
+    burst_jitter: float = 0.2 # bursts are scaled by up to ± this fraction
+    arrival_jitter: int = 5 # arrivals move by up to ± this many ms
+    seed: int = 0
+
+    def validate(self) -> None:
+        if not 0 <= self.burst_jitter < 1:
+            raise ValueError("Ensemble: the burst jitter must be in [0, 1)")
+        if self.arrival_jitter < 0:
+            raise ValueError("Ensemble: the arrival jitter cannot be negative")
+
+
+@dataclass
+class MetricSummary:
+    """Mean of one metric over the runs, with its confidence interval"""
+    name: str
+    mean: float
+    std_dev: float
+    low: float
+    high: float
+
+
+def make_variant(records: list[ProcessRecord], config: EnsembleConfig, run: int) -> list[ProcessRecord]:
+    """Get the randomized variant of the workload for one run"""
+    rand = Random(f"{config.seed}:{run}")
+    jitter = config.burst_jitter
+
+    def scale(bursts: list[int]) -> list[int]:
+        return [max(1, round(burst * rand.uniform(1 - jitter, 1 + jitter))) for burst in bursts]
+
+    return [ProcessRecord(record.name,
+                          max(0, record.arrival_time + rand.randint(-config.arrival_jitter, config.arrival_jitter)),
+                          scale(record.cpu_burst), scale(record.io_burst))
+            for record in records]
+
+
+def simulate_run(records: list[ProcessRecord], config: EnsembleConfig) -> tuple[float, ...]:
+    """Simulate one variant without logging; get its metrics, in the order of METRICS"""
+    queues, level_allotments = build_levels(config.levels)
+    scheduler = MLFQScheduler(cpu=IDLE_CPU, priority_queues=queues, process_list=[Process(*record) for record in records])
+    with open(devnull, "w") as sink:
+        controller = Controller(View(scheduler, sink=sink, quiet=True), scheduler, event_driven=True, level_allotments=level_allotments)
+        controller.simulate(controller.merge_allotments(list(config.allotments)), config.context_switch)
+
+    processes = scheduler.process_list
+    return (
+        fmean([proc.get_turnaround_time() for proc in processes]),
+        fmean([proc.get_waiting_time() for proc in processes]),
+        float(max([proc.completion_time for proc in processes])),
+    )
+
+
+# Set once per worker: the base workload, the configuration and the shared results array
+_records: list[ProcessRecord] = list()
+_config: EnsembleConfig = EnsembleConfig()
+_shm: SharedMemory | None = None
+_results: memoryview | None = None
+
+def _init_worker(records: list[ProcessRecord], config: EnsembleConfig, shm_name: str) -> None:
+    global _records, _config, _shm, _results
+    _records, _config = records, config
+    _shm = SharedMemory(shm_name)
+    _results = _shm.buf.cast("d")
+
+def _run(run: int) -> None:
+    assert _results is not None
+    row = run * len(METRICS)
+    for offset, value in enumerate(simulate_run(make_variant(_records, _config, run), _config)):
+        _results[row + offset] = value
+
+
+def run_ensemble(records: list[ProcessRecord], config: EnsembleConfig, runs: int, workers: int | None = None) -> list[tuple[float, ...]]:
+    """Simulate the variants on a process pool; get the metrics of every run, in run order"""
+    config.validate()
+    if runs < 1:
+        raise ValueError("Ensemble: at least one run is needed")
+    if not records:
+        raise ValueError("Ensemble: the workload has no processes")
+
+    workers = min(workers or cpu_count() or 1, runs)
+    chunksize = max(1, runs // (workers * 4))
+    shm = SharedMemory(create=True, size=runs * len(METRICS) * ITEM_SIZE)
+    results = shm.buf.cast("d")
+    try:
+        for idx in range(len(results)):
+            results[idx] = nan # rows still NaN after the pool are runs that never reported
+        with Pool(workers, initializer=_init_worker, initargs=(records, config, shm.name)) as pool:
+            for _ in pool.imap_unordered(_run, range(runs), chunksize=chunksize):
+                pass
+
+        rows = [tuple(results[run * len(METRICS):(run + 1) * len(METRICS)]) for run in range(runs)]
+    finally:
+        # The view must go before the segment can be closed, even when a worker failed
+        try:
+            results.release()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    if any([isnan(value) for row in rows for value in row]):
+        raise RuntimeError("Ensemble: some runs did not report their metrics")
+    return rows
+
+
+def summarize_runs(rows: list[tuple[float, ...]], confidence: float = 0.95) -> list[MetricSummary]:
+    """Get the mean and confidence interval of every metric over the runs"""
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    summaries: list[MetricSummary] = list()
+    for idx, name in enumerate(METRICS):
+        values = [row[idx] for row in rows]
+        mean = fmean(values)
+        std_dev = stdev(values) if len(values) > 1 else 0
+        margin = z * std_dev / sqrt(len(values))
+        summaries.append(MetricSummary(name, mean, std_dev, mean - margin, mean + margin))
+    return summaries
+
+
+def print_summaries(summaries: list[MetricSummary], runs: int, confidence: float) -> None:
+    """Print the mean, standard deviation and confidence interval of each metric"""
+    interval = f"{confidence:.0%} CI"
+    print(f"{runs} runs")
+    print(f"{'Metric':<22}  {'Mean (ms)':>10}  {'Std dev':>8}  {interval:>20}")
+    for s in summaries:
+        print(f"{s.name:<22}  {s.mean:>10.2f}  {s.std_dev:>8.2f}  {f'[{s.low:.2f}, {s.high:.2f}]':>20}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Simulate randomized variants of a workload and report confidence intervals")
+    parser.add_argument("workload", help="text or binary workload file")
+    parser.add_argument("--runs", type=int, default=200, help="number of randomized variants")
+    parser.add_argument("--burst-jitter", type=float, default=0.2, help="scale each burst by up to ± this fraction")
+    parser.add_argument("--arrival-jitter", type=int, default=5, help="move each arrival by up to ± this many ms")
+    parser.add_argument("--levels", default=DEFAULT_LEVELS, help=f"queue levels, topmost first, as policy[:quantum[:allotment]] (default: {DEFAULT_LEVELS})")
+    parser.add_argument("--confidence", type=float, default=0.95, help="confidence level of the intervals")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the variants")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    with open_workload(args.workload) as workload:
+        records = list(workload.records())
+        config = EnsembleConfig(args.levels, tuple(workload.allotments), workload.context_switch,
+                                args.burst_jitter, args.arrival_jitter, args.seed)
+
+    rows = run_ensemble(records, config, args.runs, args.workers)
+    print_summaries(summarize_runs(rows, args.confidence), args.runs, args.confidence)
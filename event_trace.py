@@ -0,0 +1,176 @@
+"""
+Structured event trace of a simulation.
+
+The Controller reports each scheduling event (arrival, dispatch, preempt,
+quantum-expire, demote, io-start, io-end, done) with its time and process
+to a TraceWriter. read_trace() yields them back lazily, one event at a
+time, from either encoding.
+
+Binary encoding: the magic, then length-prefixed records
+    varint length, then the payload:
+    event   kind (1 byte), varint time since the previous event, varint process ID
+    name    0xFF, varint process ID, UTF-8 name  (written before the first event of a process)
+Process IDs are given in order of first appearance. Readers skip record
+kinds they do not know.
+
+JSONL encoding: one {"time", "event", "pid", "name"} object per line.
+
+Usage: python event_trace.py TRACE   (prints the events as JSONL)
+"""
+from __future__ import annotations
+from argparse import ArgumentParser
+from collections.abc import Iterator
+from mmap import mmap, ACCESS_READ
+from pathlib import Path
+from typing import IO, NamedTuple
+import json
+
+### CONSTANTS ###
+TRACE_MAGIC: bytes = b"MLFQTR\x00\x01" # format name and version
+EVENTS: tuple[str, ...] = ("arrival", "dispatch", "preempt", "quantum-expire", "demote", "io-start", "io-end", "done")
+ARRIVAL, DISPATCH, PREEMPT, QUANTUM_EXPIRE, DEMOTE, IO_START, IO_END, DONE = range(len(EVENTS))
+NAME_RECORD: int = 0xFF
+FLUSH_SIZE: int = 1 << 20 # bytes buffered before writing
+
+
+class TraceEvent(NamedTuple):
+    """One scheduling event"""
+    time: int
+    event: str
+    pid: int
+    name: str
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: mmap | bytes, pos: int) -> tuple[int, int]:
+    """Decode the varint at pos; get its value and the position after it"""
+    value, shift = 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class TraceWriter:
+    """Writes events in the binary ("binary") or JSONL ("jsonl") encoding"""
+    def __init__(self, out_path: str | Path, encoding: str = "binary") -> None:
+        if encoding not in ("binary", "jsonl"):
+            raise ValueError(f"Trace: unknown encoding {encoding}")
+        self._binary = encoding == "binary"
+        self._out: IO[bytes] = open(out_path, "wb")
+        self._buffer = bytearray(TRACE_MAGIC if self._binary else b"")
+        self._pids: dict[str, int] = dict()
+        self._last_time = 0
+
+    def __enter__(self) -> TraceWriter:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def emit(self, kind: int, time: int, name: str) -> None:
+        """Record that an event of the given kind happened to a process"""
+        if time < self._last_time:
+            raise ValueError(f"Trace: event at {time} is before the previous one at {self._last_time}")
+
+        pid = self._pids.get(name)
+        if pid is None:
+            pid = self._pids[name] = len(self._pids)
+            if self._binary:
+                payload = bytearray([NAME_RECORD])
+                _put_varint(payload, pid)
+                payload += name.encode()
+                _put_varint(self._buffer, len(payload))
+                self._buffer += payload
+
+        if self._binary:
+            payload = bytearray([kind])
+            _put_varint(payload, time - self._last_time)
+            _put_varint(payload, pid)
+            _put_varint(self._buffer, len(payload))
+            self._buffer += payload
+        else:
+            self._buffer += (json.dumps({"time": time, "event": EVENTS[kind], "pid": pid, "name": name}) + "\n").encode()
+        self._last_time = time
+
+        if len(self._buffer) >= FLUSH_SIZE:
+            self.flush()
+
+    @classmethod
+    def resume(cls, out_path: str | Path, state: dict[str, object]) -> TraceWriter:
+        """Reopen a trace saved with checkpoint_state(), dropping anything written after that point"""
+        writer = cls.__new__(cls)
+        writer._binary = state["binary"] #type:ignore
+        writer._out = open(out_path, "r+b")
+        writer._out.truncate(state["offset"]) #type:ignore
+        writer._out.seek(0, 2)
+        writer._buffer = bytearray()
+        writer._pids = dict(state["pids"]) #type:ignore
+        writer._last_time = state["last_time"] #type:ignore
+        return writer
+
+    def checkpoint_state(self) -> dict[str, object]:
+        """Flush the trace and get what resume() needs to continue it"""
+        self.flush()
+        return {"binary": self._binary, "offset": self._out.tell(), "pids": dict(self._pids), "last_time": self._last_time}
+
+    def flush(self) -> None:
+        self._out.write(self._buffer)
+        self._buffer.clear()
+
+    def close(self) -> None:
+        if not self._out.closed:
+            self.flush()
+            self._out.close()
+
+
+def _read_binary(data: mmap) -> Iterator[TraceEvent]:
+    names: list[str] = list()
+    time, pos = 0, len(TRACE_MAGIC)
+    while pos < len(data):
+        length, pos = _get_varint(data, pos)
+        end = pos + length
+        kind = data[pos]
+        if kind == NAME_RECORD:
+            pid, name_at = _get_varint(data, pos + 1)
+            names[len(names):] = [""] * (pid + 1 - len(names))
+            names[pid] = data[name_at:end].decode()
+        elif kind < len(EVENTS):
+            delta, next_pos = _get_varint(data, pos + 1)
+            pid, _ = _get_varint(data, next_pos)
+            time += delta
+            yield TraceEvent(time, EVENTS[kind], pid, names[pid])
+        pos = end
+
+
+def read_trace(file_path: str | Path) -> Iterator[TraceEvent]:
+    """Yield the events of a trace file in either encoding, in order"""
+    with open(file_path, "rb") as file:
+        if file.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            file.seek(0)
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield TraceEvent(record["time"], record["event"], record["pid"], record["name"])
+            return
+
+        with mmap(file.fileno(), 0, access=ACCESS_READ) as data:
+            yield from _read_binary(data)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Print the events of a trace file as JSONL")
+    parser.add_argument("trace_file", help="binary or JSONL trace")
+    args = parser.parse_args()
+
+    for trace_event in read_trace(args.trace_file):
+        print(json.dumps(trace_event._asdict()))
@@ -0,0 +1,216 @@
+"""
+Seeded synthetic workload generator.
+
+GeneratedWorkload is a Workload (like the file readers in workload.py)
+whose processes are drawn from random distributions as they are
+requested, so workloads of 10^7 processes can be written to the text or
+binary format, loaded into a process table or fed to the scheduler
+without a list of them ever being built. The same seed always gives the
+same workload.
+
+Arrival processes (arrival times are whole milliseconds, non-decreasing):
+    poisson   exponential inter-arrival times at `arrival_rate` processes/ms
+    bursty    batches arriving together, batch sizes geometric with mean
+              `batch_size`; same average rate as poisson
+    trace     poisson with the rate scaled by a trace of relative rates,
+              one per `trace_slot` ms, repeated as needed
+
+CPU and I/O bursts are drawn from "exponential", "uniform" (1 to 2 * mean),
+"lognormal" or "fixed" distributions; every burst is at least 1 ms.
+
+Feeding the scheduler directly:
+    controller.simulate(*view.load_workload(GeneratedWorkload(config)))
+
+Usage: python generate.py OUTPUT --procs N [--arrival poisson|bursty|trace] [--format text|binary] [--seed S]
+"""
+from __future__ import annotations
+from argparse import ArgumentParser
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from math import log
+from pathlib import Path
+from random import Random
+
+from process_table import ProcessTable
+from workload import ProcessRecord, write_binary, write_text
+
+### CONSTANTS ###
+ARRIVALS: tuple[str, ...] = ("poisson", "bursty", "trace")
+DISTRIBUTIONS: tuple[str, ...] = ("exponential", "uniform", "lognormal", "fixed")
+LOGNORMAL_SIGMA: float = 1.0
+
+
+@dataclass
+class GeneratorConfig:
+    """Parameters of a synthetic workload"""
+    num_procs: int
+    seed: int = 0
+    allotments: list[int] = field(default_factory=lambda: [8, 16])
+    context_switch: int = 1
+    arrival: str = "poisson"
+    arrival_rate: float = 0.1 # processes per ms, on average
+    batch_size: float = 8 # mean processes per batch (bursty)
+    trace: list[float] = field(default_factory=list) # relative arrival rate per slot (trace)
+    trace_slot: int = 100 # ms per trace slot
+    cpu_dist: str = "exponential"
+    cpu_mean: float = 10
+    io_dist: str = "exponential"
+    io_mean: float = 10
+    min_bursts: int = 1 # CPU bursts per process, uniform in [min_bursts, max_bursts]
+    max_bursts: int = 4
+
+    def validate(self) -> None:
+        if self.num_procs < 0:
+            raise ValueError("Generator: the number of processes cannot be negative")
+        if self.arrival not in ARRIVALS:
+            raise ValueError(f"Generator: unknown arrival process {self.arrival} (expected one of {', '.join(ARRIVALS)})")
+        for dist in (self.cpu_dist, self.io_dist):
+            if dist not in DISTRIBUTIONS:
+                raise ValueError(f"Generator: unknown distribution {dist} (expected one of {', '.join(DISTRIBUTIONS)})")
+        if self.arrival_rate <= 0 or self.batch_size < 1 or self.trace_slot <= 0:
+            raise ValueError("Generator: the arrival rate and trace slot must be positive and the batch size at least 1")
+        if self.arrival == "trace" and (not self.trace or min(self.trace) < 0 or max(self.trace) == 0):
+            raise ValueError("Generator: a trace needs non-negative rates, at least one of them positive")
+        if not 1 <= self.min_bursts <= self.max_bursts:
+            raise ValueError("Generator: expected 1 <= min_bursts <= max_bursts")
+
+
+def _poisson_arrivals(rand: Random, rate: float) -> Iterator[int]:
+    time = 0.0
+    while True:
+        time += rand.expovariate(rate)
+        yield int(time)
+
+
+def _bursty_arrivals(rand: Random, rate: float, batch_size: float) -> Iterator[int]:
+    time, stop_prob = 0.0, 1 / batch_size
+    while True:
+        time += rand.expovariate(rate / batch_size)
+        size = 1 if stop_prob == 1 else 1 + int(log(1 - rand.random()) / log(1 - stop_prob))
+        for _ in range(size):
+            yield int(time)
+
+
+def _trace_arrivals(rand: Random, rate: float, trace: list[float], slot: int) -> Iterator[int]:
+    """Non-homogeneous poisson arrivals, by spending unit exponentials over the trace's slots"""
+    time, slot_idx = 0.0, 0
+    while True:
+        budget = rand.expovariate(1)
+        while True:
+            slot_rate = rate * trace[slot_idx % len(trace)]
+            slot_end = (slot_idx + 1) * slot
+            if slot_rate * (slot_end - time) >= budget:
+                time += budget / slot_rate
+                break
+            budget -= slot_rate * (slot_end - time)
+            time, slot_idx = slot_end, slot_idx + 1
+        yield int(time)
+
+
+def _burst_sampler(rand: Random, dist: str, mean: float) -> Callable[[], int]:
+    if dist == "exponential":
+        return lambda: max(1, round(rand.expovariate(1 / mean)))
+    if dist == "uniform":
+        high = max(1, round(2 * mean))
+        return lambda: rand.randint(1, high)
+    if dist == "lognormal":
+        mu = log(mean) - LOGNORMAL_SIGMA ** 2 / 2 # so the mean is `mean`
+        return lambda: max(1, round(rand.lognormvariate(mu, LOGNORMAL_SIGMA)))
+    fixed = max(1, round(mean))
+    return lambda: fixed
+
+
+def load_trace(file_path: str | Path) -> list[float]:
+    """Read a trace of relative arrival rates, one number per line"""
+    return [float(line) for line in Path(file_path).read_text().split()]
+
+
+class GeneratedWorkload:
+    """Synthetic workload; processes are generated as they are iterated"""
+    def __init__(self, config: GeneratorConfig) -> None:
+        config.validate()
+        self.config = config
+        self.num_procs: int = config.num_procs
+        self.allotments: list[int] = list(config.allotments)
+        self.context_switch: int = config.context_switch
+
+    def __enter__(self) -> GeneratedWorkload:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        pass
+
+    def _arrivals(self, rand: Random) -> Iterator[int]:
+        config = self.config
+        if config.arrival == "bursty":
+            return _bursty_arrivals(rand, config.arrival_rate, config.batch_size)
+        if config.arrival == "trace":
+            return _trace_arrivals(rand, config.arrival_rate, config.trace, config.trace_slot)
+        return _poisson_arrivals(rand, config.arrival_rate)
+
+    def records(self) -> Iterator[ProcessRecord]:
+        """Yield the processes in arrival order; every call starts again from the seed"""
+        config = self.config
+        arrival_rand, burst_rand = Random(config.seed), Random(config.seed + 1)
+        cpu_burst = _burst_sampler(burst_rand, config.cpu_dist, config.cpu_mean)
+        io_burst = _burst_sampler(burst_rand, config.io_dist, config.io_mean)
+
+        for i, arrival_time in enumerate(islice(self._arrivals(arrival_rand), config.num_procs)):
+            num_bursts = burst_rand.randint(config.min_bursts, config.max_bursts)
+            yield ProcessRecord(
+                f"P{i}",
+                arrival_time,
+                [cpu_burst() for _ in range(num_bursts)],
+                [io_burst() for _ in range(num_bursts - 1)],
+            )
+
+    def process_table(self) -> ProcessTable:
+        """Generate the processes straight into a columnar process table"""
+        return ProcessTable.from_records(self.records())
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Generate a seeded synthetic workload")
+    parser.add_argument("output_file", help="workload file to write")
+    parser.add_argument("--procs", type=int, required=True, help="number of processes")
+    parser.add_argument("--format", choices=["text", "binary"], default="text", help="output format (default: text)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--allotments", type=int, nargs=2, default=[8, 16], metavar=("Q1", "Q2"), help="Q1 and Q2 time allotments")
+    parser.add_argument("--context-switch", type=int, default=1, help="context switch duration")
+    parser.add_argument("--arrival", choices=ARRIVALS, default="poisson", help="arrival process")
+    parser.add_argument("--arrival-rate", type=float, default=0.1, help="average processes arriving per ms")
+    parser.add_argument("--batch-size", type=float, default=8, help="mean batch size of bursty arrivals")
+    parser.add_argument("--trace", help="file of relative arrival rates, one per slot (for --arrival trace)")
+    parser.add_argument("--trace-slot", type=int, default=100, help="ms per trace slot")
+    parser.add_argument("--cpu-dist", choices=DISTRIBUTIONS, default="exponential")
+    parser.add_argument("--cpu-mean", type=float, default=10, help="mean CPU burst length")
+    parser.add_argument("--io-dist", choices=DISTRIBUTIONS, default="exponential")
+    parser.add_argument("--io-mean", type=float, default=10, help="mean I/O burst length")
+    parser.add_argument("--bursts", type=int, nargs=2, default=[1, 4], metavar=("MIN", "MAX"), help="CPU bursts per process")
+    args = parser.parse_args()
+
+    workload = GeneratedWorkload(GeneratorConfig(
+        num_procs=args.procs,
+        seed=args.seed,
+        allotments=args.allotments,
+        context_switch=args.context_switch,
+        arrival=args.arrival,
+        arrival_rate=args.arrival_rate,
+        batch_size=args.batch_size,
+        trace=load_trace(args.trace) if args.trace else [],
+        trace_slot=args.trace_slot,
+        cpu_dist=args.cpu_dist,
+        cpu_mean=args.cpu_mean,
+        io_dist=args.io_dist,
+        io_mean=args.io_mean,
+        min_bursts=args.bursts[0],
+        max_bursts=args.bursts[1],
+    ))
+    if args.format == "binary":
+        write_binary(workload, args.output_file)
+    else:
+        write_text(workload, args.output_file)
@@ -0,0 +1,80 @@
+"""
+Per-phase timing of the scheduler loop.
+
+PhaseTimer splits the run into consecutive laps: each call to lap(phase)
+charges the time since the previous lap to that phase. It keeps, per
+phase, the number of laps, their total time and a histogram of lap
+durations in power-of-two nanosecond buckets, which is enough for
+approximate percentiles without storing every lap.
+
+The Controller only calls the timer when one is given, so a run without
+one pays a single `is not None` check per phase.
+"""
+from __future__ import annotations
+from pathlib import Path
+from time import perf_counter_ns
+import json
+
+### CONSTANTS ###
+NUM_BUCKETS: int = 64 # bucket i holds laps of [2^(i-1), 2^i) ns
+
+
+class PhaseTimer:
+    """Cumulative time, lap count and duration histogram per phase"""
+    def __init__(self) -> None:
+        self.total_ns: dict[str, int] = dict()
+        self.calls: dict[str, int] = dict()
+        self.histograms: dict[str, list[int]] = dict()
+        self._last: int = perf_counter_ns()
+
+    def start(self) -> None:
+        """Start timing the first lap from now"""
+        self._last = perf_counter_ns()
+
+    def lap(self, phase: str) -> None:
+        """Charge the time since the previous lap to a phase"""
+        now = perf_counter_ns()
+        elapsed, self._last = now - self._last, now
+        if phase not in self.total_ns:
+            self.total_ns[phase], self.calls[phase], self.histograms[phase] = 0, 0, [0] * NUM_BUCKETS
+        self.total_ns[phase] += elapsed
+        self.calls[phase] += 1
+        self.histograms[phase][min(elapsed.bit_length(), NUM_BUCKETS - 1)] += 1
+
+    def percentile_ns(self, phase: str, percent: float) -> int:
+        """Upper bound of the histogram bucket holding the given percentile of a phase's laps"""
+        rank = self.calls[phase] * percent / 100
+        seen = 0
+        for bucket, count in enumerate(self.histograms[phase]):
+            seen += count
+            if count and seen >= rank:
+                return 1 << bucket
+        return 0
+
+    def report(self) -> str:
+        """Format the timings as a table, slowest phase first"""
+        grand_total = sum(self.total_ns.values()) or 1
+        lines = [
+            "# Phase Timings #",
+            f"{'Phase':<10}{'Calls':>11}{'Total (ms)':>13}{'Share':>8}{'Mean (us)':>11}{'p50 (us)':>10}{'p99 (us)':>10}",
+        ]
+        for phase in sorted(self.total_ns, key=lambda p: -self.total_ns[p]):
+            total, calls = self.total_ns[phase], self.calls[phase]
+            lines.append(f"{phase:<10}{calls:>11}{total / 1e6:>13.2f}{total / grand_total:>8.1%}{total / calls / 1e3:>11.2f}"
+                         f"{self.percentile_ns(phase, 50) / 1e3:>10.2f}{self.percentile_ns(phase, 99) / 1e3:>10.2f}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict[str, dict[str, object]]:
+        """Timings per phase; histogram buckets are [low_ns, high_ns, count], empty ones left out"""
+        return {
+            phase: {
+                "calls": self.calls[phase],
+                "total_ns": self.total_ns[phase],
+                "histogram": [[(1 << bucket) >> 1, 1 << bucket, count]
+                              for bucket, count in enumerate(self.histograms[phase]) if count],
+            }
+            for phase in self.total_ns
+        }
+
+    def to_json(self, out_path: str | Path) -> None:
+        Path(out_path).write_text(json.dumps(self.to_dict(), indent=2))
@@ -0,0 +1,186 @@
+"""
+Vectorized scheduling metrics.
+
+Metrics holds one NumPy array per per-process quantity of a finished
+simulation: arrival, completion and first-run time, total CPU and I/O time,
+and the queue the process finished in. Turnaround, waiting and response
+times are derived from these arrays. They can be summarized (mean,
+p50/p95/p99, max), broken down by final queue, and exported as CSV or NPZ.
+The per-process report printed by View is also formatted from them.
+
+NumPy is required; View falls back to its per-process loop without it.
+"""
+from __future__ import annotations
+from collections.abc import Iterator, Sequence
+from csv import writer
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, NamedTuple, TYPE_CHECKING
+
+from process_table import HAS_NUMPY, ProcessTable, np
+
+if TYPE_CHECKING:
+    from mlfq import MLFQScheduler, Process
+
+### CONSTANTS ###
+PERCENTILES: tuple[int, ...] = (50, 95, 99)
+CSV_COLUMNS: tuple[str, ...] = ("name", "arrival_time", "completion_time", "first_run_time", "queue_number",
+                                "turnaround_time", "waiting_time", "response_time")
+
+
+class Summary(NamedTuple):
+    """Distribution of one metric over a group of processes"""
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: int
+
+
+def summarize(values: Any) -> Summary:
+    """Summarize an integer array (all zeros if it is empty)"""
+    if len(values) == 0:
+        return Summary(0, 0, 0, 0, 0, 0)
+    p50, p95, p99 = np.percentile(values, PERCENTILES).tolist()
+    return Summary(len(values), int(values.sum()) / len(values), p50, p95, p99, int(values.max()))
+
+
+class Metrics:
+    """Per-process metric arrays of a finished simulation, in process list order"""
+    def __init__(self, names: Any, arrival_time: Any, completion_time: Any, first_run_time: Any,
+                 cpu_time: Any, io_time: Any, queue_number: Any) -> None:
+        if not HAS_NUMPY:
+            raise ImportError("Metrics requires numpy")
+
+        self.names = names
+        self.arrival_time = arrival_time
+        self.completion_time = completion_time
+        self.first_run_time = first_run_time
+        self.cpu_time = cpu_time
+        self.io_time = io_time
+        self.queue_number = queue_number
+
+        self.turnaround_times = completion_time - arrival_time
+        self.waiting_times = self.turnaround_times - cpu_time - io_time
+        self.response_times = first_run_time - arrival_time
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_processes(cls, process_list: Sequence[Process]) -> Metrics:
+        """Gather the metric arrays from Process objects, one column at a time"""
+        num_procs = len(process_list)
+
+        def column(name: str) -> Any:
+            return np.fromiter(map(attrgetter(name), process_list), dtype=np.int64, count=num_procs)
+
+        def burst_sums(name: str) -> Any:
+            return np.fromiter(map(sum, map(attrgetter(name), process_list)), dtype=np.int64, count=num_procs)
+
+        return cls(
+            np.array([proc.name for proc in process_list], dtype=str),
+            column("arrival_time"),
+            column("completion_time"),
+            column("first_run_time"),
+            burst_sums("cpu_burst"),
+            burst_sums("io_burst"),
+            column("queue_number"),
+        )
+
+    @classmethod
+    def from_table(cls, table: ProcessTable) -> Metrics:
+        """Use the columns of a process table directly"""
+        return cls(
+            table.names,
+            table.arrival_time,
+            table.completion_time,
+            table.first_run_time,
+            table._segment_sums(table.cpu_bursts, table.cpu_offsets),
+            table._segment_sums(table.io_bursts, table.io_offsets),
+            table.queue_number,
+        )
+
+    @classmethod
+    def from_scheduler(cls, scheduler: MLFQScheduler) -> Metrics:
+        """Get the metrics of a scheduler's processes, from its process table if it has one"""
+        if scheduler.process_table is not None:
+            return cls.from_table(scheduler.process_table)
+        return cls.from_processes(scheduler.process_list)
+
+    def _name_list(self) -> list[str]:
+        if self.names.dtype.kind == "S":
+            return [name.decode() for name in self.names.tolist()]
+        return self.names.tolist()
+
+    def summary(self) -> dict[str, Summary]:
+        """Summary of the turnaround, waiting and response times of all processes"""
+        return {
+            "turnaround": summarize(self.turnaround_times),
+            "waiting": summarize(self.waiting_times),
+            "response": summarize(self.response_times),
+        }
+
+    def by_queue(self) -> dict[int, dict[str, Summary]]:
+        """Summaries per queue the processes finished in"""
+        breakdown: dict[int, dict[str, Summary]] = dict()
+        for queue_number in np.unique(self.queue_number).tolist():
+            in_queue = self.queue_number == queue_number
+            breakdown[queue_number] = {
+                "turnaround": summarize(self.turnaround_times[in_queue]),
+                "waiting": summarize(self.waiting_times[in_queue]),
+                "response": summarize(self.response_times[in_queue]),
+            }
+        return breakdown
+
+    def report(self) -> Iterator[str]:
+        """Yield the per-process turnaround and waiting time report, in name order"""
+        order = np.argsort(self.names, kind="stable")
+        name_list = self._name_list()
+        names = [name_list[row] for row in order.tolist()]
+        completion_time = self.completion_time[order].tolist()
+        arrival_time = self.arrival_time[order].tolist()
+        turnaround_times = self.turnaround_times[order].tolist()
+        waiting_times = self.waiting_times[order].tolist()
+
+        yield "".join([f"Turn-around time for Process {name} : {completion} - {arrival} = {turnaround} ms\n"
+                       for name, completion, arrival, turnaround in zip(names, completion_time, arrival_time, turnaround_times)])
+        yield f"Average Turn-around time = {round(sum(turnaround_times)/len(self),2)} ms\n"
+        yield "".join([f"Waiting time for Process {name} : {waiting} ms\n" for name, waiting in zip(names, waiting_times)])
+
+    def format_summary(self) -> str:
+        """Format the summary and per-queue breakdown as a table"""
+        header = f"{'Metric':<18}{'Count':>9}{'Mean':>12}{'p50':>10}{'p95':>10}{'p99':>10}{'Max':>10}\n"
+
+        def rows(label: str, summaries: dict[str, Summary]) -> str:
+            return "".join([f"{f'{label}{metric}':<18}{s.count:>9}{s.mean:>12.2f}{s.p50:>10.2f}{s.p95:>10.2f}{s.p99:>10.2f}{s.max:>10}\n"
+                            for metric, s in summaries.items()])
+
+        text = header + rows("", self.summary())
+        for queue_number, summaries in self.by_queue().items():
+            text += rows(f"Q{queue_number} ", summaries)
+        return text
+
+    def to_csv(self, out_path: str | Path) -> None:
+        """Write one row per process"""
+        columns = [self.arrival_time, self.completion_time, self.first_run_time, self.queue_number,
+                   self.turnaround_times, self.waiting_times, self.response_times]
+        with open(out_path, "w", newline="") as out:
+            csv_writer = writer(out)
+            csv_writer.writerow(CSV_COLUMNS)
+            csv_writer.writerows(zip(self._name_list(), *[column.tolist() for column in columns]))
+
+    def to_npz(self, out_path: str | Path) -> None:
+        """Write the arrays to a NumPy .npz archive, one entry per CSV column"""
+        np.savez(
+            out_path,
+            name=self.names,
+            arrival_time=self.arrival_time,
+            completion_time=self.completion_time,
+            first_run_time=self.first_run_time,
+            queue_number=self.queue_number,
+            turnaround_time=self.turnaround_times,
+            waiting_time=self.waiting_times,
+            response_time=self.response_times,
+        )
@@ -12,21 +12,36 @@ Kevin D. Trinidad
 - Q1 (Top Priority Queue): RR with 4ms quantum
 - Q2: FCFS
 - Q3: SJF
+  (the default; other numbers and kinds of queues can be given with --levels)
 - no priority boosting
 - always prioritize top queue
 """
 from __future__ import annotations
-from typing import Protocol
+from argparse import ArgumentParser
+from typing import Any, NamedTuple, Protocol, TextIO, BinaryIO
+from collections import deque
+from collections.abc import Iterator, Sequence
 from os import path
-from io import TextIOWrapper
-from sys import argv
+from io import RawIOBase, BufferedIOBase
+from sys import maxsize
+import sys
 from pathlib import Path
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
+from heapq import heappush, heappop, heapify
+from process_table import ProcessTable, HAS_NUMPY
+from metrics import Metrics
+from instrumentation import PhaseTimer
+from checkpoint import Checkpointer, load_checkpoint
+from cache import ResultCache, CacheEntry, LogRecorder, DEFAULT_MAX_BYTES
+from event_trace import TraceWriter, ARRIVAL, DISPATCH, PREEMPT, QUANTUM_EXPIRE, DEMOTE, IO_START, IO_END, DONE
+from workload import Workload, WorkloadError, open_workload, is_binary_workload, parse_process_line
 
 ### CONSTANTS ###
 Q1_QUANTUM: int = 4
+DEFAULT_LEVELS: str = f"rr:{Q1_QUANTUM},fcfs,sjf"
+CHECKPOINTED_FIELDS: tuple[str, ...] = ("done_processes", "finished_quantum", "finished_io", "allotments", "context_switch")
 
-@dataclass
+@dataclass(slots=True)
 class Process:
     """Class for each Process"""
     name: str
@@ -40,6 +55,7 @@ class Process:
     io_remaining: int = field(default=0)
     queue_number: int = field(default=1)
     completion_time: int = field(default=0)
+    first_run_time: int = field(default=-1) # time the process first got the CPU (-1 if it never ran)
 
     """Function to calculate the turnaround time of the process"""
     def get_turnaround_time(self) -> int:
@@ -68,22 +84,123 @@ class Process:
     @classmethod
     def create_new_process(cls, inp: str) -> Process:
         """Create an instance of Process using user input"""
-        splitted_inp = inp.split(";")
-        return Process(
-            name =          splitted_inp[0],
-            arrival_time =  int(splitted_inp[1]),
-            cpu_burst =     [int(splitted_inp[i]) for i in range(2, len(splitted_inp)) if i%2==0], # even indices
-            io_burst =      [int(splitted_inp[i]) for i in range(2, len(splitted_inp)) if i%2!=0] # odd indices
-        )
+        return Process(*parse_process_line(inp))
 
     @classmethod
     def default(cls) -> Process:
-        return Process("",-1,[-1],[-1])
+        return IDLE_CPU
+
+
+class _IdleProcess(Process):
+    """Process standing in for an empty CPU; a single immutable instance is shared"""
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        for name, value in [("name", ""), ("arrival_time", -1), ("cpu_burst", (-1,)), ("io_burst", (-1,))]:
+            object.__setattr__(self, name, value)
+        for name in ["q1_run_counter", "idx", "quantum_passed", "burst_remaining", "io_remaining", "completion_time"]:
+            object.__setattr__(self, name, 0)
+        object.__setattr__(self, "queue_number", 1)
+        object.__setattr__(self, "first_run_time", -1)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("Process: the idle CPU cannot be modified")
+
+    def __reduce__(self) -> str:
+        return "IDLE_CPU" # unpickle as the shared instance, so `is IDLE_CPU` checks still hold
+
+IDLE_CPU: Process = _IdleProcess()
+
+
+class ArrivalTimeline:
+    """Processes sorted by (arrival time, name), consumed with a cursor as time passes"""
+    def __init__(self, process_list: Sequence[Process] | None = None, presorted: bool = False) -> None:
+        self._timeline = process_list if presorted and process_list is not None else \
+            sorted(process_list or [], key = lambda p: (p.arrival_time, p.name))
+        self._cursor = 0
+
+    def _skip_missed(self, time: int) -> None:
+        """Move the cursor past processes that arrived before the given time"""
+        while self._cursor < len(self._timeline) and self._timeline[self._cursor].arrival_time < time:
+            self._cursor += 1
+
+    def pop_arriving(self, time: int) -> list[Process]:
+        """Get the processes arriving at the given time, sorted by name"""
+        self._skip_missed(time)
+        start = self._cursor
+        while self._cursor < len(self._timeline) and self._timeline[self._cursor].arrival_time == time:
+            self._cursor += 1
+        return self._timeline[start:self._cursor]
+
+    def next_arrival_time(self, time: int) -> int:
+        """Get the earliest arrival time at or after the given time (-1 if none)"""
+        self._skip_missed(time)
+        if self._cursor < len(self._timeline):
+            return self._timeline[self._cursor].arrival_time
+        return -1
+
+
+class IOTimers:
+    """Processes in I/O, in a min-heap keyed on the time their I/O completes"""
+    def __init__(self) -> None:
+        self._heap: list[tuple[int, int, Process]] = list()
+        self._counter: int = 0 # insertion order, so processes finishing together keep their I/O order
+        self._sorted: list[Process] | None = list() # cached alphabetical listing, None when stale
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add(self, proc: Process, done_time: int) -> None:
+        """Start the I/O of a process, finishing at the given time"""
+        heappush(self._heap, (done_time, self._counter, proc))
+        self._counter += 1
+        self._sorted = None
+
+    def remove(self, proc: Process) -> None:
+        """Cancel the I/O of a process"""
+        self._heap = [entry for entry in self._heap if entry[2] is not proc]
+        heapify(self._heap)
+        self._sorted = None
+
+    def pop_done(self, time: int) -> list[Process]:
+        """Get the processes whose I/O completes by the given time, in the order they started"""
+        done: list[Process] = list()
+        while self._heap and self._heap[0][0] <= time:
+            done.append(heappop(self._heap)[2])
+            self._sorted = None
+        return done
+
+    @property
+    def next_done_time(self) -> int:
+        """Get the earliest I/O completion time (-1 if none)"""
+        return self._heap[0][0] if self._heap else -1
+
+    @property
+    def in_name_order(self) -> list[Process]:
+        if self._sorted is None:
+            self._sorted = sorted([entry[2] for entry in self._heap], key = lambda x: x.name)
+        return self._sorted
+
+
+class QueueView(Sequence[Process]):
+    """Read-only, ordered view of a queue for printing"""
+    def __init__(self, queue: Sequence[Process]) -> None:
+        self._queue = queue
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __getitem__(self, index): #type:ignore
+        return self._queue[index]
+
+    def __iter__(self) -> Iterator[Process]:
+        return iter(self._queue)
 
 
 class SchedulerAlgorithm(Protocol):
     """Protocol for Scheduler"""
-    _priority_queue: list[Process]
+    _priority_queue: deque[Process]
+    preemptive: bool = False # whether a better process at the head preempts a running one from the same level
 
     def sort(self) -> None:
         ...
@@ -93,52 +210,169 @@ class SchedulerAlgorithm(Protocol):
         self.sort()
 
     def add_process_start(self, proc: Process) -> None:
-        self._priority_queue = [proc] + self._priority_queue
+        self._priority_queue.appendleft(proc)
 
     def dequeue_process(self, index:int=0) -> Process:
-        return self._priority_queue.pop(index)
+        if index == 0:
+            return self._priority_queue.popleft()
+        proc = self._priority_queue[index]
+        del self._priority_queue[index]
+        return proc
+
+    def peek_process(self) -> Process:
+        return self._priority_queue[0]
 
     @property
-    def priority_queue(self) -> list[Process]:
-        return self._priority_queue
+    def is_empty(self) -> bool:
+        return not self._priority_queue
+
+    @property
+    def priority_queue(self) -> Sequence[Process]:
+        return QueueView(self._priority_queue)
+
+    def __len__(self) -> int:
+        return len(self._priority_queue)
+
+    @property
+    def quantum(self) -> int:
+        return 0 # no time slicing
 
 class RoundRobinAlgorithm(SchedulerAlgorithm):
     """Round Robin Scheduler Class"""
     def __init__(self, quantum: int):
-        self._priority_queue = list()
+        self._priority_queue = deque()
         self._quantum = quantum
 
     def sort(self) -> None:
         pass
 
+    @property
+    def quantum(self) -> int:
+        return self._quantum
+
 class FCFSAlgorithm(SchedulerAlgorithm):
     """First Come First Served Scheduler Class"""
     def __init__(self):
-        self._priority_queue = list()
+        self._priority_queue = deque()
 
     def sort(self) -> None:
         pass
 
 class SJFAlgorithm(SchedulerAlgorithm):
-    """Shortest Job First Scheduler Class"""
+    """Shortest Job First Scheduler Class, backed by a binary heap on (burst_remaining, name)"""
+    preemptive = True
+
     def __init__(self):
-        self._priority_queue = list()
+        self._heap: list[tuple[int, str, int, Process]] = list()
+        self._counter: int = 0 # insertion order, breaks ties the same way a stable sort would
+        self._sorted: list[Process] | None = list() # cached ordered view, None when stale
+
+    def _push(self, proc: Process) -> None:
+        heappush(self._heap, (proc.burst_remaining, proc.name, self._counter, proc))
+        self._counter += 1
+        self._sorted = None
 
     def sort(self) -> None:
-        self._priority_queue = sorted(self._priority_queue, key = lambda p: (p.burst_remaining, p.name))
+        """Re-key the heap, for when burst_remaining changed while queued"""
+        self._heap = [(proc.burst_remaining, proc.name, seq, proc) for _, _, seq, proc in self._heap]
+        heapify(self._heap)
+        self._sorted = None
+
+    def add_process(self, proc: Process) -> None:
+        self._push(proc)
+
+    def add_process_start(self, proc: Process) -> None:
+        # SJF has no notion of a front; the process takes its place by burst
+        self._push(proc)
+
+    def dequeue_process(self, index:int=0) -> Process:
+        if index == 0:
+            proc = heappop(self._heap)[3]
+        else:
+            entry = sorted(self._heap)[index]
+            self._heap.remove(entry)
+            heapify(self._heap)
+            proc = entry[3]
+        self._sorted = None
+        return proc
+
+    def peek_process(self) -> Process:
+        return self._heap[0][3]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._heap
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def priority_queue(self) -> Sequence[Process]:
+        if self._sorted is None:
+            self._sorted = [entry[3] for entry in sorted(self._heap)]
+        return QueueView(self._sorted)
+
+
+"""Function to build the queues described by a level spec such as "rr:4:8,fcfs::16,sjf"
+
+Each comma-separated level is policy[:quantum[:allotment]], topmost first. Round robin levels need a
+quantum; an allotment given here replaces the one from the input for that level (the last level has none).
+Returns the queues and the allotment of each level but the last (None where the input's should be used).
+"""
+def build_levels(spec: str) -> tuple[list[SchedulerAlgorithm], list[int | None]]:
+    queues: list[SchedulerAlgorithm] = list()
+    allotments: list[int | None] = list()
+    levels = [level.strip() for level in spec.split(",")]
+
+    for num, level in enumerate(levels, start=1):
+        policy, quantum, allotment = (level.split(":") + ["", ""])[:3]
+        try:
+            if policy == "rr":
+                if not quantum or int(quantum) <= 0:
+                    raise ValueError
+                queues.append(RoundRobinAlgorithm(int(quantum)))
+            elif policy in ("fcfs", "sjf") and not quantum:
+                queues.append(FCFSAlgorithm() if policy == "fcfs" else SJFAlgorithm())
+            else:
+                raise ValueError
+            if num == len(levels):
+                if allotment:
+                    raise ValueError
+            else:
+                allotments.append(int(allotment) if allotment else None)
+        except ValueError:
+            raise ValueError(f"Input: invalid queue level {num} \"{level}\" (expected rr:QUANTUM[:ALLOTMENT], fcfs[::ALLOTMENT] or sjf[::ALLOTMENT])")
+
+    return queues, allotments
 
 
 @dataclass
 class MLFQScheduler:
     cpu: Process
     switch_time_pass: int = field(default=0) # tracks time elapsed for context switch
-    process_list: list[Process] = field(default_factory=list)
+    process_list: Sequence[Process] = field(default_factory=list)
+    process_table: ProcessTable | None = field(default=None) # columnar storage backing process_list, if used
     arriving_list: list[Process] = field(default_factory=list)
-    io_list: list[Process] = field(default_factory=list)
+    arrival_timeline: ArrivalTimeline = field(default_factory=ArrivalTimeline)
+    io_timers: IOTimers = field(default_factory=IOTimers)
     finished_processes: list[Process] = field(default_factory=list) # tracks processes that are done with their burst
     priority_queues: list[SchedulerAlgorithm] = field(default_factory=list)
     time: int = field(default=0)
     is_idle: bool = field(default=True)
+    ready_levels: int = field(default=0) # bit i is set while priority_queues[i] is not empty
+
+    def __post_init__(self) -> None:
+        # An unnamed process passed in as the CPU means "no process"
+        if self.cpu.name == "":
+            self.cpu = IDLE_CPU
+        self.ready_levels = sum([1 << idx for idx, pq in enumerate(self.priority_queues) if not pq.is_empty])
+
+    """Function to get the number of the topmost non-empty queue (number of queues + 1 if all are empty)"""
+    @property
+    def highest_ready_level(self) -> int:
+        if not self.ready_levels:
+            return len(self.priority_queues) + 1
+        return (self.ready_levels & -self.ready_levels).bit_length() # lowest set bit
 
     """Function to add time"""
     @property
@@ -150,49 +384,70 @@ class MLFQScheduler:
     def is_finished(self) -> bool:
         return (len(self.finished_processes) == len(self.process_list))
 
+    """Function to index the loaded processes by arrival time"""
+    def build_arrival_timeline(self) -> None:
+        if self.process_table is not None:
+            self.arrival_timeline = ArrivalTimeline(self.process_table.rows_by_arrival(), presorted=True) #type:ignore
+        else:
+            self.arrival_timeline = ArrivalTimeline(self.process_list)
+
+    """Function to get the earliest arrival time at or after the current time (-1 if none)"""
+    @property
+    def next_arrival_time(self) -> int:
+        return self.arrival_timeline.next_arrival_time(self.time)
+
     """Function to get arriving processes"""
     def get_arriving_processes(self) -> None:
-        for process in self.process_list:
-            if process.arrival_time == self.time:
-                self.arriving_list.append(process)
+        has_leftovers = bool(self.arriving_list)
+        self.arriving_list.extend(self.arrival_timeline.pop_arriving(self.time))
 
-        self.arriving_list = sorted(self.arriving_list, key = lambda p: p.name)
+        # The timeline is already in name order; only leftovers need re-sorting
+        if has_leftovers:
+            self.arriving_list = sorted(self.arriving_list, key = lambda p: p.name)
 
     """Function to add recently arrived processes to the queue"""
     def add_arriving_to_queue(self) -> None:
-        while self.arriving_list:
-            self.priority_queues[0].add_process(self.arriving_list.pop(0))
+        if not self.arriving_list:
+            return
+        for proc in self.arriving_list:
+            self.priority_queues[0].add_process(proc)
+        self.ready_levels |= 1
+        self.arriving_list.clear()
 
     """Function to move a Queued Process to CPU"""
     def queue_to_CPU(self) -> None:
         old_process = self.current_process
 
-        if self.priority_queues[0].priority_queue and self.cpu.name == "":
-            self.cpu = self.priority_queues[0].dequeue_process()
+        if self.ready_levels and self.cpu is IDLE_CPU:
+            self.cpu = self.dequeue_highest()
 
-        elif self.priority_queues[1].priority_queue and self.cpu.name == "":
-            self.cpu = self.priority_queues[1].dequeue_process()
-
-        elif self.priority_queues[2].priority_queue and self.cpu.name == "":
-            self.cpu = self.priority_queues[2].dequeue_process()
-
-        if old_process != self.current_process:
+        if old_process is not self.current_process:
             self.switch_time_pass = 0 # Reset context switch counter
 
+    """Function to take the next process from the topmost non-empty queue (there must be one)"""
+    def dequeue_highest(self) -> Process:
+        level = self.highest_ready_level - 1
+        proc = self.priority_queues[level].dequeue_process()
+        if self.priority_queues[level].is_empty:
+            self.ready_levels &= ~(1 << level)
+        return proc
+
     """Function to add a process to proper queue"""
     def add_to_queue(self, queue_num: int, proc: Process) -> None:
         self.priority_queues[queue_num-1].add_process(proc)
+        self.ready_levels |= 1 << (queue_num-1)
 
     """Function to empty the cpu"""
     def empty_cpu(self) -> None:
         self.switch_time_pass = 0
-        self.cpu = Process("", -1, [-1], [-1], -1)
+        self.cpu = IDLE_CPU
 
     """Function to move a process down a queue"""
-    def move_process_down_queue(self) -> None:
+    def move_process_down_queue(self, keep_quantum: bool = False) -> None:
         queue_no = self.current_process.queue_number
         self.current_process.q1_run_counter = 0
-        self.current_process.quantum_passed = 0
+        if not keep_quantum:
+            self.current_process.quantum_passed = 0
         self.add_to_queue(queue_no+1, self.cpu)
         self.current_process.queue_number += 1 # update queue number
         self.empty_cpu() # empty cpu
@@ -204,12 +459,12 @@ class MLFQScheduler:
         self.cpu.quantum_passed = 0 # reset so it can be used for io count
         self.cpu.q1_run_counter = 0
         self.cpu.update_io()
-        self.io_list.append(self.cpu)
+        self.io_timers.add(self.cpu, self.time + self.cpu.io_remaining)
         self.empty_cpu() # empty cpu
 
     """Function to remove a process from the I/O"""
     def remove_from_io(self, proc:Process) -> None:
-        self.io_list.remove(proc)
+        self.io_timers.remove(proc)
 
     """Function to get the current process"""
     @property
@@ -219,37 +474,46 @@ class MLFQScheduler:
     """Function to get the list of processes in the I/O, sorted alphabetically"""
     @property
     def in_io(self) -> list[Process]:
-        return sorted(self.io_list, key = lambda x: x.name)
+        return self.io_timers.in_name_order
 
 class View:
-    def __init__(self, scheduler: MLFQScheduler) -> None:
+    def __init__(self, scheduler: MLFQScheduler, use_process_table: bool = False,
+                 sink: TextIO | BinaryIO | None = None, flush_size: int = 1 << 16, quiet: bool = False,
+                 bytes_written: int = 0) -> None:
+        if use_process_table and not HAS_NUMPY:
+            raise ImportError("View: the process table requires numpy")
         self._scheduler = scheduler
+        self._use_process_table = use_process_table
+        self._sink = sink # text or binary file to print to; None prints to the current sys.stdout
+        self._flush_size = flush_size # number of buffered characters that triggers a write
+        self._quiet = quiet # print only the SIMULATION DONE and metrics section
+        self._buffer: list[str] = list()
+        self._buffered: int = 0
+        self.log_recorder: LogRecorder | None = None # also receives the output as it is flushed, while set
+        self.bytes_written: int = bytes_written # encoded size of everything flushed to the sink (including before a resume)
 
     """Function to get the details about the scheduler"""
-    def get_scheduler_details(self) -> tuple[list[int], int]:
+    def get_scheduler_details(self, input_path: str | None = None) -> tuple[list[int], int]:
         allotments:list[int] = list()
         num_procs:int = 0
         context_switch_duration = 0
 
         # Case : input.txt file was provided
-        if (len(argv) > 1):
-            file_path = Path(argv[1])
-            if not path.exists(file_path) or ".txt" not in argv[1]:
+        if input_path is not None:
+            file_path = Path(input_path)
+            if not path.exists(file_path) or (".txt" not in input_path and not is_binary_workload(file_path)):
                 raise FileNotFoundError("Input: not a valid input file")
             try:
-                with open(file_path, "r") as input:
-                    # no input validation is done
-                    num_procs = int(input.readline().strip("\n "))
-                    allotments.append(int(input.readline().strip("\n ")))
-                    allotments.append(int(input.readline().strip("\n ")))
-                    context_switch_duration = int(input.readline().strip("\n "))
-                    self._get_process_details(num_procs, input)
-                    return allotments, context_switch_duration
+                with open_workload(file_path) as workload:
+                    return self.load_workload(workload)
+            except WorkloadError:
+                raise
             except:
                 raise FileNotFoundError("Input: unable to open provided input text file")
 
         # Case : no input.txt file was provided
-        print("# Enter Scheduler Details #")
+        self._write("# Enter Scheduler Details #\n")
+        self.flush()
         num_procs = self._input_int_loop(0, 12)
         allotments.append(self._input_int_loop(4, float('inf'))) # q1 time allotment
         allotments.append(self._input_int_loop(0, float('inf'))) # q2 time allotment
@@ -257,6 +521,11 @@ class View:
         self._get_process_details(num_procs)
         return allotments, context_switch_duration
 
+    def load_workload(self, workload: Workload) -> tuple[list[int], int]:
+        """Load the processes of an open workload; get its allotments and context switch duration"""
+        self._get_process_details(workload.num_procs, workload)
+        return workload.allotments, workload.context_switch
+
     def _input_int_loop(self, min_inp: int, max_inp: float) -> int:
         """ Keep asking user for input until valid
 
@@ -274,171 +543,501 @@ class View:
 
         return user_input
 
-    def _get_process_details(self, num_procs:int, input_file: TextIOWrapper | None = None) -> None:
+    def _get_process_details(self, num_procs:int, workload: Workload | None = None) -> None:
         """Get all process details from user input and put into a list"""
+        if self._use_process_table:
+            self._get_process_table(num_procs, workload)
+            return
+
         # Case : input.txt file was provided
-        if input_file != None:
-            for _ in range(num_procs):
-                self._scheduler.process_list.append(Process.create_new_process(input_file.readline().strip("\n ")))
+        if workload != None:
+            self._scheduler.process_list.extend([Process(*record) for record in workload.records()]) #type:ignore
             return
 
         # Case : no input.txt file was provided
-        print(f"# Enter {num_procs} Process Details #")
+        self._write(f"# Enter {num_procs} Process Details #\n")
+        self.flush()
         for _ in range(num_procs):
             self._scheduler.process_list.append(Process.create_new_process(input()))
 
+    def _get_process_table(self, num_procs:int, workload: Workload | None = None) -> None:
+        """Get all process details from user input into a columnar process table"""
+        if workload != None:
+            table = workload.process_table()
+        else:
+            self._write(f"# Enter {num_procs} Process Details #\n")
+            self.flush()
+            table = ProcessTable.from_lines(input() for _ in range(num_procs))
+
+        self._scheduler.process_table = table
+        self._scheduler.process_list = table.rows() #type:ignore
+
     def print_scheduler_log(self) -> None:
         """Prints the events from timestamp t=0 until all processes finish running"""
-        print("# Scheduling Results #")
+        self._write_log("# Scheduling Results #\n")
 
-    def print_scheduler_metrics(self) -> None:
+    def print_scheduler_metrics(self, io_counts_as_waiting: bool = False) -> None:
         """Prints the turnaround time per process, average turnaround time, waiting time"""
+        if HAS_NUMPY:
+            metrics = Metrics.from_scheduler(self._scheduler)
+            if io_counts_as_waiting:
+                metrics.waiting_times = metrics.waiting_times + metrics.io_time
+            for section in metrics.report():
+                self._write(section)
+            return
 
         sub_total = 0
         for proc in sorted(self._scheduler.process_list, key=lambda x: x.name):
             sub_total += proc.get_turnaround_time()
-            print(f"Turn-around time for Process {proc.name} : {proc.print_turnaround_time()}")
+            self._write(f"Turn-around time for Process {proc.name} : {proc.print_turnaround_time()}\n")
 
-        print(f"Average Turn-around time = {round(sub_total/len(self._scheduler.process_list),2)} ms")
+        self._write(f"Average Turn-around time = {round(sub_total/len(self._scheduler.process_list),2)} ms\n")
 
         for proc in sorted(self._scheduler.process_list, key=lambda x: x.name):
-            print(f"Waiting time for Process {proc.name} : {proc.print_waiting_time()}")
+            if io_counts_as_waiting:
+                self._write(f"Waiting time for Process {proc.name} : {proc.get_waiting_time() + sum(proc.io_burst)} ms\n")
+            else:
+                self._write(f"Waiting time for Process {proc.name} : {proc.print_waiting_time()}\n")
 
     def print_timestamp(self) -> None:
-        print(f"At Time = {self._scheduler.time}")
+        self._write_log(f"At Time = {self._scheduler.time}\n")
 
     def print_arriving_processes(self) -> None:
         """ Prints the details of process, with an optional prefix """
         if self._scheduler.arriving_list != []:
-            print(f"Arriving : [{self._proc_list_to_str(self._scheduler.arriving_list)}]")
+            self._write_log(f"Arriving : [{self._proc_list_to_str(self._scheduler.arriving_list)}]\n")
 
-    def _proc_list_to_str(self, lst: list[Process]) -> str:
+    def _proc_list_to_str(self, lst: Sequence[Process]) -> str:
         return ', '.join([proc.name for proc in lst])
 
     def print_done_processes(self, done_processes:list[Process]) -> None:
-        while(done_processes):
-            print(f"{done_processes[0].name} DONE")
-            done_processes.pop(0)
+        for proc in done_processes:
+            self._write_log(f"{proc.name} DONE\n")
+        done_processes.clear()
 
     def print_all_queues(self) -> None:
-        print("Queues : ", end="")
-        for idx, elem in enumerate(self._scheduler.priority_queues):
-            if idx == (len(self._scheduler.priority_queues) - 1):
-                print(f"[{self._proc_list_to_str(elem.priority_queue)}]")
-            else:
-                print(f"[{self._proc_list_to_str(elem.priority_queue)}]",end=";")
+        if self._quiet:
+            return
+        queues = ";".join([f"[{self._proc_list_to_str(pq.priority_queue)}]" for pq in self._scheduler.priority_queues])
+        self._write_log(f"Queues : {queues}\n")
 
     def print_cpu(self, proc_name: str = "") -> None:
-        print(f"CPU : {proc_name}")
+        self._write_log(f"CPU : {proc_name}\n")
 
     def print_io(self) -> None:
-        print(f"I/O : [{self._proc_list_to_str(self._scheduler.in_io)}]")
+        self._write_log(f"I/O : [{self._proc_list_to_str(self._scheduler.in_io)}]\n")
 
     def print_demotion(self, process_name: str) -> None:
         if process_name != "":
-            print(f"{process_name} DEMOTED")
+            self._write_log(f"{process_name} DEMOTED\n")
+
+    def print_quiet_ticks(self, num_ticks: int) -> None:
+        """Prints the log of the upcoming ticks in which only the burst and I/O counters change"""
+        if self._quiet:
+            return
+
+        queues = ";".join([f"[{self._proc_list_to_str(pq.priority_queue)}]" for pq in self._scheduler.priority_queues])
+        block = f"Queues : {queues}\nCPU : {self._scheduler.cpu.name}\n"
+        if self._scheduler.io_timers:
+            block += f"I/O : [{self._proc_list_to_str(self._scheduler.in_io)}]\n"
+        block += "\n"
+
+        for time in range(self._scheduler.time, self._scheduler.time + num_ticks):
+            self._write(f"At Time = {time}\n{block}")
+
+    def print_phase_timings(self, timer: PhaseTimer) -> None:
+        self._write("\n" + timer.report())
 
     def print_simulation_done(self) -> None:
-        print("SIMULATION DONE\n")
+        self._write("SIMULATION DONE\n\n")
 
     def print_newline(self) -> None:
-        print()
+        self._write_log("\n")
+
+    def replay_log(self, chunks: Iterator[str]) -> None:
+        """Prints a per-tick log recorded earlier"""
+        for chunk in chunks:
+            self._write_log(chunk)
+
+    @property
+    def quiet(self) -> bool:
+        return self._quiet
+
+    def _write(self, text: str) -> None:
+        """Adds text to the output buffer, flushing it once it holds flush_size characters"""
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._flush_size:
+            self.flush()
+
+    def _write_log(self, text: str) -> None:
+        """Adds part of the per-tick log to the output buffer (dropped in quiet mode)"""
+        if not self._quiet:
+            self._write(text)
+
+    def flush(self) -> None:
+        """Writes the buffered output to the sink"""
+        if not self._buffer:
+            return
+
+        sink = self._sink if self._sink is not None else sys.stdout
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        if self.log_recorder is not None:
+            self.log_recorder.write(text)
+
+        self.bytes_written += len(text) if text.isascii() else len(text.encode())
+        if isinstance(sink, (RawIOBase, BufferedIOBase)):
+            sink.write(text.encode())
+        else:
+            sink.write(text)
+
+    def checkpoint_state(self) -> dict[str, Any]:
+        """Options to rebuild this view with, and the size of the output it has flushed"""
+        return {"use_process_table": self._use_process_table, "flush_size": self._flush_size,
+                "quiet": self._quiet, "bytes_written": self.bytes_written}
+
+@dataclass(frozen=True)
+class Policy:
+    """Scheduling rules on which the variants of this scheduler (mlfq.py, dee.py, njlr.py) differ"""
+    max_time: int | None = None # last tick simulated, even if processes remain
+    max_quantum_expiries: int | None = None # quantum expiries allowed per visit to a round robin level (None: as many as fit the allotment)
+    demote_on_io: bool = True # a process using up its allotment with the burst that ends in I/O is demoted
+    early_io_requeue: bool = False # processes rejoin their queue in the tick their I/O ends, ahead of demoted processes and arrivals
+    io_return_by_name: bool = True # processes finishing I/O together rejoin their queues by name (False: in the order their I/O started)
+    per_level_allotment: bool = True # a demoted process starts the allotment of its new level afresh (False: allotments count the whole CPU burst so far)
+    switch_on_vacate: bool = False # the context switch runs as soon as the CPU is vacated, even if it then idles or gets the same process back
+    io_counts_as_waiting: bool = False # the reported waiting time includes time spent in I/O
+
+class Variant(NamedTuple):
+    """A variant of the scheduler: its queue levels (as for build_levels) and policy"""
+    levels: str
+    policy: Policy
+
+# dee.py schedules exactly as mlfq.py. njlr.py stops after tick 90, leaves Q3 in arrival order (its SJF sort discarded
+# the sorted list), lets a process use up one Q1 quantum at most, never demotes on I/O, requeues processes in the tick
+# their I/O ends (in I/O order), counts allotments over the whole burst, starts context switches on vacating the CPU
+# and reports waiting time including I/O
+VARIANTS: dict[str, Variant] = {
+    "mlfq": Variant(DEFAULT_LEVELS, Policy()),
+    "dee": Variant(DEFAULT_LEVELS, Policy()),
+    "njlr": Variant(f"rr:{Q1_QUANTUM},fcfs,fcfs", Policy(max_time=90, max_quantum_expiries=1, demote_on_io=False, early_io_requeue=True,
+                                                      io_return_by_name=False, per_level_allotment=False, switch_on_vacate=True,
+                                                      io_counts_as_waiting=True)),
+}
 
 class Controller:
-    def __init__(self, view: View, scheduler: MLFQScheduler) -> None:
+    def __init__(self, view: View, scheduler: MLFQScheduler, event_driven: bool = False, expand_log: bool = True,
+                 phase_timer: PhaseTimer | None = None, trace: TraceWriter | None = None,
+                 checkpointer: Checkpointer | None = None, level_allotments: list[int | None] | None = None,
+                 policy: Policy | None = None) -> None:
         self.view = view
         self.scheduler = scheduler
+        self.policy = policy or Policy()
+        self.phase_timer = phase_timer # per-phase timings of simulate(), if given
+        self.trace = trace # receives the scheduling events, if given
+        self.checkpointer = checkpointer # saves the simulation state periodically, if given
+        self.event_driven = event_driven # skip over ticks where nothing happens
+        self.skip_until: int = maxsize # event-driven skips stop at this time
+        self.level_allotments = level_allotments or list() # allotments replacing the input's, per level (None: keep)
+        self.expand_log = expand_log # print the log of skipped ticks
         self.done_processes: list[Process] = list()
         self.finished_quantum: list[Process] = list()
         self.finished_io: list[Process] = list()
-        self.min_quantum_iters: int = 0
+        self.allotments: list[int] = list() # time allotment of every level but the last
+        self.context_switch: int = 0
+        self.num_levels: int = 0
+        self.quanta: list[int] = list() # round robin quantum per level (0: no time slicing)
+        self.min_quantum_iters: list[int] = list() # quantum expiries per level before the allotment decides instead
+        self.preemptive_levels: list[bool] = list()
+
+    """Function to get the number of the topmost non-empty queue (number of queues + 1 if all are empty)"""
+    def get_min_queue_num(self) -> int:
+        return self.scheduler.highest_ready_level
+
+    """Function to derive the per-level settings from the queues and allotments"""
+    def configure_levels(self, allotments: list[int]) -> None:
+        queues = self.scheduler.priority_queues
+        self.num_levels = len(queues)
+        if len(allotments) < self.num_levels - 1:
+            raise ValueError(f"Input: {self.num_levels} queues need {self.num_levels - 1} time allotments, got {len(allotments)}")
+
+        self.quanta = [pq.quantum for pq in queues]
+        self.preemptive_levels = [pq.preemptive for pq in queues]
+
+        # Define the minimum number of times a process can run in a round robin level based on allotment and quantum
+        self.min_quantum_iters = list()
+        for level, quantum in enumerate(self.quanta):
+            if quantum == 0:
+                self.min_quantum_iters.append(0)
+            elif level == self.num_levels - 1: # no allotment; time slicing never stops
+                self.min_quantum_iters.append(maxsize)
+            elif allotments[level] % quantum != 0:
+                self.min_quantum_iters.append(allotments[level] // quantum)
+            else:
+                self.min_quantum_iters.append((allotments[level] - 1) // quantum)
+
+        if self.policy.max_quantum_expiries is not None:
+            self.min_quantum_iters = [min(iters, self.policy.max_quantum_expiries) for iters in self.min_quantum_iters]
 
     """Function for 'preemption'"""
     def get_topmost_process(self) -> None:
         # Find minimum queue number
-        min_queue_num = min(
-            [idx+1 if queue else 4 for idx, queue in
-            enumerate([pq.priority_queue for pq in self.scheduler.priority_queues])]
-        )
+        min_queue_num = self.get_min_queue_num()
 
         # If there's a process in a higher queue, load that process
         if min_queue_num < self.scheduler.cpu.queue_number:
             self.scheduler.add_to_queue(self.scheduler.cpu.queue_number, self.scheduler.cpu)
             self.scheduler.empty_cpu()
-            self.scheduler.queue_to_CPU()
+            self.load_cpu()
 
-        # For the case when there's more than one process in queue 3
-        if min_queue_num == 3 and self.scheduler.cpu.queue_number == 3:
-            try:
-                next_in_line = scheduler.priority_queues[min_queue_num-1].priority_queue[0]
-            except:
-                next_in_line = None
+        # For the case when there's more than one process in a preemptive (SJF) queue
+        if min_queue_num == self.scheduler.cpu.queue_number and self.scheduler.cpu is not IDLE_CPU and \
+           self.preemptive_levels[min_queue_num-1]:
+            next_in_line = None
+            if not self.scheduler.priority_queues[min_queue_num-1].is_empty:
+                next_in_line = self.scheduler.priority_queues[min_queue_num-1].peek_process()
 
-            # If there is more than one process in queue 3
+            # If there is more than one process in the queue
             if next_in_line != None:
 
                 # Check if the first process in the queue has a lesser burst time or is alphabetically "less" than the current
-                if (next_in_line.burst_remaining < scheduler.cpu.burst_remaining) or (next_in_line.burst_remaining == scheduler.cpu.burst_remaining and next_in_line.name < scheduler.cpu.name):
+                if (next_in_line.burst_remaining < self.scheduler.cpu.burst_remaining) or (next_in_line.burst_remaining == self.scheduler.cpu.burst_remaining and next_in_line.name < self.scheduler.cpu.name):
                     self.scheduler.add_to_queue(self.scheduler.cpu.queue_number, self.scheduler.cpu)
                     self.scheduler.empty_cpu()
-                    self.scheduler.queue_to_CPU()
+                    self.load_cpu()
 
         # If CPU is still empty, load a process from queue
-        if self.scheduler.cpu.name == "":
-            self.scheduler.queue_to_CPU()
+        if self.scheduler.cpu is IDLE_CPU:
+            self.load_cpu()
+
+    """Function to load the CPU from the queues, unless a context switch begun when it was vacated is still running"""
+    def load_cpu(self) -> None:
+        if self.policy.switch_on_vacate and self.scheduler.switch_time_pass != self.context_switch:
+            return
+        self.scheduler.queue_to_CPU()
 
     """Function to run the CPU for one timestamp"""
     def run_one_cpu_quantum(self) -> None:
+        if self.scheduler.cpu.first_run_time == -1:
+            self.scheduler.cpu.first_run_time = self.scheduler.time - 1 # time was already advanced for this tick
         self.scheduler.cpu.quantum_passed += 1
         self.scheduler.cpu.update_burst()
 
     """Function to check if process finished quantum"""
     def check_process_quantum(self) -> None:
         current_proc = self.scheduler.cpu
+        level = current_proc.queue_number - 1
+        quantum = self.quanta[level]
 
-        if (current_proc.quantum_passed%Q1_QUANTUM) == 0 and current_proc.queue_number == 1 and current_proc.q1_run_counter < self.min_quantum_iters and current_proc.quantum_passed != current_proc.cpu_burst[current_proc.idx]:
+        if quantum and (current_proc.quantum_passed%quantum) == 0 and current_proc.q1_run_counter < self.min_quantum_iters[level] and current_proc.burst_remaining != 0:
             current_proc.q1_run_counter += 1
             self.finished_quantum.append(current_proc)
+            if self.trace is not None:
+                self.trace.emit(QUANTUM_EXPIRE, self.scheduler.time, current_proc.name)
             self.scheduler.empty_cpu()
 
-    """Function to run the IO for one timestamp"""
-    def run_one_io_quantum(self) -> None:
-        for proc in self.scheduler.io_list:
-            proc.quantum_passed += 1
-            proc.update_io()
-
-    """Function to check which processes are done with IO and get them (sorted alphabetically)"""
+    """Function to check which processes are done with IO and get them (sorted alphabetically, unless the policy says otherwise)"""
     def check_proc_in_io(self) -> list[Process]:
         final_lst:list[Process] = []
-        idx_to_remove:list[int] = []
 
-        for idx, proc in enumerate(self.scheduler.io_list):
-            if proc.io_remaining == 0:
-                proc.idx += 1
-                proc.quantum_passed = 0
+        for proc in self.scheduler.io_timers.pop_done(self.scheduler.time):
+            if self.trace is not None:
+                self.trace.emit(IO_END, self.scheduler.time, proc.name)
+            proc.idx += 1
+            proc.quantum_passed = 0
+            proc.io_remaining = 0
+
+            # Check if there's still remaining CPU burst time for the process
+            if proc.idx != len(proc.cpu_burst):
+                self.set_burst_remaining(proc, proc.idx)
+                final_lst.append(proc)
+            else:
+                # No more bursts indicates that the process is done
+                self.done_processes.append(proc)
+                self.scheduler.finished_processes.append(proc)
+                proc.completion_time = self.scheduler.time
+                if self.trace is not None:
+                    self.trace.emit(DONE, self.scheduler.time, proc.name)
+
+        if not self.policy.io_return_by_name:
+            return final_lst
+        return sorted(final_lst, key = lambda p: p.name)
 
-                # Check if there's still remaining CPU burst time for the process
-                if proc.idx != len(proc.cpu_burst):
-                    self.set_burst_remaining(proc, proc.idx)
-                    final_lst.append(proc)
-                else:
-                    # No more bursts indicates that the process is done
-                    self.done_processes.append(proc)
-                    self.scheduler.finished_processes.append(proc)
-                    proc.completion_time = self.scheduler.time
+    """Function to count the upcoming ticks in which only the burst and I/O counters change"""
+    def get_quiet_ticks(self) -> int:
+        scheduler = self.scheduler
+        cpu = scheduler.cpu
 
-                idx_to_remove.append(idx)
+        # Something is still to be printed or requeued
+        if scheduler.is_finished or self.done_processes or self.finished_quantum or self.finished_io:
+            return 0
 
-        # Remove the finished IO's from the list
-        self.scheduler.io_list = [proc for idx, proc in enumerate(self.scheduler.io_list) if idx not in idx_to_remove]
+        # -- arrivals
+        next_arrival = scheduler.next_arrival_time
+        quiet_ticks = next_arrival - scheduler.time if next_arrival != -1 else maxsize
 
-        return sorted(final_lst, key = lambda p: p.name)
+        # -- I/O completions
+        if scheduler.io_timers:
+            quiet_ticks = min(quiet_ticks, scheduler.io_timers.next_done_time - scheduler.time - 1)
+
+        min_queue_num = self.get_min_queue_num()
+
+        # Idle CPU: nothing may be waiting in the queues (and no context switch may be counting down)
+        if cpu is IDLE_CPU:
+            if scheduler.ready_levels or (self.policy.switch_on_vacate and scheduler.switch_time_pass != self.context_switch):
+                return 0
+            return max(quiet_ticks, 0)
+
+        # Running CPU: context switch must be over and no preemption may be pending
+        if scheduler.switch_time_pass != self.context_switch or min_queue_num < cpu.queue_number:
+            return 0
+        level = cpu.queue_number - 1
+        if min_queue_num == cpu.queue_number and self.preemptive_levels[level]:
+            next_in_line = scheduler.priority_queues[level].peek_process()
+            if (next_in_line.burst_remaining, next_in_line.name) < (cpu.burst_remaining, cpu.name):
+                return 0
+
+        # -- burst end
+        quiet_ticks = min(quiet_ticks, cpu.burst_remaining - 1)
+
+        # -- allotment expiry
+        if cpu.queue_number < self.num_levels and cpu.quantum_passed < self.allotments[level]:
+            quiet_ticks = min(quiet_ticks, self.allotments[level] - cpu.quantum_passed - 1)
+
+        # -- quantum expiry
+        quantum = self.quanta[level]
+        if quantum and cpu.q1_run_counter < self.min_quantum_iters[level]:
+            quiet_ticks = min(quiet_ticks, quantum - 1 - cpu.quantum_passed % quantum)
+
+        return max(quiet_ticks, 0)
+
+    """Function to jump over ticks in which only the burst and I/O counters change"""
+    def skip_quiet_ticks(self, num_ticks: int) -> None:
+        scheduler = self.scheduler
+
+        if self.expand_log:
+            self.view.print_quiet_ticks(num_ticks)
+
+        if scheduler.cpu is not IDLE_CPU:
+            if scheduler.cpu.first_run_time == -1:
+                scheduler.cpu.first_run_time = scheduler.time
+            scheduler.cpu.quantum_passed += num_ticks
+            scheduler.cpu.burst_remaining -= num_ticks
+            scheduler.is_idle = False
+        else:
+            scheduler.switch_time_pass = self.context_switch
+            scheduler.is_idle = True
+
+        scheduler.time += num_ticks
 
     """Function to update the process' current remaining burst"""
     def set_burst_remaining(self, proc: Process, idx: int) -> None:
         proc.burst_remaining = proc.cpu_burst[idx]
 
-    def run(self) -> None:
+    """Function to get the state of the simulation at the end of a tick, flushing the output so far"""
+    def checkpoint_state(self, demoted_process: str, demoted: bool) -> dict[str, Any]:
+        self.view.flush()
+        return {
+            "scheduler": self.scheduler,
+            "controller": {name: getattr(self, name) for name in CHECKPOINTED_FIELDS},
+            "options": {"event_driven": self.event_driven, "expand_log": self.expand_log, "policy": self.policy},
+            "view": self.view.checkpoint_state(),
+            "loop": {"demoted_process": demoted_process, "demoted": demoted},
+            "phase_timer": self.phase_timer,
+            "trace": self.trace.checkpoint_state() if self.trace is not None else None,
+        }
+
+    """Function to rebuild a controller (with its scheduler and view) from a checkpoint"""
+    @classmethod
+    def from_checkpoint(cls, state: dict[str, Any], sink: TextIO | BinaryIO | None = None,
+                        trace: TraceWriter | None = None, checkpointer: Checkpointer | None = None) -> Controller:
+        scheduler: MLFQScheduler = state["scheduler"]
+        view = View(scheduler, sink=sink, **state["view"])
+        controller = cls(view, scheduler, phase_timer=state["phase_timer"], trace=trace, checkpointer=checkpointer, **state["options"])
+        for name, value in state["controller"].items():
+            setattr(controller, name, value)
+        return controller
+
+    """Function to continue a simulation rebuilt with from_checkpoint"""
+    def resume(self, state: dict[str, Any]) -> None:
+        self.simulate(self.allotments, self.context_switch, resume=state["loop"])
+
+    def run(self, input_path: str | None = None) -> None:
+        # Get scheduler details from input
+        allotments, context_switch = self.view.get_scheduler_details(input_path)
+        self.simulate(self.merge_allotments(allotments), context_switch)
+
+    """Function to run the scheduler, or restore an identical earlier run from a cache; get whether it was cached"""
+    def run_cached(self, cache: ResultCache, input_path: str | None = None) -> bool:
+        view = self.view
+        scheduler = self.scheduler
+        allotments, context_switch = self.view.get_scheduler_details(input_path)
+        allotments = self.merge_allotments(allotments)
+        key = cache.key(scheduler.process_list, self.cache_config(allotments, context_switch))
+
+        entry = cache.get(key, with_log=not view.quiet)
+        if entry is not None:
+            for proc, (completion_time, first_run_time, queue_number) in zip(scheduler.process_list, entry.processes):
+                proc.completion_time, proc.first_run_time, proc.queue_number = completion_time, first_run_time, queue_number
+            # Processes complete at time 1 at the earliest; those left at 0 did not finish (max_time policy)
+            scheduler.finished_processes = [proc for proc in scheduler.process_list if proc.completion_time > 0]
+            scheduler.time = entry.time
+            view.replay_log(entry.log_chunks())
+            self.finish()
+            return True
+
+        recorder = cache.record_log(key) if cache.store_log and not view.quiet else None
+        view.flush()
+        view.log_recorder = recorder
+        try:
+            for _ in self.iter_ticks(allotments, context_switch):
+                pass
+            view.flush()
+        except BaseException:
+            if recorder is not None:
+                recorder.discard()
+            raise
+        finally:
+            view.log_recorder = None
+
+        if recorder is not None:
+            recorder.commit()
+        cache.put(key, CacheEntry(scheduler.time, [[int(proc.completion_time), int(proc.first_run_time), int(proc.queue_number)]
+                                                   for proc in scheduler.process_list]))
+        self.finish()
+        return False
+
+    """Function to get the settings a run's result depends on, besides the processes"""
+    def cache_config(self, allotments: list[int], context_switch: int) -> dict[str, Any]:
+        return {
+            "queues": [[type(pq).__name__, pq.quantum] for pq in self.scheduler.priority_queues],
+            "allotments": allotments,
+            "context_switch": context_switch,
+            "policy": asdict(self.policy),
+            "compact_log": self.event_driven and not self.expand_log,
+        }
+
+    """Function to apply the level allotments given to the controller over those from the input"""
+    def merge_allotments(self, allotments: list[int]) -> list[int]:
+        merged = list(allotments)
+        for idx, allotment in enumerate(self.level_allotments):
+            if allotment is None:
+                continue
+            if idx > len(merged):
+                break # a level in between has no allotment; configure_levels reports it
+            merged[idx:idx+1] = [allotment]
+        return merged
+
+    """Function to run the scheduler on the processes already in the process list"""
+    def simulate(self, allotments: list[int], context_switch: int, resume: dict[str, Any] | None = None) -> None:
+        for _ in self.iter_ticks(allotments, context_switch, resume):
+            pass
+        self.finish()
+
+    """Function to run the scheduler loop one iteration (one tick, or more if quiet ticks are skipped) per next()"""
+    def iter_ticks(self, allotments: list[int], context_switch: int, resume: dict[str, Any] | None = None) -> Iterator[None]:
         # Other variables
         demoted_process: str = ""
         process_ran_name: str = ""
@@ -446,27 +1045,40 @@ class Controller:
         scheduler = self.scheduler
         sched_done = False
         demoted = False
-
-        # Get scheduler details from input
-        allotments, context_switch = view.get_scheduler_details()
-
-        # Define the minimum number of times a process can run in queue 1 based on allotment and quantum
-        if allotments[0] % Q1_QUANTUM != 0:
-            self.min_quantum_iters = allotments[0] // Q1_QUANTUM
+        timer = self.phase_timer
+        trace = self.trace
+        checkpointer = self.checkpointer
+        last_cpu: Process = IDLE_CPU # process on the CPU at the end of the previous tick
+        max_time = self.policy.max_time if self.policy.max_time is not None else maxsize
+        if timer is not None:
+            timer.start()
+
+        self.allotments, self.context_switch = allotments, context_switch
+        self.configure_levels(allotments)
+
+        if resume is None:
+            # Set initial burst remaining
+            for proc in self.scheduler.process_list:
+                self.set_burst_remaining(proc, proc.idx)
+
+            scheduler.build_arrival_timeline()
+            if self.policy.switch_on_vacate:
+                scheduler.switch_time_pass = context_switch # the CPU starts out free
+
+            view.print_scheduler_log()
         else:
-            self.min_quantum_iters = (allotments[0] - 1) // Q1_QUANTUM
-
-        # Set initial burst remaining
-        for proc in self.scheduler.process_list:
-            self.set_burst_remaining(proc, proc.idx)
+            # Continuing from a checkpoint: the rest of the state came back with the scheduler and controller
+            demoted_process, demoted = resume["demoted_process"], resume["demoted"]
+            last_cpu = scheduler.cpu
 
-        view.print_scheduler_log()
+        if timer is not None:
+            timer.lap("setup")
 
         while (not sched_done):
             cpu_ran: bool = False
 
             # Checker mainly for the final print of scheduler
-            if scheduler.is_finished:
+            if scheduler.is_finished or scheduler.time >= max_time:
                 sched_done = True
 
             # Print timestamp
@@ -474,6 +1086,9 @@ class Controller:
 
             # Get the arriving processes
             scheduler.get_arriving_processes()
+            if trace is not None:
+                for proc in scheduler.arriving_list:
+                    trace.emit(ARRIVAL, scheduler.time, proc.name)
 
             # Print processes that have arrived
             view.print_arriving_processes()
@@ -486,6 +1101,8 @@ class Controller:
 
             # Increment time
             scheduler.add_time
+            if timer is not None:
+                timer.lap("arrivals")
 
             # Add to the queue the processes that used up the quantum (returning from cpu)
             prev_process = None
@@ -499,26 +1116,40 @@ class Controller:
 
             self.finished_quantum = []
             self.finished_io = []
+            if timer is not None:
+                timer.lap("requeue")
 
             # Get the process at topmost queue
             self.get_topmost_process()
+            if trace is not None and scheduler.cpu is not last_cpu:
+                # Times are of the start of this tick; the clock has already been advanced
+                if last_cpu is not IDLE_CPU:
+                    trace.emit(PREEMPT, scheduler.time - 1, last_cpu.name)
+                if scheduler.cpu is not IDLE_CPU:
+                    trace.emit(DISPATCH, scheduler.time - 1, scheduler.cpu.name)
 
             # Check if there's NO need to context switch
             # -- idle
             # -- previous process is same as next process
             # -- demoted process is same as next process
-            if scheduler.is_idle or \
-               (prev_process == scheduler.cpu) or \
+            if self.policy.switch_on_vacate:
+                # -- the switch was made when the CPU was vacated
+                if scheduler.cpu is not IDLE_CPU:
+                    scheduler.switch_time_pass = context_switch
+            elif scheduler.is_idle or \
+               (prev_process is scheduler.cpu) or \
                (demoted_process == scheduler.cpu.name):
                 scheduler.switch_time_pass = context_switch
 
             # Print queues
             view.print_all_queues()
+            if timer is not None:
+                timer.lap("select")
 
             # Check for context switch
             old_cs = scheduler.switch_time_pass
 
-            if scheduler.switch_time_pass == context_switch and scheduler.cpu.name != "":
+            if scheduler.switch_time_pass == context_switch and scheduler.cpu is not IDLE_CPU:
                 # Run the CPU for one quantum
                 self.run_one_cpu_quantum()
                 cpu_ran = True
@@ -544,15 +1175,21 @@ class Controller:
                 view.print_cpu()
                 scheduler.is_idle = True
 
+            if timer is not None:
+                timer.lap("cpu")
+
             # Print the processes in io
-            if scheduler.io_list:
+            if scheduler.io_timers:
                 view.print_io()
 
-            # Run the io
-            self.run_one_io_quantum()
-
-            # Check if any process has finished their io; Adjust queue (sort alphabetically)
+            # Run the io: check if any process has finished their io; Adjust queue (sort alphabetically)
             self.finished_io = self.check_proc_in_io()
+            if self.policy.early_io_requeue:
+                for proc in self.finished_io:
+                    scheduler.add_to_queue(proc.queue_number, proc)
+                self.finished_io = []
+            if timer is not None:
+                timer.lap("io")
 
             # Print process that moved down a queue
             view.print_demotion(demoted_process)
@@ -561,40 +1198,146 @@ class Controller:
             # Adjust queue
             current_proc = scheduler.cpu
             # Check if process is done with current CPU burst
-            if current_proc.burst_remaining == 0 and current_proc.name != "":
+            if current_proc.burst_remaining == 0 and current_proc is not IDLE_CPU:
                 # Process has finished all bursts
                 if current_proc.idx >= len(current_proc.io_burst):
                     current_proc.completion_time = scheduler.time
                     self.done_processes.append(current_proc)
                     scheduler.finished_processes.append(current_proc)
+                    if trace is not None:
+                        trace.emit(DONE, scheduler.time, current_proc.name)
                 # Process still not done; move to IO
                 else:
                     demoted = False
-                    if current_proc.queue_number != 3 and current_proc.quantum_passed == allotments[current_proc.queue_number -1]:
+                    if current_proc.queue_number < self.num_levels and current_proc.quantum_passed == allotments[current_proc.queue_number -1] and \
+                       self.policy.demote_on_io:
                         demoted_process = current_proc.name
                         demoted = True
+                    if trace is not None:
+                        if demoted:
+                            trace.emit(DEMOTE, scheduler.time, current_proc.name)
+                        trace.emit(IO_START, scheduler.time, current_proc.name)
                     scheduler.move_to_io(demoted)
 
                 scheduler.empty_cpu()
 
             # Check if process ran out of allotment (No I/O)
-            elif current_proc.queue_number != 3:
-                # -- condition: process should not be in Q3 as no allotment for that
+            elif current_proc.queue_number < self.num_levels and current_proc is not IDLE_CPU:
+                # -- condition: process should not be in the last queue as no allotment for that
                 if current_proc.quantum_passed == allotments[current_proc.queue_number -1]:
                     demoted_process = current_proc.name
-                    scheduler.move_process_down_queue()
+                    if trace is not None:
+                        trace.emit(DEMOTE, scheduler.time, current_proc.name)
+                    scheduler.move_process_down_queue(keep_quantum=not self.policy.per_level_allotment)
                     scheduler.empty_cpu()
 
             view.print_newline()
-
+            last_cpu = scheduler.cpu
+            if timer is not None:
+                timer.lap("demotion")
+
+            # Jump straight to the next tick where something happens
+            if self.event_driven and not sched_done and demoted_process == "":
+                quiet_ticks = min(self.get_quiet_ticks(), self.skip_until - scheduler.time, max_time - scheduler.time)
+                if quiet_ticks > 0:
+                    self.skip_quiet_ticks(quiet_ticks)
+                if timer is not None:
+                    timer.lap("skip")
+
+            if checkpointer is not None and not sched_done and checkpointer.due(scheduler.time):
+                checkpointer.save(self.checkpoint_state(demoted_process, demoted), scheduler.time)
+                if timer is not None:
+                    timer.lap("checkpoint")
+
+            yield
+
+    """Function to print the end of the simulation and its metrics"""
+    def finish(self) -> None:
+        view = self.view
+        timer = self.phase_timer
         view.print_simulation_done()
-        view.print_scheduler_metrics()
+        view.print_scheduler_metrics(self.policy.io_counts_as_waiting)
+        if timer is not None:
+            timer.lap("metrics")
+            view.print_phase_timings(timer)
+        view.flush()
 
 if __name__ == "__main__":
-    queues: list[SchedulerAlgorithm] = [RoundRobinAlgorithm(Q1_QUANTUM), FCFSAlgorithm(), SJFAlgorithm()]
-
-    scheduler: MLFQScheduler = MLFQScheduler(cpu=Process("", -1, [-1], [-1]),priority_queues=queues)
-    view: View = View(scheduler)
-    controller: Controller = Controller(view, scheduler)
-
-    controller.run()
+    parser = ArgumentParser(description="MLFQ Scheduler")
+    parser.add_argument("input_file", nargs="?", help="input .txt or binary workload file (details are asked for if omitted)")
+    parser.add_argument("--variant", choices=list(VARIANTS), default="mlfq", help="scheduling rules of mlfq.py, dee.py or njlr.py")
+    parser.add_argument("--levels", help=f"queue levels, topmost first, as policy[:quantum[:allotment]] (default: the variant's, {DEFAULT_LEVELS} for mlfq)")
+    parser.add_argument("--event-driven", action="store_true", help="jump over ticks where nothing happens")
+    parser.add_argument("--compact-log", action="store_true", help="with --event-driven, do not print the skipped ticks")
+    parser.add_argument("--process-table", action="store_true", help="store processes in a NumPy-backed columnar table")
+    parser.add_argument("--quiet", action="store_true", help="print only the SIMULATION DONE and metrics section")
+    parser.add_argument("--flush-size", type=int, default=1 << 16, help="number of characters of output to buffer before writing")
+    parser.add_argument("--profile-phases", action="store_true", help="time each phase of the scheduler loop and print a report")
+    parser.add_argument("--profile-json", help="write the per-phase timings to a JSON file")
+    parser.add_argument("--trace", help="write the scheduling events to a trace file")
+    parser.add_argument("--trace-format", choices=["binary", "jsonl"], default="binary", help="encoding of the trace file")
+    parser.add_argument("--output", help="write the output to a file instead of the standard output")
+    parser.add_argument("--checkpoint", help="save the simulation state to this file periodically")
+    parser.add_argument("--checkpoint-ticks", type=int, help="simulated ticks between checkpoints")
+    parser.add_argument("--checkpoint-seconds", type=float, help="wall-clock seconds between checkpoints")
+    parser.add_argument("--resume", help="continue the simulation saved in a checkpoint file instead of reading input")
+    parser.add_argument("--metrics-summary", action="store_true", help="print percentiles and per-queue breakdowns after the metrics")
+    parser.add_argument("--metrics-csv", help="write the per-process metrics to a CSV file")
+    parser.add_argument("--metrics-npz", help="write the per-process metric arrays to a NumPy .npz file")
+    parser.add_argument("--cache", help="reuse the result of an identical earlier run stored in this directory (and store this one)")
+    parser.add_argument("--cache-log", action="store_true", help="also store the per-tick log in the cache, compressed")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / 2**20, help="size the cache is kept under")
+    args = parser.parse_args()
+    if args.cache and (args.resume or args.trace or args.checkpoint or args.profile_phases or args.profile_json):
+        parser.error("--cache cannot be combined with --resume, --trace, --checkpoint or profiling")
+
+    checkpointer = Checkpointer(args.checkpoint, args.checkpoint_ticks, args.checkpoint_seconds) if args.checkpoint else None
+    sink: BinaryIO | None = None
+
+    if args.resume:
+        # Continue where the checkpoint left off; the output and trace are cut back to that point
+        state = load_checkpoint(args.resume)
+        if args.output:
+            sink = open(args.output, "r+b")
+            sink.truncate(state["view"]["bytes_written"])
+            sink.seek(0, 2)
+        trace = TraceWriter.resume(args.trace, state["trace"]) if args.trace and state["trace"] is not None else None
+        controller: Controller = Controller.from_checkpoint(state, sink, trace, checkpointer)
+        scheduler: MLFQScheduler = controller.scheduler
+        phase_timer = controller.phase_timer
+        controller.resume(state)
+    else:
+        if args.output:
+            sink = open(args.output, "wb")
+        variant = VARIANTS[args.variant]
+        queues, level_allotments = build_levels(args.levels or variant.levels)
+
+        scheduler = MLFQScheduler(cpu=IDLE_CPU,priority_queues=queues)
+        view: View = View(scheduler, use_process_table=args.process_table, sink=sink, flush_size=args.flush_size, quiet=args.quiet)
+        phase_timer = PhaseTimer() if args.profile_phases or args.profile_json else None
+        trace = TraceWriter(args.trace, args.trace_format) if args.trace else None
+        controller = Controller(view, scheduler, event_driven=args.event_driven, expand_log=not args.compact_log,
+                                phase_timer=phase_timer, trace=trace, checkpointer=checkpointer,
+                                level_allotments=level_allotments, policy=variant.policy)
+
+        if args.cache:
+            controller.run_cached(ResultCache(args.cache, int(args.cache_max_mb * 2**20), store_log=args.cache_log), args.input_file)
+        else:
+            controller.run(args.input_file)
+
+    if trace is not None:
+        trace.close()
+    if sink is not None:
+        sink.close()
+
+    if phase_timer is not None and args.profile_json:
+        phase_timer.to_json(args.profile_json)
+
+    if args.metrics_summary or args.metrics_csv or args.metrics_npz:
+        metrics = Metrics.from_scheduler(scheduler)
+        if args.metrics_summary:
+            print(metrics.format_summary(), end="")
+        if args.metrics_csv:
+            metrics.to_csv(args.metrics_csv)
+        if args.metrics_npz:
+            metrics.to_npz(args.metrics_npz)
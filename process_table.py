@@ -0,0 +1,221 @@
+"""
+Struct-of-arrays process table for large workloads.
+
+Every per-process field lives in one contiguous NumPy array, and the CPU
+and I/O bursts of all processes are flattened into two arrays indexed by
+offsets. ProcessRow is a lightweight view over one row that has the same
+attributes and methods as mlfq.Process, so the scheduler, queues and View
+work on it unchanged. Views are only created for the rows being looked
+at, so an idle process costs nothing beyond its slots in the arrays.
+
+NumPy is optional; it is only needed when a ProcessTable is created.
+"""
+from __future__ import annotations
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, overload
+
+try:
+    import numpy as np
+    HAS_NUMPY: bool = True
+except ImportError: # numpy is only needed for the process table
+    np = None # type: ignore
+    HAS_NUMPY = False
+
+
+def _index_dtype(size: int) -> Any:
+    """Smallest integer type able to index `size` elements"""
+    return np.int32 if size < 2**31 else np.int64
+
+
+def _as_array(values: Iterable[int], dtype: Any) -> Any:
+    """Use NumPy integer arrays as they are (no copy), convert anything else to `dtype`"""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "i":
+        return values
+    return np.asarray(values, dtype=dtype)
+
+
+class ProcessTable:
+    """Columnar storage for all processes of a workload
+
+    Arguments that are already NumPy arrays (e.g. mapped from a binary
+    workload file) are used as they are, without copying.
+    """
+    def __init__(self, names: list[str] | Any, arrival_time: Iterable[int],
+                 cpu_bursts: Iterable[int], cpu_offsets: Iterable[int],
+                 io_bursts: Iterable[int], io_offsets: Iterable[int]) -> None:
+        if not HAS_NUMPY:
+            raise ImportError("ProcessTable requires numpy")
+
+        num_procs = len(names)
+        self.names = names if isinstance(names, np.ndarray) else np.array([name.encode() for name in names], dtype=bytes)
+        self.arrival_time = _as_array(arrival_time, np.int64)
+
+        # Flattened bursts; process i owns bursts[offsets[i]:offsets[i+1]]
+        self.cpu_bursts = _as_array(cpu_bursts, np.int32)
+        self.cpu_offsets = _as_array(cpu_offsets, _index_dtype(len(self.cpu_bursts)))
+        self.io_bursts = _as_array(io_bursts, np.int32)
+        self.io_offsets = _as_array(io_offsets, _index_dtype(len(self.io_bursts)))
+
+        # Simulation counters
+        self.q1_run_counter = np.zeros(num_procs, dtype=np.int32)
+        self.idx = np.zeros(num_procs, dtype=np.int32)
+        self.quantum_passed = np.zeros(num_procs, dtype=np.int32)
+        self.burst_remaining = np.zeros(num_procs, dtype=np.int32)
+        self.io_remaining = np.zeros(num_procs, dtype=np.int32)
+        self.queue_number = np.ones(num_procs, dtype=np.int32)
+        self.completion_time = np.zeros(num_procs, dtype=np.int64)
+        self.first_run_time = np.full(num_procs, -1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_records(cls, records: Iterable[tuple[str, int, Iterable[int], Iterable[int]]]) -> ProcessTable:
+        """Create a table from (name, arrival_time, cpu_burst, io_burst) records"""
+        names: list[str] = list()
+        arrival_time = array("q")
+        cpu_bursts, cpu_offsets = array("q"), array("q", [0])
+        io_bursts, io_offsets = array("q"), array("q", [0])
+
+        for name, arrival, cpu_burst, io_burst in records:
+            names.append(name)
+            arrival_time.append(arrival)
+            cpu_bursts.extend(cpu_burst)
+            io_bursts.extend(io_burst)
+            cpu_offsets.append(len(cpu_bursts))
+            io_offsets.append(len(io_bursts))
+
+        return cls(names, arrival_time, cpu_bursts, cpu_offsets, io_bursts, io_offsets)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> ProcessTable:
+        """Create a table from `name;arrival;cpu;io;cpu;...` lines"""
+        def records() -> Iterator[tuple[str, int, Iterable[int], Iterable[int]]]:
+            for line in lines:
+                splitted_inp = line.strip("\n ").split(";")
+                # cpu bursts at even indices, io bursts at odd indices
+                yield splitted_inp[0], int(splitted_inp[1]), map(int, splitted_inp[2::2]), map(int, splitted_inp[3::2])
+
+        return cls.from_records(records())
+
+    def rows(self) -> ProcessRows:
+        """Get the rows in input order"""
+        return ProcessRows(self)
+
+    def rows_by_arrival(self) -> ProcessRows:
+        """Get the rows sorted by (arrival_time, name)"""
+        order = np.lexsort((self.names, self.arrival_time))
+        return ProcessRows(self, order.astype(_index_dtype(len(self))))
+
+    def _segment_sums(self, bursts: Any, offsets: Any) -> Any:
+        """Sum each process' segment of a flattened burst array"""
+        cumulative = np.concatenate(([0], np.cumsum(bursts, dtype=np.int64)))
+        return cumulative[offsets[1:]] - cumulative[offsets[:-1]]
+
+    def turnaround_times(self) -> Any:
+        """Turnaround time of every process"""
+        return self.completion_time - self.arrival_time
+
+    def waiting_times(self) -> Any:
+        """Waiting time of every process"""
+        return self.turnaround_times() \
+            - self._segment_sums(self.cpu_bursts, self.cpu_offsets) \
+            - self._segment_sums(self.io_bursts, self.io_offsets)
+
+
+def _column(name: str) -> property:
+    """Property reading and writing one column of the row's table"""
+    def getter(self: ProcessRow) -> int:
+        return int(getattr(self._table, name)[self._row])
+
+    def setter(self: ProcessRow, value: int) -> None:
+        getattr(self._table, name)[self._row] = value
+
+    return property(getter, setter)
+
+
+class ProcessRows(Sequence["ProcessRow"]):
+    """Lazy sequence of row views, optionally in a given row order"""
+    def __init__(self, table: ProcessTable, order: Any = None) -> None:
+        self._table = table
+        self._order = order
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    @overload
+    def __getitem__(self, index: int) -> ProcessRow: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[ProcessRow]: ...
+    def __getitem__(self, index: int | slice) -> ProcessRow | list[ProcessRow]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ProcessRows: index out of range")
+        return ProcessRow(self._table, int(self._order[index]) if self._order is not None else index)
+
+
+class ProcessRow:
+    """View over one row of a ProcessTable, usable wherever a Process is"""
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: ProcessTable, row: int) -> None:
+        self._table = table
+        self._row = row
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ProcessRow):
+            return NotImplemented
+        return self._table is other._table and self._row == other._row
+
+    def __hash__(self) -> int:
+        return hash((id(self._table), self._row))
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._row].decode()
+
+    @property
+    def cpu_burst(self) -> Any:
+        return self._table.cpu_bursts[self._table.cpu_offsets[self._row]:self._table.cpu_offsets[self._row + 1]]
+
+    @property
+    def io_burst(self) -> Any:
+        return self._table.io_bursts[self._table.io_offsets[self._row]:self._table.io_offsets[self._row + 1]]
+
+    arrival_time = _column("arrival_time")
+    q1_run_counter = _column("q1_run_counter")
+    idx = _column("idx")
+    quantum_passed = _column("quantum_passed")
+    burst_remaining = _column("burst_remaining")
+    io_remaining = _column("io_remaining")
+    queue_number = _column("queue_number")
+    completion_time = _column("completion_time")
+    first_run_time = _column("first_run_time")
+
+    """Function to calculate the turnaround time of the process"""
+    def get_turnaround_time(self) -> int:
+        return self.completion_time - self.arrival_time
+
+    """Function to get the turnaround time in a string format for printing"""
+    def print_turnaround_time(self) -> str:
+        return f"{self.completion_time} - {self.arrival_time} = {self.get_turnaround_time()} ms"
+
+    """Function to calculate the waiting time"""
+    def get_waiting_time(self) -> int:
+        return self.get_turnaround_time() - int(self.cpu_burst.sum()) - int(self.io_burst.sum())
+
+    """Function to get the waiting time in a string format for printing"""
+    def print_waiting_time(self) -> str:
+        return f"{self.get_waiting_time()} ms"
+
+    """Function to update the time left for current burst"""
+    def update_burst(self):
+        self.burst_remaining -= 1
+
+    """Function to update the time left for current I/O"""
+    def update_io(self):
+        self.io_remaining = int(self.io_burst[self.idx]) - self.quantum_passed
@@ -0,0 +1,327 @@
+"""
+Simulation service.
+
+Runs a local asyncio server, on a Unix socket or a localhost TCP port,
+that takes workloads in the text format, queues them and simulates them
+on a bounded pool of worker processes. The workers are started once and
+import the scheduler once, so a request pays for neither interpreter
+startup nor imports.
+
+A request is one header line, a JSON object, followed by the workload:
+    size          bytes of workload text after the header
+    output        "log" for everything mlfq.py prints (the default), or
+                  "metrics" for only the SIMULATION DONE and metrics section
+    levels        queue levels, as for mlfq.py --levels (optional)
+    event_driven  skip stretches of time where nothing happens (optional)
+The reply is the output, streamed as the worker flushes it; a request
+that fails is answered (or ended) with a line starting with "ERROR: ".
+A connection carries one request.
+
+At most --workers runs are simulated at once and at most --backlog more
+wait for a worker; further clients are held, before their workload is
+read, until a run finishes. Output is sent as fast as the client reads
+it, so a slow reader keeps the unsent output of its run in memory.
+
+If a worker dies (killed, out of memory), the runs in progress fail and
+the pool is replaced by a new one, so later requests are served again.
+
+Usage: python service.py [--socket PATH | --port N] [--workers N] [--backlog N]
+       python service.py WORKLOAD --submit [--socket PATH | --port N] [--metrics]
+"""
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import RawIOBase
+from itertools import count
+from multiprocessing import Queue, get_context
+from os import cpu_count
+from pathlib import Path
+from queue import Empty
+from threading import Event, Thread
+from typing import Any
+import asyncio
+import json
+import sys
+
+from mlfq import MLFQScheduler, View, Controller, IDLE_CPU, DEFAULT_LEVELS, build_levels
+from workload import WorkloadBuffer
+
+### CONSTANTS ###
+DEFAULT_PORT: int = 8140
+DEFAULT_BACKLOG: int = 16 # requests waiting for a worker, beyond those being simulated
+MAX_WORKLOAD_BYTES: int = 64 << 20
+READ_SIZE: int = 1 << 16
+ERROR_PREFIX: bytes = b"ERROR: "
+OUTPUTS: tuple[str, ...] = ("log", "metrics")
+OUTPUT, ERROR, END = 0, 1, 2 # kinds of message a worker sends about a run
+PRELOAD: list[str] = ["mlfq", "workload"] # imported once by the fork server, before any worker starts
+PUMP_POLL_SECONDS: float = 0.2 # how often the thread reading the output of the workers checks whether to stop
+
+
+# Set once per worker: the queue the output of every run goes back on
+_messages: Queue | None = None
+
+def _init_worker(messages: Queue) -> None:
+    global _messages
+    _messages = messages
+
+
+class _RunOutput(RawIOBase):
+    """Sink sending the output of a run back to the service, a flushed chunk at a time"""
+    def __init__(self, run_id: int) -> None:
+        self._run_id = run_id
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        assert _messages is not None
+        _messages.put((self._run_id, OUTPUT, bytes(data)))
+        return len(data)
+
+
+def _ready() -> None:
+    pass
+
+
+def _simulate(run_id: int, options: dict[str, Any], data: bytes) -> None:
+    """Simulate one request in a worker, sending its output and then how it ended"""
+    assert _messages is not None
+    try:
+        queues, level_allotments = build_levels(options.get("levels") or DEFAULT_LEVELS)
+        scheduler = MLFQScheduler(cpu=IDLE_CPU, priority_queues=queues)
+        view = View(scheduler, sink=_RunOutput(run_id), quiet=options["output"] == "metrics")
+        controller = Controller(view, scheduler, event_driven=bool(options.get("event_driven")), level_allotments=level_allotments)
+        with WorkloadBuffer(data, "<request>") as workload:
+            allotments, context_switch = view.load_workload(workload)
+        controller.simulate(controller.merge_allotments(allotments), context_switch)
+    except Exception as err:
+        _messages.put((run_id, ERROR, str(err)))
+    else:
+        _messages.put((run_id, END, ""))
+
+
+class SimulationService:
+    """Server queueing simulation requests onto a bounded pool of worker processes"""
+    def __init__(self, workers: int | None = None, backlog: int = DEFAULT_BACKLOG) -> None:
+        if (workers is not None and workers < 1) or backlog < 0:
+            raise ValueError("Service: at least one worker is needed and the backlog cannot be negative")
+        self.workers: int = workers or cpu_count() or 1
+        self.backlog = backlog
+        # Workers are forked from a fork server rather than from the server itself, so that they
+        # do not inherit its client connections (which then stay open until the worker exits)
+        self._context = get_context("forkserver")
+        self._context.set_forkserver_preload(PRELOAD)
+        self._messages: Queue | None = None
+        self._pool: ProcessPoolExecutor | None = None
+        self._warm_up_task: asyncio.Task[None] | None = None
+        self._runs: dict[int, asyncio.Queue[tuple[int, Any]]] = dict() # messages of each run in progress
+        self._run_ids = count()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._pump: Thread | None = None
+        self._pump_stop: Event = Event()
+
+    async def start(self, socket_path: str | None = None, port: int = DEFAULT_PORT) -> asyncio.Server:
+        """Start listening on the Unix socket if given, or else on the localhost port"""
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.workers + self.backlog)
+        self._start_pool()
+        await self._warm_up()
+        if socket_path is not None:
+            return await asyncio.start_unix_server(self.handle, socket_path)
+        return await asyncio.start_server(self.handle, "127.0.0.1", port)
+
+    def close(self) -> None:
+        """Stop the workers, cancelling the runs that have not started"""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+        if self._pump is not None:
+            self._pump_stop.set()
+            self._pump.join()
+
+    def _start_pool(self) -> None:
+        """Start a pool of workers, with the queue their output comes back on and the thread reading it"""
+        self._messages = self._context.Queue()
+        self._pool = ProcessPoolExecutor(self.workers, self._context, initializer=_init_worker, initargs=(self._messages,))
+        self._pump_stop = Event()
+        self._pump = Thread(target=self._pump_messages, args=(self._messages, self._pump_stop), daemon=True)
+        self._pump.start()
+
+    async def _warm_up(self) -> None:
+        """Start every worker now, so that no request waits for one to start"""
+        assert self._loop is not None
+        await asyncio.gather(*[self._loop.run_in_executor(self._pool, _ready) for _ in range(self.workers)], return_exceptions=True)
+
+    def _restart_pool(self, broken_pool: ProcessPoolExecutor) -> None:
+        """Replace a pool one of whose workers died, which fails every run submitted to it from then on"""
+        assert self._loop is not None
+        if broken_pool is not self._pool:
+            return # already replaced
+        # The old queue is left alone: the worker that died may have held its lock
+        self._pump_stop.set()
+        self._start_pool()
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        self._warm_up_task = self._loop.create_task(self._warm_up())
+
+    def _submit(self, run_id: int, options: dict[str, Any], data: bytes) -> asyncio.Future[None]:
+        """Queue a run on the pool, replacing the pool first if it was found broken"""
+        assert self._loop is not None and self._pool is not None
+        pool = self._pool
+        try:
+            future = self._loop.run_in_executor(pool, _simulate, run_id, options, data)
+        except BrokenProcessPool:
+            self._restart_pool(pool)
+            pool = self._pool
+            future = self._loop.run_in_executor(pool, _simulate, run_id, options, data)
+        future.add_done_callback(lambda future: self._check_worker(run_id, pool, future))
+        return future
+
+    def _pump_messages(self, messages: Queue, stop: Event) -> None:
+        """Hand the messages of the workers over to the event loop until told to stop (runs on its own thread)"""
+        assert self._loop is not None
+        while not stop.is_set():
+            try:
+                message = messages.get(timeout=PUMP_POLL_SECONDS)
+            except Empty:
+                continue
+            self._loop.call_soon_threadsafe(self._deliver, *message)
+        messages.close()
+
+    def _deliver(self, run_id: int, kind: int, payload: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is not None:
+            run.put_nowait((kind, payload))
+
+    def _check_worker(self, run_id: int, pool: ProcessPoolExecutor, future: asyncio.Future[None]) -> None:
+        """End a run whose worker failed without reporting, and replace the pool if a worker died"""
+        error = future.exception() if not future.cancelled() else None
+        if error is None:
+            return
+        self._deliver(run_id, ERROR, f"Service: the worker failed ({error!r})")
+        if isinstance(error, BrokenProcessPool):
+            self._restart_pool(pool)
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple[dict[str, Any], bytes]:
+        """Read the header and the workload of a request"""
+        try:
+            options = json.loads(await reader.readline())
+        except ValueError:
+            raise ValueError("Service: the header must be one line of JSON") from None
+        if not isinstance(options, dict):
+            raise ValueError("Service: the header must be a JSON object")
+
+        size = options.get("size")
+        if not isinstance(size, int) or not 0 < size <= MAX_WORKLOAD_BYTES:
+            raise ValueError(f"Service: the size must be between 1 and {MAX_WORKLOAD_BYTES} bytes")
+        if options.setdefault("output", "log") not in OUTPUTS:
+            raise ValueError(f"Service: the output must be one of {', '.join(OUTPUTS)}")
+        try:
+            return options, await reader.readexactly(size)
+        except asyncio.IncompleteReadError:
+            raise ValueError("Service: the workload is shorter than its size") from None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one connection: read its request, queue it and stream back the output"""
+        assert self._loop is not None and self._slots is not None
+        async with self._slots:
+            try:
+                options, data = await self._read_request(reader)
+            except ValueError as err:
+                await self._close(writer, ERROR_PREFIX + f"{err}\n".encode())
+                return
+
+            run_id = next(self._run_ids)
+            run: asyncio.Queue[tuple[int, Any]] = asyncio.Queue()
+            self._runs[run_id] = run
+            try:
+                self._submit(run_id, options, data)
+
+                # Keep the slot until the run ends, even if the client goes away
+                connected = True
+                while (message := await run.get())[0] == OUTPUT:
+                    if connected:
+                        try:
+                            writer.write(message[1])
+                            await writer.drain()
+                        except ConnectionError:
+                            connected = False
+            finally:
+                del self._runs[run_id]
+
+            kind, payload = message
+            await self._close(writer, ERROR_PREFIX + f"{payload}\n".encode() if kind == ERROR and connected else b"")
+
+    async def _close(self, writer: asyncio.StreamWriter, data: bytes) -> None:
+        try:
+            writer.write(data)
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def submit(workload: bytes, socket_path: str | None = None, port: int = DEFAULT_PORT, output: str = "log",
+                 levels: str | None = None, event_driven: bool = False) -> AsyncIterator[bytes]:
+    """Send a workload to a running service; yield its output as it arrives"""
+    if socket_path is not None:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    else:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    options: dict[str, Any] = {"size": len(workload), "output": output, "event_driven": event_driven}
+    if levels is not None:
+        options["levels"] = levels
+    try:
+        writer.write(json.dumps(options).encode() + b"\n" + workload)
+        await writer.drain()
+        while chunk := await reader.read(READ_SIZE):
+            yield chunk
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def _serve(args: Namespace) -> None:
+    service = SimulationService(args.workers, args.backlog)
+    try:
+        server = await service.start(args.socket, args.port)
+        print(f"Serving on {args.socket or f'127.0.0.1:{args.port}'} with {service.workers} workers", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+async def _submit(args: Namespace) -> int:
+    tail = b""
+    async for chunk in submit(Path(args.workload).read_bytes(), args.socket, args.port,
+                              "metrics" if args.metrics else "log", args.levels, args.event_driven):
+        sys.stdout.buffer.write(chunk)
+        tail = (tail + chunk)[-READ_SIZE:]
+    sys.stdout.flush()
+    return 1 if tail.rstrip(b"\n").rpartition(b"\n")[2].startswith(ERROR_PREFIX) else 0
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Serve simulations of workloads over a local socket, or submit one")
+    parser.add_argument("workload", nargs="?", help="text workload file to submit (with --submit)")
+    parser.add_argument("--submit", action="store_true", help="send the workload to a running service and print the output")
+    parser.add_argument("--socket", help="Unix socket to listen or connect on (default: TCP on localhost)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"localhost TCP port (default: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--backlog", type=int, default=DEFAULT_BACKLOG, help="requests that may wait for a worker")
+    parser.add_argument("--metrics", action="store_true", help="get only the metrics, not the per-tick log")
+    parser.add_argument("--levels", default=None, help="queue levels, topmost first, as policy[:quantum[:allotment]]")
+    parser.add_argument("--event-driven", action="store_true", help="skip stretches of time where nothing happens")
+    args = parser.parse_args()
+
+    if args.submit:
+        if args.workload is None:
+            parser.error("--submit needs a workload file")
+        sys.exit(asyncio.run(_submit(args)))
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
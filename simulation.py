@@ -0,0 +1,121 @@
+"""
+Library interface to the scheduler.
+
+Simulation drives a Controller from code instead of from the command
+line: it is built from a Workload (or a workload file), runs a number of
+ticks with step(), up to a point in simulated time with run_until() or to
+the end with run(), and prints nothing unless given an output to write
+the usual log to. snapshots() yields a small Snapshot of the state after
+every tick, so runs of any length can be followed in constant memory.
+
+    with open_workload("set1.txt") as workload:
+        sim = Simulation(workload, event_driven=True)
+    for snapshot in sim.snapshots():
+        ...
+    print(sim.metrics().format_summary())
+
+In event-driven mode a skip over quiet ticks never passes the time given
+to step() or run_until(), and snapshots() repeats the state for each
+skipped tick (nothing but burst and I/O counters changes during them).
+"""
+from __future__ import annotations
+from collections.abc import Iterator
+from pathlib import Path
+from sys import maxsize
+from typing import Any, BinaryIO, NamedTuple, TextIO
+
+from mlfq import MLFQScheduler, View, Controller, Policy, IDLE_CPU, DEFAULT_LEVELS, build_levels
+from event_trace import TraceWriter
+from metrics import Metrics
+from workload import Workload, open_workload
+
+
+class Snapshot(NamedTuple):
+    """State of the scheduler at a point in simulated time"""
+    time: int
+    cpu: str # process holding the CPU ("" if none)
+    queue_lengths: tuple[int, ...] # topmost queue first
+    in_io: int # processes doing I/O
+    finished: int # processes done with all their bursts
+
+
+class Simulation:
+    """A scheduler run driven from code; prints nothing unless given an output"""
+    def __init__(self, workload: Workload, levels: str = DEFAULT_LEVELS, event_driven: bool = False,
+                 use_process_table: bool = False, output: TextIO | BinaryIO | None = None, quiet: bool = False,
+                 trace: TraceWriter | None = None, policy: Policy | None = None) -> None:
+        queues, level_allotments = build_levels(levels)
+        self.scheduler = MLFQScheduler(cpu=IDLE_CPU, priority_queues=queues)
+        self._output = output
+        # Without an output the view only loads the workload: quiet mode drops the log, and finish() is never called
+        view = View(self.scheduler, use_process_table=use_process_table, sink=output, quiet=quiet or output is None)
+        self.controller = Controller(view, self.scheduler, event_driven=event_driven, trace=trace,
+                                     level_allotments=level_allotments, policy=policy)
+
+        allotments, context_switch = view.load_workload(workload)
+        self._ticks: Iterator[None] | None = self.controller.iter_ticks(self.controller.merge_allotments(allotments), context_switch)
+
+    @classmethod
+    def from_file(cls, input_path: str | Path, **options: Any) -> Simulation:
+        """Build a simulation of a text or binary workload file"""
+        with open_workload(input_path) as workload:
+            return cls(workload, **options)
+
+    @property
+    def time(self) -> int:
+        return self.scheduler.time
+
+    @property
+    def done(self) -> bool:
+        return self._ticks is None
+
+    def _advance(self) -> None:
+        """Run one iteration of the scheduler loop"""
+        assert self._ticks is not None
+        try:
+            next(self._ticks)
+        except StopIteration:
+            self._ticks = None
+            if self._output is not None:
+                self.controller.finish()
+
+    def step(self, num_ticks: int = 1) -> int:
+        """Simulate the next num_ticks ticks (fewer if the run ends); get the time reached"""
+        return self.run_until(self.scheduler.time + num_ticks)
+
+    def run_until(self, time: int) -> int:
+        """Simulate until the given time (or the end of the run, if sooner); get the time reached"""
+        self.controller.skip_until = time
+        while self._ticks is not None and self.scheduler.time < time:
+            self._advance()
+        return self.scheduler.time
+
+    def run(self) -> int:
+        """Simulate to the end of the run; get the time reached"""
+        return self.run_until(maxsize)
+
+    def snapshot(self) -> Snapshot:
+        scheduler = self.scheduler
+        return Snapshot(
+            scheduler.time,
+            scheduler.cpu.name,
+            tuple([len(pq) for pq in scheduler.priority_queues]),
+            len(scheduler.io_timers),
+            len(scheduler.finished_processes),
+        )
+
+    def snapshots(self) -> Iterator[Snapshot]:
+        """Simulate the rest of the run, yielding the state after every tick"""
+        self.controller.skip_until = maxsize
+        while self._ticks is not None:
+            start = self.scheduler.time
+            self._advance()
+            snapshot = self.snapshot()
+            for time in range(start + 1, snapshot.time):
+                yield snapshot._replace(time=time)
+            if snapshot.time > start:
+                yield snapshot
+
+    def metrics(self) -> Metrics:
+        """Metrics of the processes (requires numpy)"""
+        return Metrics.from_scheduler(self.scheduler)
@@ -0,0 +1,413 @@
+"""
+Multi-CPU (SMP) scheduling.
+
+SMPController runs the scheduler of mlfq.py on k CPUs. Each core follows
+the same rules as the single CPU of mlfq.py (quanta, allotments,
+demotion, preemption, context switches); the cores either dispatch from
+one global MLFQ shared by all of them, or each has its own MLFQ
+(--per-core). Arriving processes are then spread over the cores round
+robin, return to the core they last ran on after a quantum or I/O, and a
+core with nothing to run steals the next process of another core that
+has work waiting (only once every core has taken its own). In global
+mode, a waiting process goes to the core it last ran on if that core is
+idle, and to the first idle core otherwise. Idle cores are loaded before
+any running core is preempted. A process dispatched on a core other than
+the one it last ran on pays the migration cost (the context switch
+duration unless given) instead of the context switch.
+
+Per-tick scheduling work is O(k): every core does a constant amount of
+work, and idle cores find a core to steal from with a bitmask of the
+cores that have processes waiting (as MLFQScheduler does for its queue
+levels). The per-tick log lists the queues; --quiet drops it.
+
+After the metrics, the time every core spent running processes,
+switching and idle is reported, with its migrations.
+
+Usage: python smp.py INPUT_FILE --cpus K [--per-core] [--migration-cost N] [--levels SPEC] [--event-driven] [--quiet]
+"""
+from __future__ import annotations
+from argparse import ArgumentParser
+from collections.abc import Iterator
+from copy import deepcopy
+from dataclasses import dataclass, field
+from sys import maxsize
+from typing import Any, BinaryIO, TextIO
+
+from mlfq import MLFQScheduler, View, Controller, Process, IDLE_CPU, DEFAULT_LEVELS, build_levels
+
+
+@dataclass
+class Core:
+    """One CPU and the MLFQ it dispatches from (shared by all cores in global mode)"""
+    index: int
+    mlfq: MLFQScheduler
+    cpu: Process = field(default_factory=Process.default)
+    switch_time_pass: int = 0 # tracks time elapsed for context switch (or migration)
+    is_idle: bool = True
+    finished_quantum: list[Process] = field(default_factory=list)
+    demoted_process: str = "" # demoted this tick, printed in the next
+    ran: str = "" # process that ran this tick ("" if none)
+    busy_ticks: int = 0
+    switch_ticks: int = 0
+    migrations: int = 0 # processes dispatched here after last running on another core
+
+
+class SMPView(View):
+    """View printing one CPU line per core and the per-core report"""
+    def print_core_queues(self, mlfqs: list[MLFQScheduler]) -> None:
+        if self._quiet:
+            return
+        for idx, mlfq in enumerate(mlfqs):
+            queues = ";".join([f"[{self._proc_list_to_str(pq.priority_queue)}]" for pq in mlfq.priority_queues])
+            label = "Queues" if len(mlfqs) == 1 else f"Queues {idx}"
+            self._write_log(f"{label} : {queues}\n")
+
+    def print_cores(self, cores: list[Core]) -> None:
+        if self._quiet:
+            return
+        self._write_log("".join([f"CPU {core.index} : {core.ran}\n" for core in cores]))
+
+    def print_idle_ticks(self, num_ticks: int, mlfqs: list[MLFQScheduler], cores: list[Core]) -> None:
+        """Prints the log of the upcoming ticks in which every core is idle and nothing is waiting"""
+        if self._quiet:
+            return
+
+        labels = ["Queues"] if len(mlfqs) == 1 else [f"Queues {idx}" for idx in range(len(mlfqs))]
+        empty = ";".join(["[]"] * len(mlfqs[0].priority_queues))
+        block = "".join([f"{label} : {empty}\n" for label in labels] + [f"CPU {core.index} : \n" for core in cores])
+        if self._scheduler.io_timers:
+            block += f"I/O : [{self._proc_list_to_str(self._scheduler.in_io)}]\n"
+        block += "\n"
+
+        for time in range(self._scheduler.time, self._scheduler.time + num_ticks):
+            self._write(f"At Time = {time}\n{block}")
+
+    def print_utilization(self, cores: list[Core], total_ticks: int) -> None:
+        """Prints the share of the run every core spent running processes"""
+        self._write("\nCore utilization\n")
+        for core in cores:
+            idle = total_ticks - core.busy_ticks - core.switch_ticks
+            share = core.busy_ticks / total_ticks * 100 if total_ticks else 0
+            self._write(f"CPU {core.index} : {share:.1f}% busy ({core.busy_ticks} ms running, {core.switch_ticks} ms switching, "
+                        f"{idle} ms idle), {core.migrations} migrations\n")
+        busy = sum([core.busy_ticks for core in cores])
+        share = busy / (total_ticks * len(cores)) * 100 if total_ticks else 0
+        self._write(f"Average utilization = {share:.1f}%\n")
+
+
+class SMPController(Controller):
+    def __init__(self, view: SMPView, scheduler: MLFQScheduler, num_cpus: int, per_core: bool = False,
+                 migration_cost: int | None = None, event_driven: bool = False, expand_log: bool = True,
+                 level_allotments: list[int | None] | None = None) -> None:
+        if num_cpus < 1:
+            raise ValueError("SMP: at least one CPU is needed")
+        if migration_cost is not None and migration_cost < 0:
+            raise ValueError("SMP: the migration cost cannot be negative")
+        super().__init__(view, scheduler, event_driven=event_driven, expand_log=expand_log, level_allotments=level_allotments)
+        self.per_core = per_core # one MLFQ per core with work stealing (False: one global MLFQ)
+        self.migration_cost = migration_cost # None: the context switch duration
+
+        # The scheduler holds the processes, the I/O and the clock; its queues are the global MLFQ (or core 0's)
+        self.mlfqs: list[MLFQScheduler] = [scheduler]
+        if per_core:
+            self.mlfqs += [MLFQScheduler(cpu=IDLE_CPU, priority_queues=deepcopy(scheduler.priority_queues)) for _ in range(num_cpus - 1)]
+        self.cores: list[Core] = [Core(idx, self.mlfqs[idx if per_core else 0]) for idx in range(num_cpus)]
+        self.home: dict[str, int] = dict() # core each process last ran on (or was queued at)
+        self.ready_cores: int = 0 # bit i is set while mlfqs[i] has processes waiting
+        self.next_core: int = 0 # core the next arrival is queued at (per-core mode)
+
+    """Function to add a process to a queue of the MLFQ of the core it belongs to"""
+    def enqueue(self, queue_num: int, proc: Process) -> None:
+        idx = self.home.get(proc.name, 0) if self.per_core else 0
+        self.mlfqs[idx].add_to_queue(queue_num, proc)
+        self.ready_cores |= 1 << idx
+
+    """Function to queue the processes that have just arrived"""
+    def add_arrivals(self) -> None:
+        scheduler = self.scheduler
+        if not self.per_core:
+            scheduler.add_arriving_to_queue()
+            if scheduler.ready_levels:
+                self.ready_cores |= 1
+            return
+
+        for proc in scheduler.arriving_list:
+            self.home[proc.name] = self.next_core
+            self.enqueue(1, proc)
+            self.next_core = (self.next_core + 1) % len(self.cores)
+        scheduler.arriving_list.clear()
+
+    """Function to get the core whose MLFQ an idle core steals from (-1 if none has processes waiting)"""
+    def find_victim(self, core: Core) -> int:
+        others = self.ready_cores & ~(1 << core.index)
+        if not others:
+            return -1
+        after = others >> (core.index + 1) # look at the following cores first, so thieves spread out
+        if after:
+            return core.index + (after & -after).bit_length()
+        return (others & -others).bit_length() - 1
+
+    """Function to empty a core"""
+    def vacate(self, core: Core) -> None:
+        core.switch_time_pass = 0
+        core.cpu = IDLE_CPU
+
+    """Function to load an idle core with the next process of an MLFQ (none if source is -1 or that MLFQ is empty)"""
+    def load(self, core: Core, source: int) -> None:
+        if source != -1 and self.mlfqs[source].ready_levels:
+            core.cpu = self.mlfqs[source].dequeue_highest()
+            core.switch_time_pass = 0
+            if not self.mlfqs[source].ready_levels:
+                self.ready_cores &= ~(1 << source)
+
+    """Function to load an idle core from its MLFQ, or from another core's"""
+    def dispatch(self, core: Core) -> None:
+        if core.cpu is not IDLE_CPU:
+            return
+        if not self.per_core:
+            self.load(core, 0)
+            return
+        self.load(core, core.index)
+        if core.cpu is IDLE_CPU:
+            self.load(core, self.find_victim(core))
+
+    """Function to load every idle core, before any running core is preempted"""
+    def dispatch_idle(self) -> None:
+        idle = {core.index: core for core in self.cores if core.cpu is IDLE_CPU} # in index order
+        if self.per_core:
+            # Cores take their own processes before any of them steals
+            for core in idle.values():
+                self.load(core, core.index)
+            for core in idle.values():
+                if core.cpu is IDLE_CPU:
+                    self.load(core, self.find_victim(core))
+            return
+
+        # A process goes back to the core it last ran on if that one is idle, else to the first idle core
+        mlfq = self.mlfqs[0]
+        while idle and mlfq.ready_levels:
+            proc = mlfq.dequeue_highest()
+            core = idle.pop(self.home.get(proc.name, -1), None) or idle.pop(next(iter(idle)))
+            core.cpu = proc
+            core.switch_time_pass = 0
+        if not mlfq.ready_levels:
+            self.ready_cores &= ~1
+
+    """Function for 'preemption' on one core"""
+    def select(self, core: Core) -> None:
+        mlfq = core.mlfq
+        min_queue_num = mlfq.highest_ready_level
+
+        # If there's a process in a higher queue, load that process
+        if min_queue_num < core.cpu.queue_number:
+            self.enqueue(core.cpu.queue_number, core.cpu)
+            self.vacate(core)
+            self.dispatch(core)
+
+        # For the case when there's more than one process in a preemptive (SJF) queue
+        if min_queue_num == core.cpu.queue_number and core.cpu is not IDLE_CPU and self.preemptive_levels[min_queue_num-1] and \
+           not mlfq.priority_queues[min_queue_num-1].is_empty:
+            next_in_line = mlfq.priority_queues[min_queue_num-1].peek_process()
+            if (next_in_line.burst_remaining, next_in_line.name) < (core.cpu.burst_remaining, core.cpu.name):
+                self.enqueue(core.cpu.queue_number, core.cpu)
+                self.vacate(core)
+                self.dispatch(core)
+
+        # If the core is still empty, load a process
+        if core.cpu is IDLE_CPU:
+            self.dispatch(core)
+
+    """Function to run a core for one timestamp"""
+    def run_core(self, core: Core, context_switch: int) -> None:
+        proc = core.cpu
+        old_cs = core.switch_time_pass
+        core.ran = ""
+
+        if core.switch_time_pass == context_switch and proc is not IDLE_CPU:
+            if proc.first_run_time == -1:
+                proc.first_run_time = self.scheduler.time - 1 # time was already advanced for this tick
+            proc.quantum_passed += 1
+            proc.update_burst()
+            core.ran = proc.name
+            core.busy_ticks += 1
+            core.is_idle = False
+
+            # Check if quantum was used up
+            level = proc.queue_number - 1
+            quantum = self.quanta[level]
+            if quantum and proc.quantum_passed % quantum == 0 and proc.q1_run_counter < self.min_quantum_iters[level] and proc.burst_remaining != 0:
+                proc.q1_run_counter += 1
+                core.finished_quantum.append(proc)
+                self.vacate(core)
+            return
+
+        if core.switch_time_pass != context_switch:
+            core.switch_time_pass += 1
+            core.is_idle = False
+            core.switch_ticks += 1
+        else:
+            core.is_idle = True
+
+    """Function to move the process on a core to I/O or down a queue once its burst or allotment ends"""
+    def end_of_tick(self, core: Core) -> None:
+        scheduler = self.scheduler
+        proc = core.cpu
+        if proc is IDLE_CPU:
+            return
+
+        # Check if process is done with current CPU burst
+        if proc.burst_remaining == 0:
+            if proc.idx >= len(proc.io_burst):
+                proc.completion_time = scheduler.time
+                self.done_processes.append(proc)
+                scheduler.finished_processes.append(proc)
+            else:
+                demoted = proc.queue_number < self.num_levels and proc.quantum_passed == self.allotments[proc.queue_number-1]
+                if demoted:
+                    core.demoted_process = proc.name
+                    proc.queue_number += 1
+                proc.quantum_passed = 0 # reset so it can be used for io count
+                proc.q1_run_counter = 0
+                proc.update_io()
+                scheduler.io_timers.add(proc, scheduler.time + proc.io_remaining)
+            self.vacate(core)
+
+        # Check if process ran out of allotment (No I/O)
+        elif proc.queue_number < self.num_levels and proc.quantum_passed == self.allotments[proc.queue_number-1]:
+            core.demoted_process = proc.name
+            proc.q1_run_counter = 0
+            proc.quantum_passed = 0
+            self.enqueue(proc.queue_number + 1, proc)
+            proc.queue_number += 1
+            self.vacate(core)
+
+    """Function to count the upcoming ticks in which every core is idle and nothing is waiting"""
+    def get_idle_ticks(self) -> int:
+        scheduler = self.scheduler
+        if scheduler.is_finished or self.done_processes or self.finished_io or self.ready_cores:
+            return 0
+        for core in self.cores:
+            if core.cpu is not IDLE_CPU or core.finished_quantum or core.demoted_process:
+                return 0
+
+        next_arrival = scheduler.next_arrival_time
+        idle_ticks = next_arrival - scheduler.time if next_arrival != -1 else maxsize
+        if scheduler.io_timers:
+            idle_ticks = min(idle_ticks, scheduler.io_timers.next_done_time - scheduler.time - 1)
+        return max(idle_ticks, 0)
+
+    """Function to run the SMP scheduler loop one iteration per next()"""
+    def iter_ticks(self, allotments: list[int], context_switch: int, resume: dict[str, Any] | None = None) -> Iterator[None]:
+        if resume is not None:
+            raise ValueError("SMP: resuming from a checkpoint is not supported")
+        view: SMPView = self.view #type:ignore
+        scheduler = self.scheduler
+        cores = self.cores
+        migration_cost = self.migration_cost if self.migration_cost is not None else context_switch
+        sched_done = False
+
+        self.allotments, self.context_switch = allotments, context_switch
+        self.configure_levels(allotments)
+        for proc in scheduler.process_list:
+            self.set_burst_remaining(proc, proc.idx)
+        scheduler.build_arrival_timeline()
+        view.print_scheduler_log()
+
+        while not sched_done:
+            if scheduler.is_finished:
+                sched_done = True
+
+            view.print_timestamp()
+            scheduler.get_arriving_processes()
+            view.print_arriving_processes()
+            self.add_arrivals()
+            view.print_done_processes(self.done_processes)
+            scheduler.add_time
+
+            # Requeue the processes that used up their quantum, then those that finished their I/O
+            prev_processes: list[Process | None] = list()
+            for core in cores:
+                prev_processes.append(core.finished_quantum[0] if core.finished_quantum else None)
+                for proc in core.finished_quantum:
+                    self.enqueue(proc.queue_number, proc)
+                core.finished_quantum.clear()
+            for proc in self.finished_io:
+                self.enqueue(proc.queue_number, proc)
+            self.finished_io = []
+
+            # Preempt only once every idle core is loaded: a core is only left idle if nothing is waiting
+            self.dispatch_idle()
+            for core, prev_process in zip(cores, prev_processes):
+                self.select(core)
+                proc = core.cpu
+
+                # No context switch when the core was idle or gets back the process it just ran
+                if core.is_idle or prev_process is proc or core.demoted_process == proc.name:
+                    core.switch_time_pass = context_switch
+
+                # A process moving to another core pays the migration cost instead
+                if proc is not IDLE_CPU:
+                    if self.home.get(proc.name, core.index) != core.index:
+                        core.switch_time_pass = context_switch - migration_cost
+                        core.migrations += 1
+                    self.home[proc.name] = core.index
+
+            view.print_core_queues(self.mlfqs if self.per_core else self.mlfqs[:1])
+            for core in cores:
+                self.run_core(core, context_switch)
+            view.print_cores(cores)
+
+            if scheduler.io_timers:
+                view.print_io()
+            self.finished_io = self.check_proc_in_io()
+
+            for core in cores:
+                view.print_demotion(core.demoted_process)
+                core.demoted_process = ""
+                self.end_of_tick(core)
+            view.print_newline()
+
+            # Jump over ticks in which every core is idle
+            if self.event_driven and not sched_done:
+                idle_ticks = min(self.get_idle_ticks(), self.skip_until - scheduler.time)
+                if idle_ticks > 0:
+                    if self.expand_log:
+                        view.print_idle_ticks(idle_ticks, self.mlfqs if self.per_core else self.mlfqs[:1], cores)
+                    for core in cores:
+                        core.switch_time_pass = context_switch
+                        core.is_idle = True
+                    scheduler.time += idle_ticks
+
+            yield
+
+    """Function to print the end of the simulation, its metrics and the core utilization"""
+    def finish(self) -> None:
+        view: SMPView = self.view #type:ignore
+        view.print_simulation_done()
+        view.print_scheduler_metrics()
+        view.print_utilization(self.cores, self.scheduler.time)
+        view.flush()
+
+
+def new_smp_controller(num_cpus: int, levels: str = DEFAULT_LEVELS, per_core: bool = False, migration_cost: int | None = None,
+                       event_driven: bool = False, sink: TextIO | BinaryIO | None = None, quiet: bool = False) -> SMPController:
+    """Build an SMP controller (with its scheduler and view) for the given queue levels"""
+    queues, level_allotments = build_levels(levels)
+    scheduler = MLFQScheduler(cpu=IDLE_CPU, priority_queues=queues)
+    view = SMPView(scheduler, sink=sink, quiet=quiet)
+    return SMPController(view, scheduler, num_cpus, per_core=per_core, migration_cost=migration_cost,
+                         event_driven=event_driven, level_allotments=level_allotments)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="MLFQ Scheduler on several CPUs")
+    parser.add_argument("input_file", help="input .txt or binary workload file")
+    parser.add_argument("--cpus", type=int, required=True, help="number of CPUs")
+    parser.add_argument("--per-core", action="store_true", help="give every core its own MLFQ, with work stealing (default: one global MLFQ)")
+    parser.add_argument("--migration-cost", type=int, help="ticks a process moving to another core waits (default: the context switch duration)")
+    parser.add_argument("--levels", default=DEFAULT_LEVELS, help=f"queue levels, topmost first, as policy[:quantum[:allotment]] (default: {DEFAULT_LEVELS})")
+    parser.add_argument("--event-driven", action="store_true", help="jump over ticks in which every core is idle")
+    parser.add_argument("--quiet", action="store_true", help="print only the SIMULATION DONE, metrics and utilization sections")
+    args = parser.parse_args()
+
+    new_smp_controller(args.cpus, args.levels, args.per_core, args.migration_cost, args.event_driven, quiet=args.quiet).run(args.input_file)
@@ -0,0 +1,121 @@
+"""
+Parameter sweep over the scheduler configuration.
+
+Simulates one workload for every combination of Q1 allotment, Q2
+allotment, Q1 quantum and context switch duration, and prints the
+configurations ranked by average turnaround time, then average waiting
+time. The workload is parsed once in the parent and handed to each worker
+once when the pool starts; every configuration then runs on a fresh copy
+of the processes in a worker.
+
+Each range is a comma-separated list ("4,8,12") or an inclusive range
+("4:20" or "4:20:4"). Ranges that are not given use the workload's header
+values (and Q1_QUANTUM for the quantum).
+
+Usage: python sweep.py WORKLOAD [--q1-allotment R] [--q2-allotment R] [--quantum R] [--context-switch R]
+"""
+from __future__ import annotations
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from itertools import product
+from multiprocessing import Pool
+from os import cpu_count, devnull
+
+from mlfq import MLFQScheduler, View, Controller, RoundRobinAlgorithm, FCFSAlgorithm, SJFAlgorithm, Process, IDLE_CPU, Q1_QUANTUM
+from workload import ProcessRecord, open_workload
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    """One point of the sweep grid"""
+    q1_allotment: int
+    q2_allotment: int
+    quantum: int
+    context_switch: int
+
+
+@dataclass
+class SweepResult:
+    """Metrics of the workload under one configuration"""
+    config: SweepConfig
+    avg_turnaround_time: float
+    avg_waiting_time: float
+
+
+def parse_values(text: str) -> list[int]:
+    """Parse '4,8,12' or an inclusive range 'start:stop[:step]'"""
+    if ":" in text:
+        bounds = [int(value) for value in text.split(":")]
+        step = bounds[2] if len(bounds) > 2 else 1
+        return list(range(bounds[0], bounds[1] + 1, step))
+    return [int(value) for value in text.split(",")]
+
+
+def simulate_config(records: list[ProcessRecord], config: SweepConfig) -> SweepResult:
+    """Simulate the processes under one configuration, without logging"""
+    scheduler = MLFQScheduler(
+        cpu=IDLE_CPU,
+        priority_queues=[RoundRobinAlgorithm(config.quantum), FCFSAlgorithm(), SJFAlgorithm()],
+        process_list=[Process(*record) for record in records],
+    )
+    with open(devnull, "w") as sink:
+        controller = Controller(View(scheduler, sink=sink, quiet=True), scheduler, event_driven=True)
+        controller.simulate([config.q1_allotment, config.q2_allotment], config.context_switch)
+
+    num_procs = len(scheduler.process_list)
+    return SweepResult(
+        config,
+        sum([proc.get_turnaround_time() for proc in scheduler.process_list]) / num_procs,
+        sum([proc.get_waiting_time() for proc in scheduler.process_list]) / num_procs,
+    )
+
+
+# Workload shared by every configuration a worker runs; set once per worker
+_records: list[ProcessRecord] = list()
+
+def _init_worker(records: list[ProcessRecord]) -> None:
+    global _records
+    _records = records
+
+def _run_config(config: SweepConfig) -> SweepResult:
+    return simulate_config(_records, config)
+
+
+def run_sweep(records: list[ProcessRecord], configs: list[SweepConfig], workers: int | None = None) -> list[SweepResult]:
+    """Simulate every configuration on a process pool; results are ranked best first"""
+    workers = workers or cpu_count() or 1
+    chunksize = max(1, len(configs) // (workers * 4))
+    with Pool(workers, initializer=_init_worker, initargs=(records,)) as pool:
+        results = pool.map(_run_config, configs, chunksize=chunksize)
+    return sorted(results, key = lambda r: (r.avg_turnaround_time, r.avg_waiting_time))
+
+
+def print_results(results: list[SweepResult]) -> None:
+    """Print the ranked results matrix"""
+    print(f"{'Rank':>4}  {'Q1 Allot':>8}  {'Q2 Allot':>8}  {'Quantum':>7}  {'Switch':>6}  {'Avg Turn-around (ms)':>20}  {'Avg Waiting (ms)':>16}")
+    for rank, result in enumerate(results, start=1):
+        config = result.config
+        print(f"{rank:>4}  {config.q1_allotment:>8}  {config.q2_allotment:>8}  {config.quantum:>7}  {config.context_switch:>6}  "
+              f"{result.avg_turnaround_time:>20.2f}  {result.avg_waiting_time:>16.2f}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Rank scheduler configurations on one workload")
+    parser.add_argument("workload", help="text or binary workload file")
+    parser.add_argument("--q1-allotment", help="Q1 time allotments to try")
+    parser.add_argument("--q2-allotment", help="Q2 time allotments to try")
+    parser.add_argument("--quantum", help="Q1 round robin quanta to try")
+    parser.add_argument("--context-switch", help="context switch durations to try")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--top", type=int, default=None, help="only print the best N configurations")
+    args = parser.parse_args()
+
+    with open_workload(args.workload) as workload:
+        records = list(workload.records())
+        q1_allotments = parse_values(args.q1_allotment) if args.q1_allotment else [workload.allotments[0]]
+        q2_allotments = parse_values(args.q2_allotment) if args.q2_allotment else [workload.allotments[1]]
+        context_switches = parse_values(args.context_switch) if args.context_switch else [workload.context_switch]
+    quanta = parse_values(args.quantum) if args.quantum else [Q1_QUANTUM]
+
+    configs = [SweepConfig(*values) for values in product(q1_allotments, q2_allotments, quanta, context_switches)]
+    print_results(run_sweep(records, configs, args.workers)[:args.top])
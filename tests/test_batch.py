@@ -0,0 +1,12 @@
+from batch import find_workloads, run_batch
+
+def test_batch_matches_single_runs(make_controller, capsys) -> None: #type:ignore
+    file_names = find_workloads("tests/testcase*.txt")
+    results = run_batch(file_names, workers=2)
+
+    assert [result.file_name for result in results] == file_names
+    for result in results:
+        make_controller().run(result.file_name) #type:ignore
+        out, _ = capsys.readouterr() #type:ignore
+        assert not result.error
+        assert f"Average Turn-around time = {round(result.avg_turnaround_time, 2)} ms" in out
@@ -0,0 +1,64 @@
+import os
+import zlib
+import pytest
+from cache import ResultCache, CacheEntry
+from conftest import new_controller
+
+def _run_cached(cache: ResultCache, input_path: str, capsys, **kwargs) -> tuple[bool, str]: #type:ignore
+    hit = new_controller(**kwargs).run_cached(cache, input_path)
+    out, _ = capsys.readouterr() #type:ignore
+    return hit, out
+
+@pytest.mark.parametrize("store_log", [False, True])
+def test_hit_matches_fresh_run(store_log, tmp_path, capsys) -> None: #type:ignore
+    new_controller().run("set2.txt")
+    expected, _ = capsys.readouterr()
+
+    cache = ResultCache(tmp_path, store_log=store_log)
+    assert _run_cached(cache, "set2.txt", capsys) == (False, expected)
+    # Without a stored log, only the metrics can be served
+    assert _run_cached(cache, "set2.txt", capsys) == (store_log, expected)
+    assert (cache.hits, cache.misses) == (int(store_log), 2 - store_log)
+
+def test_key_depends_on_configuration(tmp_path, capsys) -> None: #type:ignore
+    cache = ResultCache(tmp_path, store_log=True)
+    assert _run_cached(cache, "set2.txt", capsys)[0] is False
+    assert _run_cached(cache, "set2.txt", capsys, event_driven=True, expand_log=False)[0] is False
+    assert _run_cached(cache, "tests/testcase1.txt", capsys)[0] is False
+    assert _run_cached(cache, "set2.txt", capsys, event_driven=True, expand_log=False)[0] is True
+    assert len(cache.entries()) == 3
+
+def test_eviction(tmp_path) -> None: #type:ignore
+    cache = ResultCache(tmp_path, max_entries=2)
+    for key in ["a", "b", "c"]:
+        cache.put(key, CacheEntry(1, [[1, 0, 1]]))
+    assert cache.get("a") is None and cache.get("c") is not None
+    assert [path.stem for path, _ in cache.entries()] == ["b", "c"]
+
+    small = ResultCache(tmp_path, max_bytes=1)
+    small.evict()
+    assert small.entries() == []
+
+@pytest.mark.parametrize("data", [b"MLFQRC\x00\x01not zlib", b"not an entry", b"MLFQRC\x00\x01" + zlib.compress(b"{}")])
+def test_corrupt_entry_is_a_miss(data, tmp_path, capsys) -> None: #type:ignore
+    cache = ResultCache(tmp_path, store_log=True)
+    _, expected = _run_cached(cache, "set2.txt", capsys)
+    [(entry_path, _)] = cache.entries()
+    entry_path.write_bytes(data)
+
+    # The bad entry is dropped and the run simulated (and stored) again
+    assert _run_cached(cache, "set2.txt", capsys) == (False, expected)
+    assert _run_cached(cache, "set2.txt", capsys) == (True, expected)
+
+def test_leftover_files_are_evicted(tmp_path) -> None: #type:ignore
+    cache = ResultCache(tmp_path, max_bytes=1000)
+    (tmp_path / "orphan.log").write_bytes(b"x" * 600) # log of a run whose entry was never put
+    (tmp_path / "stale.entry.abc.tmp").write_bytes(b"x" * 600)
+    os.utime(tmp_path / "stale.entry.abc.tmp", (0, 0))
+    assert [path.name for path, _ in cache.entries()] == ["orphan.log"]
+
+    cache.put("a", CacheEntry(1, [[1, 0, 1]]))
+    assert sorted([path.name for path in tmp_path.iterdir()]) == ["a.entry", "orphan.log"]
+    (tmp_path / "b.log").write_bytes(b"x" * 600)
+    cache.evict()
+    assert sorted([path.name for path in tmp_path.iterdir()]) == ["a.entry", "b.log"]
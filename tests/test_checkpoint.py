@@ -0,0 +1,22 @@
+from io import BytesIO
+import pytest
+from checkpoint import Checkpointer, load_checkpoint
+from mlfq import MLFQScheduler, View, Controller, RoundRobinAlgorithm, FCFSAlgorithm, SJFAlgorithm, IDLE_CPU, Q1_QUANTUM
+
+@pytest.mark.parametrize("event_driven", [False, True])
+def test_resume_matches_uninterrupted_run(event_driven, tmp_path) -> None: #type:ignore
+    outputs = list()
+    for checkpointer in [None, Checkpointer(tmp_path / "sim.ckpt", every_ticks=10)]:
+        sink = BytesIO()
+        scheduler = MLFQScheduler(cpu=IDLE_CPU, priority_queues=[RoundRobinAlgorithm(Q1_QUANTUM), FCFSAlgorithm(), SJFAlgorithm()])
+        Controller(View(scheduler, sink=sink), scheduler, event_driven=event_driven, checkpointer=checkpointer).run("set2.txt")
+        outputs.append(sink.getvalue())
+    assert outputs[0] == outputs[1]
+
+    state = load_checkpoint(tmp_path / "sim.ckpt")
+    sink = BytesIO(outputs[0][:state["view"]["bytes_written"]])
+    sink.seek(0, 2)
+    controller = Controller.from_checkpoint(state, sink)
+    assert controller.scheduler.time > 0 and not controller.scheduler.is_finished
+    controller.resume(state)
+    assert sink.getvalue() == outputs[0]
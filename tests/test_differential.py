@@ -0,0 +1,49 @@
+from io import StringIO
+import pytest
+from differential import compare_variants
+from generate import GeneratorConfig
+from mlfq import VARIANTS
+from simulation import Simulation
+
+# Metrics printed by the original njlr.py
+NJLR_METRICS = {
+    "set2.txt": [
+        "Turn-around time for Process A : 54 - 2 = 52 ms",
+        "Turn-around time for Process B : 47 - 4 = 43 ms",
+        "Turn-around time for Process C : 50 - 11 = 39 ms",
+        "Turn-around time for Process D : 39 - 7 = 32 ms",
+        "Turn-around time for Process E : 79 - 60 = 19 ms",
+        "Average Turn-around time = 37.0 ms",
+        "Waiting time for Process A : 39 ms",
+        "Waiting time for Process B : 38 ms",
+        "Waiting time for Process C : 31 ms",
+        "Waiting time for Process D : 24 ms",
+        "Waiting time for Process E : 4 ms",
+    ],
+    "tests/testcase1.txt": [
+        "Turn-around time for Process A : 25 - 2 = 23 ms",
+        "Turn-around time for Process B : 33 - 0 = 33 ms",
+        "Turn-around time for Process C : 53 - 0 = 53 ms",
+        "Average Turn-around time = 36.33 ms",
+        "Waiting time for Process A : 15 ms",
+        "Waiting time for Process B : 18 ms",
+        "Waiting time for Process C : 23 ms",
+    ],
+}
+
+@pytest.mark.parametrize("input_path", list(NJLR_METRICS))
+@pytest.mark.parametrize("event_driven", [False, True])
+def test_njlr_variant_metrics(input_path, event_driven) -> None: #type:ignore
+    out = StringIO()
+    variant = VARIANTS["njlr"]
+    Simulation.from_file(input_path, levels=variant.levels, policy=variant.policy, event_driven=event_driven, output=out).run()
+    expected = NJLR_METRICS[input_path]
+    assert out.getvalue().splitlines()[-len(expected):] == expected
+
+def test_dee_matches_mlfq() -> None:
+    configs = [GeneratorConfig(30, seed=seed) for seed in range(5)]
+    mlfq, dee, njlr = compare_variants(["mlfq", "dee", "njlr"], "mlfq", configs)
+    for report in (mlfq, dee):
+        assert report.differing_processes == report.unfinished == 0 and report.first_divergence is None
+        assert report.processes == 150 and report.ticks > 0
+    assert njlr.differing_workloads > 0 and njlr.first_divergence is not None
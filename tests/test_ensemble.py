@@ -0,0 +1,53 @@
+from multiprocessing.shared_memory import SharedMemory
+import pytest
+import ensemble
+from batch import run_workload
+from ensemble import EnsembleConfig, make_variant, run_ensemble, simulate_run, summarize_runs
+from workload import open_workload
+
+def _load(input_path: str, **options) -> tuple: #type:ignore
+    with open_workload(input_path) as workload:
+        return list(workload.records()), EnsembleConfig(allotments=tuple(workload.allotments), context_switch=workload.context_switch, **options)
+
+def test_variants_stay_within_jitter() -> None:
+    records, config = _load("set1.txt", burst_jitter=0.25, arrival_jitter=3, seed=7)
+    variant = make_variant(records, config, 5)
+    assert variant == make_variant(records, config, 5) and variant != make_variant(records, config, 6)
+    for record, jittered in zip(records, variant):
+        assert abs(jittered.arrival_time - record.arrival_time) <= 3
+        for burst, new_burst in zip(record.cpu_burst + record.io_burst, jittered.cpu_burst + jittered.io_burst):
+            assert round(burst * 0.75) <= new_burst <= round(burst * 1.25)
+
+def test_ensemble_matches_serial_runs() -> None:
+    records, config = _load("set1.txt", seed=3)
+    rows = run_ensemble(records, config, 12, workers=3)
+    assert rows == [simulate_run(make_variant(records, config, run), config) for run in range(12)]
+
+    summary = summarize_runs(rows)[0]
+    assert summary.low <= summary.mean <= summary.high
+
+def test_ensemble_without_jitter() -> None:
+    records, config = _load("tests/testcase1.txt", burst_jitter=0, arrival_jitter=0)
+    turnaround, waiting = summarize_runs(run_ensemble(records, config, 4, workers=2))[:2]
+    single = run_workload("tests/testcase1.txt")
+    assert (turnaround.mean, turnaround.low, turnaround.high) == (single.avg_turnaround_time,) * 3
+    assert waiting.mean == single.avg_waiting_time
+
+def test_invalid_ensemble() -> None:
+    records, config = _load("set1.txt", burst_jitter=1.5)
+    with pytest.raises(ValueError):
+        run_ensemble(records, config, 4)
+
+def test_failed_ensemble_frees_shared_memory(monkeypatch) -> None: #type:ignore
+    segments: list[SharedMemory] = list()
+    def record(*args, **kwargs) -> SharedMemory: #type:ignore
+        segments.append(SharedMemory(*args, **kwargs))
+        return segments[-1]
+    monkeypatch.setattr(ensemble, "SharedMemory", record)
+
+    records, config = _load("set1.txt", levels="bogus")
+    # The worker's error gets through, not one from closing the segment
+    with pytest.raises(ValueError, match="invalid queue level"):
+        run_ensemble(records, config, 4, workers=2)
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(segments[0].name)
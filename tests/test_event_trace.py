@@ -0,0 +1,19 @@
+from collections import Counter
+from event_trace import TraceWriter, read_trace
+
+def test_trace_encodings_match(make_controller, capsys, tmp_path) -> None: #type:ignore
+    events = list()
+    for encoding, event_driven in [("binary", False), ("jsonl", True)]:
+        with TraceWriter(tmp_path / f"trace.{encoding}", encoding) as trace:
+            make_controller(event_driven=event_driven, trace=trace).run("tests/testcase1.txt") #type:ignore
+        events.append(list(read_trace(tmp_path / f"trace.{encoding}")))
+    capsys.readouterr() #type:ignore
+
+    assert events[0] == events[1]
+    assert [event.time for event in events[0]] == sorted([event.time for event in events[0]])
+    counts = Counter((event.name, event.event) for event in events[0])
+    for name in "ABC":
+        assert counts[name, "arrival"] == counts[name, "done"] == 1
+        assert counts[name, "io-start"] == counts[name, "io-end"]
+    assert [(event.time, event.event) for event in events[0] if event.name == "C"][-3:] == \
+        [(39, "demote"), (39, "dispatch"), (53, "done")]
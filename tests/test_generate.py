@@ -0,0 +1,27 @@
+import pytest
+from generate import GeneratedWorkload, GeneratorConfig
+from workload import write_text
+
+@pytest.mark.parametrize("arrival", ["poisson", "bursty", "trace"])
+def test_generator_is_seeded(arrival) -> None: #type:ignore
+    config = GeneratorConfig(500, seed=7, arrival=arrival, trace=[1, 0, 3])
+    records = list(GeneratedWorkload(config).records())
+
+    assert records == list(GeneratedWorkload(config).records())
+    assert records != list(GeneratedWorkload(GeneratorConfig(500, seed=8, arrival=arrival, trace=[1, 0, 3])).records())
+    assert len(records) == 500
+    arrivals = [record.arrival_time for record in records]
+    assert arrivals == sorted(arrivals)
+    assert all(len(record.io_burst) == len(record.cpu_burst) - 1 for record in records)
+    assert min([burst for record in records for burst in record.cpu_burst + record.io_burst]) >= 1
+
+def test_generated_workload_runs_like_its_file(make_controller, capsys, tmp_path) -> None: #type:ignore
+    workload = GeneratedWorkload(GeneratorConfig(30, seed=1, arrival_rate=0.5))
+    write_text(workload, tmp_path / "generated.txt")
+    make_controller().run(str(tmp_path / "generated.txt")) #type:ignore
+    expected, _ = capsys.readouterr() #type:ignore
+
+    controller = make_controller() #type:ignore
+    controller.simulate(*controller.view.load_workload(workload))
+    out, _ = capsys.readouterr() #type:ignore
+    assert out == expected
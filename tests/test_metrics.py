@@ -0,0 +1,28 @@
+import pytest
+from mlfq import Process
+
+np = pytest.importorskip("numpy")
+from metrics import Metrics, summarize
+
+def test_metrics_match_processes(make_controller, capsys, tmp_path) -> None: #type:ignore
+    controller = make_controller(event_driven=True) #type:ignore
+    controller.run("tests/testcase1.txt")
+    capsys.readouterr() #type:ignore
+
+    process_list: list[Process] = controller.scheduler.process_list
+    metrics = Metrics.from_scheduler(controller.scheduler)
+    assert metrics.turnaround_times.tolist() == [proc.get_turnaround_time() for proc in process_list]
+    assert metrics.waiting_times.tolist() == [proc.get_waiting_time() for proc in process_list]
+    assert metrics.response_times.tolist() == [proc.first_run_time - proc.arrival_time for proc in process_list]
+    assert all(response >= 0 for response in metrics.response_times.tolist())
+    assert sum([summaries["turnaround"].count for summaries in metrics.by_queue().values()]) == len(process_list)
+
+    metrics.to_npz(tmp_path / "metrics.npz")
+    assert np.load(tmp_path / "metrics.npz")["waiting_time"].tolist() == metrics.waiting_times.tolist()
+    metrics.to_csv(tmp_path / "metrics.csv")
+    assert len((tmp_path / "metrics.csv").read_text().splitlines()) == len(process_list) + 1
+
+def test_summarize() -> None:
+    summary = summarize(np.arange(1, 101))
+    assert (summary.count, summary.mean, summary.p50, summary.max) == (100, 50.5, 50.5, 100)
+    assert summarize(np.array([], dtype=np.int64)).count == 0
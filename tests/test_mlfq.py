@@ -1,5 +1,8 @@
 from pathlib import Path
+from io import BytesIO
 import pytest
+from mlfq import ArrivalTimeline, Process, SJFAlgorithm, MLFQScheduler, View, Controller, RoundRobinAlgorithm, FCFSAlgorithm, Q1_QUANTUM, build_levels
+from instrumentation import PhaseTimer
 
 TESTCASENUM = 6
 
@@ -11,3 +14,87 @@ def test_correctness(testcase_num,get_controller, capsys) -> None: #type:ignore
         assert expected.readlines() == out.splitlines(keepends=True) #type:ignore
 
 
+@pytest.mark.parametrize("testcase_num", [i for i in range(1,TESTCASENUM+1)])
+def test_event_driven_matches_tick(testcase_num, make_controller, capsys) -> None: #type:ignore
+    make_controller().run(f"tests/testcase{testcase_num}.txt") #type:ignore
+    tick_out, _ = capsys.readouterr() #type:ignore
+    make_controller(event_driven=True).run(f"tests/testcase{testcase_num}.txt") #type:ignore
+    event_out, _ = capsys.readouterr() #type:ignore
+    assert tick_out == event_out
+
+def test_arrival_timeline_order() -> None:
+    procs = [Process.create_new_process(inp) for inp in ["C;2;1", "B;0;1", "A;2;1", "D;5;1"]]
+    timeline = ArrivalTimeline(procs)
+    assert timeline.pop_arriving(0) == [procs[1]]
+    assert timeline.next_arrival_time(1) == 2
+    assert timeline.pop_arriving(2) == [procs[2], procs[0]]
+    assert timeline.pop_arriving(3) == []
+    assert timeline.next_arrival_time(6) == -1
+
+def test_sjf_heap_order() -> None:
+    sjf = SJFAlgorithm()
+    for name, burst in [("C", 5), ("A", 7), ("B", 5), ("D", 1)]:
+        proc = Process.create_new_process(f"{name};0;{burst}")
+        proc.burst_remaining = burst
+        sjf.add_process(proc)
+    assert [proc.name for proc in sjf.priority_queue] == ["D", "B", "C", "A"]
+    assert sjf.peek_process().name == "D"
+    assert sjf.dequeue_process().name == "D"
+    assert sjf.dequeue_process(1).name == "C"
+    assert [proc.name for proc in sjf.priority_queue] == ["B", "A"]
+
+@pytest.mark.parametrize("quiet", [False, True])
+def test_buffered_binary_sink(quiet, get_controller, capsys) -> None: #type:ignore
+    get_controller.run("tests/testcase4.txt") #type:ignore
+    expected, _ = capsys.readouterr() #type:ignore
+    if quiet:
+        expected = expected[expected.index("SIMULATION DONE"):]
+
+    sink = BytesIO()
+    scheduler = MLFQScheduler(cpu=Process.default(), priority_queues=[RoundRobinAlgorithm(Q1_QUANTUM), FCFSAlgorithm(), SJFAlgorithm()])
+    Controller(View(scheduler, sink=sink, flush_size=64, quiet=quiet), scheduler).run("tests/testcase4.txt")
+    assert sink.getvalue().decode() == expected
+
+def test_phase_timer_does_not_change_output(make_controller, capsys) -> None: #type:ignore
+    make_controller(event_driven=True).run("tests/testcase3.txt") #type:ignore
+    expected, _ = capsys.readouterr() #type:ignore
+
+    timer = PhaseTimer()
+    make_controller(event_driven=True, phase_timer=timer).run("tests/testcase3.txt") #type:ignore
+    out, _ = capsys.readouterr() #type:ignore
+    assert out.startswith(expected) and "# Phase Timings #" in out
+    assert timer.calls["arrivals"] == timer.calls["select"] == timer.calls["demotion"]
+    assert sum(sum(histogram) for histogram in timer.histograms.values()) == sum(timer.calls.values())
+
+def _run_levels(spec: str, input_path: str, event_driven: bool) -> str:
+    queues, level_allotments = build_levels(spec)
+    sink = BytesIO()
+    scheduler = MLFQScheduler(cpu=Process.default(), priority_queues=queues)
+    Controller(View(scheduler, sink=sink), scheduler, event_driven=event_driven, level_allotments=level_allotments).run(input_path)
+    return sink.getvalue().decode()
+
+def test_default_levels_match_fixed_queues(get_controller, capsys) -> None: #type:ignore
+    get_controller.run("tests/testcase3.txt") #type:ignore
+    expected, _ = capsys.readouterr() #type:ignore
+    assert _run_levels("rr:4,fcfs,sjf", "tests/testcase3.txt", False) == expected
+
+@pytest.mark.parametrize("spec", ["rr:2:6,rr:4:12,fcfs::20,sjf", "sjf::5,rr:3", "fcfs"])
+def test_configured_levels(spec) -> None: #type:ignore
+    out = _run_levels(spec, "tests/testcase3.txt", False)
+    assert "SIMULATION DONE" in out
+    assert _run_levels(spec, "tests/testcase3.txt", True) == out
+
+@pytest.mark.parametrize("spec", ["rr,fcfs", "rr:0", "lottery", "fcfs:4", "rr:4,sjf::8"])
+def test_invalid_levels(spec) -> None: #type:ignore
+    with pytest.raises(ValueError):
+        build_levels(spec)
+
+def test_missing_allotment() -> None:
+    with pytest.raises(ValueError):
+        _run_levels("rr:4,fcfs,fcfs,sjf", "tests/testcase3.txt", False)
+
+def test_burst_ending_on_lower_level_quantum(tmp_path) -> None: #type:ignore
+    # Demoted with 4 ms left, the process's burst ends exactly as its level 2 quantum does
+    (tmp_path / "one.txt").write_text("1\n2\n8\n0\nA;0;6\n")
+    out = _run_levels("rr:2:2,rr:4", str(tmp_path / "one.txt"), False)
+    assert "Turn-around time for Process A : 6 - 0 = 6 ms" in out
@@ -0,0 +1,55 @@
+import pytest
+from io import BytesIO
+from mlfq import MLFQScheduler, View, Controller, RoundRobinAlgorithm, FCFSAlgorithm, SJFAlgorithm, Process, Q1_QUANTUM, build_levels
+
+np = pytest.importorskip("numpy")
+from process_table import ProcessTable
+
+LINES = ["B;0;5;2;5;2;5", "A;2;2;2;6", "C;0;30"]
+
+def test_rows_match_processes() -> None:
+    table = ProcessTable.from_lines(LINES)
+    for row, proc in zip(table.rows(), [Process.create_new_process(line) for line in LINES]):
+        assert row.name == proc.name
+        assert row.arrival_time == proc.arrival_time
+        assert list(row.cpu_burst) == proc.cpu_burst
+        assert list(row.io_burst) == proc.io_burst
+    assert [row.name for row in table.rows_by_arrival()] == ["B", "C", "A"]
+
+@pytest.mark.parametrize("testcase_num", [1, 3, 4])
+def test_table_run_matches_process_run(testcase_num, make_controller, capsys) -> None: #type:ignore
+    make_controller().run(f"tests/testcase{testcase_num}.txt") #type:ignore
+    expected, _ = capsys.readouterr() #type:ignore
+
+    scheduler = MLFQScheduler(cpu=Process.default(), priority_queues=[RoundRobinAlgorithm(Q1_QUANTUM), FCFSAlgorithm(), SJFAlgorithm()])
+    Controller(View(scheduler, use_process_table=True), scheduler).run(f"tests/testcase{testcase_num}.txt")
+    out, _ = capsys.readouterr() #type:ignore
+    assert out == expected
+
+    table = scheduler.process_table
+    assert table is not None
+    assert list(table.waiting_times()) == [proc.get_waiting_time() for proc in scheduler.process_list]
+
+def test_table_run_with_many_levels(tmp_path) -> None: #type:ignore
+    input_path = tmp_path / "workload.txt"
+    input_path.write_text("1\n8\n8\n0\nA;0;400\n")
+    outputs = list()
+    for use_process_table in (False, True):
+        queues, level_allotments = build_levels(",".join(["rr:1:1"] * 139 + ["fcfs"]))
+        sink = BytesIO()
+        scheduler = MLFQScheduler(cpu=Process.default(), priority_queues=queues)
+        Controller(View(scheduler, sink=sink, use_process_table=use_process_table), scheduler, level_allotments=level_allotments).run(str(input_path))
+        outputs.append(sink.getvalue())
+    assert b"SIMULATION DONE" in outputs[0] and outputs[1] == outputs[0]
+
+def test_binary_table_matches_text_table(tmp_path) -> None: #type:ignore
+    from workload import WorkloadFile, BinaryWorkloadFile, write_binary
+    with WorkloadFile("set2.txt") as workload:
+        write_binary(workload, tmp_path / "set2.bin")
+        text_table = workload.process_table()
+
+    binary = BinaryWorkloadFile(tmp_path / "set2.bin")
+    binary_table = binary.process_table()
+    assert [row.name for row in binary_table.rows_by_arrival()] == [row.name for row in text_table.rows_by_arrival()]
+    assert list(binary_table.cpu_bursts) == list(text_table.cpu_bursts)
+    assert list(binary_table.io_offsets) == list(text_table.io_offsets)
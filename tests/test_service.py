@@ -0,0 +1,65 @@
+import asyncio
+import os
+import signal
+from pathlib import Path
+from typing import Any
+from conftest import new_controller
+from service import SimulationService, submit
+
+def _serve(socket_path: str, requests: list[tuple[bytes, dict[str, Any]]]) -> list[bytes]:
+    """Start a service with two workers and no backlog, and send it the requests all at once"""
+    async def collect(data: bytes, options: dict[str, Any]) -> bytes:
+        return b"".join([chunk async for chunk in submit(data, socket_path, **options)])
+
+    async def main() -> list[bytes]:
+        service = SimulationService(workers=2, backlog=0)
+        server = await service.start(socket_path)
+        try:
+            return await asyncio.gather(*[collect(data, options) for data, options in requests])
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+
+    return asyncio.run(main())
+
+def test_streams_log_and_metrics(tmp_path, capsys) -> None: #type:ignore
+    new_controller().run("set2.txt")
+    expected = capsys.readouterr()[0].encode()
+
+    data = Path("set2.txt").read_bytes()
+    # More requests than workers: the rest wait for a slot
+    out = _serve(str(tmp_path / "service.sock"), [(data, {}), (data, {"output": "metrics"}), (data, {"event_driven": True})] * 2)
+    assert out[0] == out[2] == out[3] == out[5] == expected
+    assert out[1] == out[4] == expected[expected.index(b"SIMULATION DONE"):]
+
+def test_failed_requests(tmp_path) -> None: #type:ignore
+    data = Path("set2.txt").read_bytes()
+    out = _serve(str(tmp_path / "service.sock"), [(b"3\n5\nx\n", {}), (data, {"levels": "rr:0"}), (data, {"output": "all"})])
+    assert out[0] == b"ERROR: <request>:3: expected an integer\n"
+    assert out[1].startswith(b"ERROR: Input: ")
+    assert out[2].startswith(b"ERROR: Service: ")
+
+def test_recovers_from_a_dead_worker(tmp_path) -> None: #type:ignore
+    socket_path = str(tmp_path / "service.sock")
+    data = Path("set2.txt").read_bytes()
+
+    async def collect() -> bytes:
+        return b"".join([chunk async for chunk in submit(data, socket_path, output="metrics")])
+
+    async def main() -> list[bytes]:
+        service = SimulationService(workers=1, backlog=0)
+        server = await service.start(socket_path)
+        try:
+            outputs = [await collect()]
+            for pid in list(service._pool._processes): #type:ignore
+                os.kill(pid, signal.SIGKILL)
+            await asyncio.sleep(0.5) # let the pool find out
+            return outputs + [await collect(), await collect()]
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+
+    first, *after = asyncio.run(main())
+    assert first.startswith(b"SIMULATION DONE") and after == [first, first]
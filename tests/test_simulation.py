@@ -0,0 +1,24 @@
+from io import StringIO
+import pytest
+from simulation import Simulation
+
+@pytest.mark.parametrize("event_driven", [False, True])
+def test_stepping_matches_full_run(event_driven, make_controller, capsys) -> None: #type:ignore
+    make_controller(event_driven=event_driven).run("set2.txt") #type:ignore
+    expected, _ = capsys.readouterr() #type:ignore
+
+    out = StringIO()
+    sim = Simulation.from_file("set2.txt", event_driven=event_driven, output=out)
+    assert sim.step(5) == 5
+    assert sim.run_until(20) == 20
+    assert not sim.done
+    sim.run()
+    assert sim.done and out.getvalue() == expected
+
+def test_snapshots_every_tick(capsys) -> None: #type:ignore
+    tick = list(Simulation.from_file("set2.txt").snapshots())
+    event = list(Simulation.from_file("set2.txt", event_driven=True).snapshots())
+    assert capsys.readouterr() == ("", "") #type:ignore
+    assert tick == event
+    assert [snapshot.time for snapshot in tick] == list(range(1, len(tick) + 1))
+    assert len(tick[0].queue_lengths) == 3 and tick[-1].finished == 5
@@ -0,0 +1,56 @@
+from io import BytesIO
+import pytest
+from smp import new_smp_controller
+
+def _run_smp(input_path: str, num_cpus: int, **options) -> str: #type:ignore
+    sink = BytesIO()
+    new_smp_controller(num_cpus, sink=sink, **options).run(input_path)
+    return sink.getvalue().decode()
+
+def _metrics(out: str) -> str:
+    return out[out.index("SIMULATION DONE"):out.index("Core utilization")].strip()
+
+@pytest.mark.parametrize("per_core", [False, True])
+def test_one_cpu_matches_single_cpu(per_core, get_controller, capsys) -> None: #type:ignore
+    get_controller.run("set2.txt") #type:ignore
+    expected, _ = capsys.readouterr() #type:ignore
+    expected = expected[expected.index("SIMULATION DONE"):].strip()
+    assert _metrics(_run_smp("set2.txt", 1, per_core=per_core)) == expected
+    assert _metrics(_run_smp("set2.txt", 1, per_core=per_core, event_driven=True)) == expected
+
+def _core_ticks(input_path: str, num_cpus: int, **options) -> list[tuple[int, int, int]]: #type:ignore
+    """Run quietly; get the running ticks, switching ticks and migrations of every core"""
+    controller = new_smp_controller(num_cpus, sink=BytesIO(), quiet=True, **options)
+    controller.run(input_path)
+    return [(core.busy_ticks, core.switch_ticks, core.migrations) for core in controller.cores]
+
+def _write(tmp_path, lines: list[str]) -> str: #type:ignore
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("\n".join(lines) + "\n")
+    return str(input_path)
+
+@pytest.mark.parametrize("event_driven", [False, True])
+def test_global_mode_keeps_affinity(tmp_path, event_driven) -> None: #type:ignore
+    # B arrives at 10 while core 1 is idle: it runs there instead of preempting A (both run at once, no switches).
+    # A is demoted at 16 and goes on on core 0, where it last ran.
+    input_path = _write(tmp_path, ["2", "8", "8", "2", "A;0;20", "B;10;5"])
+    assert _core_ticks(input_path, 2, event_driven=event_driven) == [(20, 0, 0), (5, 0, 0)]
+
+@pytest.mark.parametrize("event_driven", [False, True])
+def test_per_core_mode_steals(tmp_path, event_driven) -> None: #type:ignore
+    # A and C are queued at core 0, B at core 1. Once B is done (at 2), core 1 has nothing of its own
+    # and steals C, which migrates (2 ticks instead of the 1-tick context switch) and runs from 4 to 10.
+    input_path = _write(tmp_path, ["3", "20", "20", "1", "A;0;10", "B;0;2", "C;0;6"])
+    assert _core_ticks(input_path, 2, per_core=True, migration_cost=2, event_driven=event_driven) == [(10, 0, 0), (8, 2, 1)]
+
+def test_utilization_report() -> None:
+    out = _run_smp("set2.txt", 3, per_core=True, migration_cost=2)
+    assert _run_smp("set2.txt", 3, per_core=True, migration_cost=2, event_driven=True, quiet=True).endswith(out[out.index("SIMULATION DONE"):])
+    assert [line.startswith(f"CPU {idx} : ") for idx, line in enumerate(out.splitlines()[-4:-1])] == [True] * 3
+    assert out.splitlines()[-1].startswith("Average utilization = ")
+
+def test_invalid_cpus() -> None:
+    with pytest.raises(ValueError):
+        new_smp_controller(0)
+    with pytest.raises(ValueError):
+        new_smp_controller(2, migration_cost=-1)
@@ -0,0 +1,23 @@
+from batch import run_workload
+from sweep import SweepConfig, parse_values, run_sweep
+from workload import open_workload
+
+def test_parse_values() -> None:
+    assert parse_values("4,8,12") == [4, 8, 12]
+    assert parse_values("2:5") == [2, 3, 4, 5]
+    assert parse_values("4:20:8") == [4, 12, 20]
+
+def test_sweep_matches_single_run() -> None:
+    with open_workload("tests/testcase1.txt") as workload:
+        records = list(workload.records())
+        header_config = SweepConfig(workload.allotments[0], workload.allotments[1], 4, workload.context_switch)
+
+    configs = [header_config, SweepConfig(8, 16, 2, 0), SweepConfig(4, 8, 8, 1)]
+    results = run_sweep(records, configs, workers=2)
+
+    assert sorted([result.config for result in results], key=configs.index) == configs
+    assert [result.avg_turnaround_time for result in results] == sorted([result.avg_turnaround_time for result in results])
+    single = run_workload("tests/testcase1.txt")
+    header_result = next(result for result in results if result.config == header_config)
+    assert header_result.avg_turnaround_time == single.avg_turnaround_time
+    assert header_result.avg_waiting_time == single.avg_waiting_time
@@ -0,0 +1,44 @@
+from pathlib import Path
+import pytest
+from workload import WorkloadFile, WorkloadError, ProcessRecord, BinaryWorkloadFile, open_workload, write_binary, write_text
+
+def test_records_match_text_format() -> None:
+    with WorkloadFile("set1.txt") as workload:
+        assert (workload.num_procs, workload.allotments, workload.context_switch) == (4, [6, 2], 0)
+        records = list(workload.records())
+    assert records[0] == ProcessRecord("B", 0, [5, 3, 3, 1], [4, 4, 7])
+    assert [record.name for record in records] == ["B", "D", "A", "C"]
+
+@pytest.mark.parametrize("content, line_num", [
+    ("2\n8\n8\n", 4),
+    ("2\n8\nx\n0\nA;0;5\nB;1;2\n", 3),
+    ("2\n8\n8\n0\nA;0;5\nB;one;2\n", 6),
+    ("3\n8\n8\n0\nA;0;5\nB;1;2\n", 7),
+    ("4\n8\n8\n0\nA;0;5\nB;1;2\n\n\n", 7),
+    ("3\n8\n8\n0\nA;0;5\n\nB;1;2\n", 6),
+])
+def test_errors_report_line_number(tmp_path: Path, content: str, line_num: int) -> None:
+    file_path = tmp_path / "workload.txt"
+    file_path.write_text(content)
+    with pytest.raises(WorkloadError) as err:
+        with WorkloadFile(file_path) as workload:
+            list(workload.records())
+    assert err.value.line_num == line_num
+
+@pytest.mark.parametrize("testcase_num", [1, 2, 3, 4, 5, 6])
+def test_binary_round_trip(tmp_path: Path, testcase_num: int) -> None:
+    with WorkloadFile(f"tests/testcase{testcase_num}.txt") as workload:
+        write_binary(workload, tmp_path / "workload.bin")
+        expected = list(workload.records())
+
+    with open_workload(tmp_path / "workload.bin") as binary:
+        assert isinstance(binary, BinaryWorkloadFile)
+        assert list(binary.records()) == expected
+        write_text(binary, tmp_path / "workload.txt")
+
+    with WorkloadFile(tmp_path / "workload.txt") as text:
+        assert list(text.records()) == expected
+
+def test_binary_rejects_text(tmp_path: Path) -> None:
+    with pytest.raises(WorkloadError):
+        BinaryWorkloadFile("set1.txt")
@@ -0,0 +1,361 @@
+"""
+Readers, writers and converter for workload files.
+
+Text format (as in set1.txt):
+    number of processes
+    Q1 time allotment
+    Q2 time allotment
+    context switch duration
+    name;arrival time;CPU burst 1;I/O burst 1;CPU burst 2;...   (one line per process)
+
+The text file is memory-mapped and split in large blocks, and processes
+are yielded one at a time, so the whole workload never has to be held as
+Python objects. Errors are reported with the offending line number.
+
+Binary format (little-endian, every section aligned to 8 bytes):
+    header      magic, num_procs, Q1 allotment, Q2 allotment, context switch,
+                number of CPU bursts, number of I/O bursts, name width, reserved
+    arrival     int64[num_procs]
+    cpu_offsets int64[num_procs + 1]    process i owns cpu_bursts[cpu_offsets[i]:cpu_offsets[i+1]]
+    io_offsets  int64[num_procs + 1]
+    cpu_bursts  int32[number of CPU bursts]
+    io_bursts   int32[number of I/O bursts]
+    names       char[num_procs][name width], NUL-padded UTF-8
+
+The binary file is memory-mapped and its arrays are used in place, so a
+process table loads without parsing or copying.
+
+Usage: python workload.py INPUT OUTPUT   (text -> binary, or binary -> text)
+"""
+from __future__ import annotations
+from argparse import ArgumentParser
+from array import array
+from collections.abc import Iterator
+from mmap import mmap, ACCESS_READ
+from pathlib import Path
+from struct import Struct
+from sys import byteorder
+from typing import NamedTuple, Protocol
+
+from process_table import ProcessTable, HAS_NUMPY
+
+if HAS_NUMPY:
+    import numpy as np
+
+### CONSTANTS ###
+HEADER_LINES: int = 4
+BLOCK_SIZE: int = 1 << 20 # bytes split into lines at a time
+BINARY_MAGIC: bytes = b"MLFQWL\x00\x01" # format name and version
+BINARY_HEADER: Struct = Struct("<8s8q")
+
+
+class WorkloadError(ValueError):
+    """Malformed workload file"""
+    def __init__(self, file_path: str | Path, line_num: int | None, message: str) -> None:
+        location = f"{file_path}:{line_num}" if line_num is not None else f"{file_path}"
+        super().__init__(f"{location}: {message}")
+        self.file_path = file_path
+        self.line_num = line_num
+
+
+class ProcessRecord(NamedTuple):
+    """One parsed process line; the fields line up with Process(...)"""
+    name: str
+    arrival_time: int
+    cpu_burst: list[int]
+    io_burst: list[int]
+
+
+def parse_process_line(line: bytes | str) -> ProcessRecord:
+    """Parse one `name;arrival;cpu;io;...` line"""
+    fields = line.strip().split(b";" if isinstance(line, bytes) else ";")
+    if len(fields) < 3:
+        raise ValueError("expected at least a name, an arrival time and one CPU burst")
+    name = fields[0].decode() if isinstance(fields[0], bytes) else fields[0]
+    return ProcessRecord(name, int(fields[1]), list(map(int, fields[2::2])), list(map(int, fields[3::2])))
+
+
+class WorkloadFile:
+    """Memory-mapped workload file in the text format"""
+    def __init__(self, file_path: str | Path) -> None:
+        self.path = Path(file_path)
+        self._file = open(self.path, "rb")
+        try:
+            self._map: mmap | bytes | None = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+        except ValueError: # empty file
+            self._map = None
+        self._load_header()
+
+    def _load_header(self) -> None:
+        try:
+            header = self._read_header()
+        except WorkloadError:
+            self.close()
+            raise
+        self.num_procs: int = header[0]
+        self.allotments: list[int] = [header[1], header[2]]
+        self.context_switch: int = header[3]
+
+    def __enter__(self) -> WorkloadFile:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap):
+            self._map.close()
+        self._file.close()
+
+    def _read_header(self) -> list[int]:
+        """Read the four header lines, remembering where the process lines start"""
+        header: list[int] = list()
+        self._body_offset = 0
+        for line_num in range(1, HEADER_LINES + 1):
+            if self._map is None or self._body_offset >= len(self._map):
+                raise WorkloadError(self.path, line_num, "unexpected end of file in header")
+            end = self._map.find(b"\n", self._body_offset)
+            end = len(self._map) if end == -1 else end
+            try:
+                header.append(int(self._map[self._body_offset:end]))
+            except ValueError:
+                raise WorkloadError(self.path, line_num, "expected an integer") from None
+            self._body_offset = end + 1
+        return header
+
+    def _lines(self) -> Iterator[bytes]:
+        """Yield the process lines, splitting the mapped file a block at a time"""
+        if self._map is None:
+            return
+        pos, size, leftover = self._body_offset, len(self._map), b""
+        while pos < size:
+            block = leftover + self._map[pos:pos + BLOCK_SIZE]
+            pos += BLOCK_SIZE
+            lines = block.split(b"\n")
+            leftover = lines.pop() if pos < size else b""
+            yield from lines
+        if leftover:
+            yield leftover
+
+    def records(self) -> Iterator[ProcessRecord]:
+        """Yield the first num_procs processes, in file order"""
+        found, blank_num = 0, 0
+        for line_num, line in enumerate(self._lines(), start=HEADER_LINES + 1):
+            if found == self.num_procs:
+                return
+            # A blank line is only an error if another process follows it
+            if not line.strip():
+                blank_num = blank_num or line_num
+                continue
+            if blank_num:
+                line_num, line = blank_num, b""
+            try:
+                yield parse_process_line(line)
+            except ValueError as err:
+                raise WorkloadError(self.path, line_num, f"invalid process line: {err}") from None
+            found += 1
+
+        if found < self.num_procs:
+            raise WorkloadError(self.path, HEADER_LINES + found + 1, f"expected {self.num_procs} processes, found {found}")
+
+    def process_table(self) -> ProcessTable:
+        """Load the processes straight into a columnar process table"""
+        return ProcessTable.from_records(self.records())
+
+
+class WorkloadBuffer(WorkloadFile):
+    """Workload in the text format held in memory, e.g. received over a socket"""
+    def __init__(self, data: bytes, name: str = "<buffer>") -> None:
+        self.path = Path(name) # only used in error messages
+        self._map = data or None
+        self._load_header()
+
+    def close(self) -> None:
+        pass
+
+
+class Workload(Protocol):
+    """Protocol for workload readers"""
+    num_procs: int
+    allotments: list[int]
+    context_switch: int
+
+    def records(self) -> Iterator[ProcessRecord]:
+        ...
+
+    def process_table(self) -> ProcessTable:
+        ...
+
+    def close(self) -> None:
+        ...
+
+    def __enter__(self) -> Workload:
+        ...
+
+    def __exit__(self, *_: object) -> None:
+        ...
+
+
+def _aligned(offset: int) -> int:
+    """Round an offset up to the next multiple of 8"""
+    return (offset + 7) & ~7
+
+
+class BinaryWorkloadFile:
+    """Memory-mapped workload file in the binary format"""
+    def __init__(self, file_path: str | Path) -> None:
+        self.path = Path(file_path)
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+        except ValueError: # empty file
+            self._file.close()
+            raise WorkloadError(self.path, None, "not a binary workload file") from None
+
+        if len(self._map) < BINARY_HEADER.size or self._map[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+            self.close()
+            raise WorkloadError(self.path, None, "not a binary workload file")
+
+        _, self.num_procs, allotment_1, allotment_2, self.context_switch, \
+            self._num_cpu, self._num_io, self._name_width, _ = BINARY_HEADER.unpack_from(self._map)
+        self.allotments = [allotment_1, allotment_2]
+
+        # Section offsets
+        num_procs = self.num_procs
+        self._arrival_at = BINARY_HEADER.size
+        self._cpu_offsets_at = self._arrival_at + 8 * num_procs
+        self._io_offsets_at = self._cpu_offsets_at + 8 * (num_procs + 1)
+        self._cpu_bursts_at = self._io_offsets_at + 8 * (num_procs + 1)
+        self._io_bursts_at = _aligned(self._cpu_bursts_at + 4 * self._num_cpu)
+        self._names_at = _aligned(self._io_bursts_at + 4 * self._num_io)
+        if len(self._map) < self._names_at + self._name_width * num_procs:
+            self.close()
+            raise WorkloadError(self.path, None, "truncated binary workload file")
+
+    def __enter__(self) -> BinaryWorkloadFile:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        try:
+            self._map.close()
+        except BufferError:
+            pass # a process table still uses the mapped arrays; the mapping closes with it
+        self._file.close()
+
+    def _section(self, offset: int, count: int, typecode: str) -> memoryview | array:
+        """Get one array section, in place when the machine is little-endian"""
+        itemsize = 8 if typecode == "q" else 4
+        view = memoryview(self._map)[offset:offset + itemsize * count]
+        if byteorder == "little":
+            return view.cast(typecode)
+        values = array(typecode, view)
+        values.byteswap()
+        return values
+
+    def records(self) -> Iterator[ProcessRecord]:
+        """Yield the processes, in file order"""
+        arrival = self._section(self._arrival_at, self.num_procs, "q")
+        cpu_offsets = self._section(self._cpu_offsets_at, self.num_procs + 1, "q")
+        io_offsets = self._section(self._io_offsets_at, self.num_procs + 1, "q")
+        cpu_bursts = self._section(self._cpu_bursts_at, self._num_cpu, "i")
+        io_bursts = self._section(self._io_bursts_at, self._num_io, "i")
+        width = self._name_width
+
+        for i in range(self.num_procs):
+            name_at = self._names_at + i * width
+            yield ProcessRecord(
+                self._map[name_at:name_at + width].rstrip(b"\x00").decode(),
+                arrival[i],
+                cpu_bursts[cpu_offsets[i]:cpu_offsets[i + 1]].tolist(),
+                io_bursts[io_offsets[i]:io_offsets[i + 1]].tolist(),
+            )
+
+    def process_table(self) -> ProcessTable:
+        """Load the processes into a process table whose input arrays are the mapped file"""
+        if not HAS_NUMPY:
+            return ProcessTable.from_records(self.records()) # raises the missing-numpy error
+
+        def section(offset: int, count: int, dtype: str) -> np.ndarray:
+            return np.frombuffer(self._map, dtype=dtype, count=count, offset=offset)
+
+        return ProcessTable(
+            section(self._names_at, self.num_procs, f"S{self._name_width}"),
+            section(self._arrival_at, self.num_procs, "<i8"),
+            section(self._cpu_bursts_at, self._num_cpu, "<i4"),
+            section(self._cpu_offsets_at, self.num_procs + 1, "<i8"),
+            section(self._io_bursts_at, self._num_io, "<i4"),
+            section(self._io_offsets_at, self.num_procs + 1, "<i8"),
+        )
+
+
+def is_binary_workload(file_path: str | Path) -> bool:
+    """Check whether a file starts with the binary workload magic"""
+    with open(file_path, "rb") as file:
+        return file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def open_workload(file_path: str | Path) -> Workload:
+    """Open a workload file in either format"""
+    if is_binary_workload(file_path):
+        return BinaryWorkloadFile(file_path)
+    return WorkloadFile(file_path)
+
+
+def write_binary(workload: Workload, out_path: str | Path) -> None:
+    """Write a workload in the binary format"""
+    names, name_ends = bytearray(), array("q") # names back to back, not one bytes object per process
+    name_width = 1
+    arrival = array("q")
+    cpu_bursts, cpu_offsets = array("i"), array("q", [0])
+    io_bursts, io_offsets = array("i"), array("q", [0])
+
+    for record in workload.records():
+        name = record.name.encode()
+        names += name
+        name_ends.append(len(names))
+        name_width = max(name_width, len(name))
+        arrival.append(record.arrival_time)
+        cpu_bursts.extend(record.cpu_burst)
+        io_bursts.extend(record.io_burst)
+        cpu_offsets.append(len(cpu_bursts))
+        io_offsets.append(len(io_bursts))
+
+    with open(out_path, "wb") as out:
+        out.write(BINARY_HEADER.pack(BINARY_MAGIC, len(name_ends), workload.allotments[0], workload.allotments[1],
+                                     workload.context_switch, len(cpu_bursts), len(io_bursts), name_width, 0))
+        for section in [arrival, cpu_offsets, io_offsets, cpu_bursts, io_bursts]:
+            if byteorder != "little":
+                section.byteswap()
+            out.write(section.tobytes())
+            out.write(b"\x00" * (_aligned(out.tell()) - out.tell()))
+        start = 0
+        for end in name_ends:
+            out.write(names[start:end].ljust(name_width, b"\x00"))
+            start = end
+
+
+def write_text(workload: Workload, out_path: str | Path) -> None:
+    """Write a workload in the text format"""
+    with open(out_path, "w") as out:
+        out.write(f"{workload.num_procs}\n{workload.allotments[0]}\n{workload.allotments[1]}\n{workload.context_switch}\n")
+        for record in workload.records():
+            bursts = [str(burst) for pair in zip(record.cpu_burst, record.io_burst) for burst in pair]
+            bursts += [str(burst) for burst in record.cpu_burst[len(record.io_burst):]] # last CPU burst
+            bursts += [str(burst) for burst in record.io_burst[len(record.cpu_burst):]] # trailing I/O burst
+            out.write(";".join([record.name, str(record.arrival_time)] + bursts) + "\n")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Convert a workload between the text and binary formats")
+    parser.add_argument("input_file", help="workload to convert (format is detected)")
+    parser.add_argument("output_file", help="converted workload")
+    args = parser.parse_args()
+
+    with open_workload(args.input_file) as workload:
+        if isinstance(workload, BinaryWorkloadFile):
+            write_text(workload, args.output_file)
+        else:
+            write_binary(workload, args.output_file)